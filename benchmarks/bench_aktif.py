@@ -0,0 +1,35 @@
+"""
+/aktif sayfalamasını ve /ara önek aramasını büyük bir grupta ölçer. Karşılaştırma
+için eski yöntem (tüm seti sıralayıp tek mesaj metni oluşturmak) da ölçülür.
+
+Çalıştırma: python benchmarks/bench_aktif.py
+"""
+import ortak
+from ortak import bot
+from numara_kumesi import NumaraKumesi
+
+GRUP_NUMARA_SAYISI = 100_000
+
+
+def calistir(olcek: float = 1.0) -> dict:
+    numara_sayisi = max(1000, int(GRUP_NUMARA_SAYISI * olcek))
+    grup_id = -1
+    bot.beklenen_numaralar.clear()
+    eski_kume = {ortak.numara(i * 7) for i in range(numara_sayisi)}
+    bot.beklenen_numaralar[grup_id] = NumaraKumesi(eski_kume)
+    bot.ters_indeksi_olustur()
+    numaralar = bot.beklenen_numaralar[grup_id]
+    orta = sorted(eski_kume)[numara_sayisi // 2]
+    sonuclar = {}
+
+    def eski_aktif():
+        '\n'.join([f"• `{numara}`" for numara in sorted(list(eski_kume))])
+    sonuclar[f'aktif_eski_tam_liste_{numara_sayisi}'] = ortak.sure_olc(eski_aktif, tekrar=3)
+    sonuclar[f'aktif_ilk_sayfa_{numara_sayisi}'] = ortak.sure_olc(lambda: bot.aktif_sayfasi(grup_id), tekrar=100)
+    sonuclar[f'aktif_sayfa_imlecle_{numara_sayisi}'] = ortak.sure_olc(lambda: bot.aktif_sayfasi(grup_id, sonra=orta), tekrar=100)
+    sonuclar[f'ara_onek_{numara_sayisi}'] = ortak.sure_olc(lambda: numaralar.onek_ara(orta[:6]), tekrar=100)
+    return sonuclar
+
+
+if __name__ == '__main__':
+    ortak.yazdir(calistir())
@@ -0,0 +1,50 @@
+"""
+numaralari_ayikla'yı büyük /ver gövdelerinde ve numara_aktarimi.numaralari_oku'yu
+/ver'e eklenen CSV dosyalarında ölçer (arada geçersiz satırlar, +90 / boşluklu yazımlar).
+
+Çalıştırma: python benchmarks/bench_ayiklama.py
+"""
+import io
+
+import ortak
+from ortak import bot
+from numara_aktarimi import numaralari_oku
+
+
+def ver_metni(numara_sayisi: int) -> str:
+    satirlar = []
+    for i in range(numara_sayisi):
+        satirlar.append(ortak.numara(i))
+        if i % 50 == 0:
+            satirlar.append("geçersiz-satır 12345")
+    return "/ver " + "\n".join(satirlar)
+
+
+def ver_dosyasi(numara_sayisi: int) -> bytes:
+    satirlar = ["Tel No;Ad"]
+    for i in range(numara_sayisi):
+        numara = ortak.numara(i)
+        satirlar.append(f"+90 {numara[:3]} {numara[3:6]}-{numara[6:]};Ali" if i % 2 else f"0{numara};Veli")
+        if i % 50 == 0:
+            satirlar.append("12345;geçersiz")
+    return "\n".join(satirlar).encode('utf-8')
+
+
+def dosyayi_oku(icerik: bytes) -> None:
+    for _ in numaralari_oku(io.BytesIO(icerik)):
+        pass
+
+
+def calistir(olcek: float = 1.0) -> dict:
+    sonuclar = {}
+    for numara_sayisi in (1000, 10000, 100000):
+        numara_sayisi = max(10, int(numara_sayisi * olcek))
+        metin = ver_metni(numara_sayisi)
+        sonuclar[f"numaralari_ayikla_{numara_sayisi}"] = ortak.sure_olc(lambda: bot.numaralari_ayikla(metin), tekrar=5)
+        icerik = ver_dosyasi(numara_sayisi)
+        sonuclar[f"numaralari_oku_dosya_{numara_sayisi}"] = ortak.sure_olc(lambda: dosyayi_oku(icerik), tekrar=3)
+    return sonuclar
+
+
+if __name__ == '__main__':
+    ortak.yazdir(calistir())
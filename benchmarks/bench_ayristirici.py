@@ -0,0 +1,81 @@
+"""
+SMS ayrıştırıcısını eski yöntemle (her alan için ayrı re.search + string +=)
+gerçekçi ve bozuk girdiler üzerinde karşılaştırır.
+
+Çalıştırma: python benchmarks/bench_ayristirici.py
+"""
+import re
+import timeit
+
+import ortak
+from sms_ayristirici import sms_ayristir
+
+GIRDILER = {
+    'gercekci': (
+        "Uygulama Adı: Getir\nTel No: 5551234567\n"
+        "Mesaj: Getir doğrulama kodunuz: 483920. Kimseyle paylaşmayın.\nKod: 483920\nSaat: 14:32:05"
+    ),
+    'eksik_alanlar': "Tel No: 5551234567\nMesaj: Giriş kodunuz 1234",
+    'tel_no_yok': "Uygulama Adı: Getir\nMesaj: Kodunuz 1234\nKod: 1234\nSaat: 14:32",
+    'bozuk_tel_no': "Uygulama Adı: Getir\nTel No: 555-123\nMesaj: x\nKod: 1",
+    'uzun_metin': "Mesaj: " + "lorem ipsum " * 400 + "\nTel No: 5551234567\nKod: 9999",
+    'cok_satir': "\n".join(f"Satır {i}: bilgi" for i in range(200)) + "\nTel No: 5551234567\nKod: 1",
+    'bos_alan': "Tel No: 5321234567\nMesaj:\nKod: 55",
+    'satir_ici_kod': "Tel No: 5321234567\nMesaj: Onay Kod: 4455 ile giriş yapın",
+}
+
+# Eski yöntemde boş alan bir sonraki satırı değer olarak alıyordu ("Mesaj: Kod: 55");
+# yeni ayrıştırıcı bunu bilerek yapmaz. Bu girdilerde sadece Tel No ve Kod karşılaştırılır.
+SATIR_ASAN_BOS_ALAN = {'bos_alan'}
+
+
+def eski_yontem(mesaj_metni: str) -> str | None:
+    """Ortak ayrıştırıcıdan önceki sms_isleyici_bot davranışı."""
+    eslesme = re.search(r'Tel No:\s*(\d{10})', mesaj_metni)
+    tel_no = eslesme.group(1) if eslesme else None
+    if not tel_no:
+        return None
+
+    def bilgi(anahtar):
+        e = re.search(rf'{anahtar}:\s*(.*?)(?:\n|$)', mesaj_metni, re.IGNORECASE)
+        return e.group(1).strip() if e else None
+
+    uygulama_adi, mesaj, kod, saat = bilgi("Uygulama Adı"), bilgi("Mesaj"), bilgi("Kod"), bilgi("Saat")
+    yeni_mesaj = "✅ YENİ SMS GELDİ\n\n"
+    if uygulama_adi:
+        yeni_mesaj += f"Uygulama Adı: {uygulama_adi}\n"
+    yeni_mesaj += f"Tel No: {tel_no}\n"
+    if mesaj:
+        yeni_mesaj += f"Mesaj: {mesaj}\n"
+    if kod:
+        yeni_mesaj += f"Kod: `{kod}`\n"
+    if saat:
+        yeni_mesaj += f"Saat: {saat}\n"
+    return yeni_mesaj
+
+
+def yeni_yontem(mesaj_metni: str) -> str | None:
+    sms = sms_ayristir(mesaj_metni)
+    return sms.bicimlendir() if sms else None
+
+
+def tel_ve_kod(bicimli: str) -> list[str]:
+    return [satir.replace('`', '') for satir in bicimli.split('\n') if satir.startswith(('Tel No:', 'Kod:'))]
+
+
+def calistir(olcek: float = 1.0) -> dict:
+    tekrar = max(100, int(20000 * olcek))
+    sonuclar = {}
+    for ad, metin in GIRDILER.items():
+        eski, yeni = eski_yontem(metin), yeni_yontem(metin)
+        if ad in SATIR_ASAN_BOS_ALAN:
+            assert tel_ve_kod(eski) == tel_ve_kod(yeni), ad
+        else:
+            assert eski == yeni, ad
+        sonuclar[f"ayristirma_eski_{ad}"] = min(timeit.repeat(lambda: eski_yontem(metin), number=tekrar, repeat=3)) / tekrar
+        sonuclar[f"ayristirma_{ad}"] = min(timeit.repeat(lambda: yeni_yontem(metin), number=tekrar, repeat=3)) / tekrar
+    return sonuclar
+
+
+if __name__ == '__main__':
+    ortak.yazdir(calistir())
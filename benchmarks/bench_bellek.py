@@ -0,0 +1,104 @@
+"""
+İzlenen numaraların bellek kullanımını ve arama maliyetini eski gösterimle
+karşılaştırır:
+
+- eski: grup başına set(str) + ters indeks {str: set(grup_id)}
+- yeni: grup başına NumaraKumesi (sıralı int64) + ters indeks {int: tuple(grup_id)}
+
+Bellek tracemalloc ile ölçülür. Varsayılan ölçekte 1M numara / 500 grup, numaraların
+%10'u iki grupta birden izlenir.
+Çalıştırma: python benchmarks/bench_bellek.py
+"""
+import gc
+import tracemalloc
+
+import ortak
+from numara_kumesi import NumaraKumesi
+
+NUMARA_SAYISI = 1_000_000
+GRUP_SAYISI = 500
+ARAMA_SAYISI = 100_000
+
+
+def grup_listeleri(numara_sayisi: int, grup_sayisi: int) -> dict[int, list[str]]:
+    grup_basina = numara_sayisi // grup_sayisi
+    gruplar = {}
+    for g in range(grup_sayisi):
+        numaralar = [ortak.numara(g * grup_basina + i) for i in range(grup_basina)]
+        # Numaraların %10'u bir sonraki grupta da izleniyor
+        numaralar += [ortak.numara(((g + 1) % grup_sayisi) * grup_basina + i) for i in range(0, grup_basina, 10)]
+        gruplar[-(1000000000 + g)] = numaralar
+    return gruplar
+
+
+def eski_kur(gruplar: dict) -> tuple[dict, dict]:
+    # Numaralar gerçekte JSON'dan/mesajdan ayrı str nesneleri olarak gelir; kopyalıyoruz
+    beklenen = {g: {''.join(n) for n in numaralar} for g, numaralar in gruplar.items()}
+    ters = {}
+    for g, numaralar in beklenen.items():
+        for n in numaralar:
+            ters.setdefault(n, set()).add(g)
+    return beklenen, ters
+
+
+def yeni_kur(gruplar: dict) -> tuple[dict, dict]:
+    beklenen = {g: NumaraKumesi(numaralar) for g, numaralar in gruplar.items()}
+    ters = {}
+    for g, kume in beklenen.items():
+        tekli = (g,)
+        for n in kume.tamsayilar():
+            mevcut = ters.get(n)
+            ters[n] = tekli if mevcut is None else mevcut + tekli
+    return beklenen, ters
+
+
+def bellek_olc(kurucu, gruplar: dict) -> tuple[int, tuple]:
+    gc.collect()
+    tracemalloc.start()
+    sonuc = kurucu(gruplar)
+    gc.collect()
+    boyut = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return boyut, sonuc
+
+
+def calistir(olcek: float = 1.0) -> dict:
+    numara_sayisi = max(10000, int(NUMARA_SAYISI * olcek))
+    grup_sayisi = max(5, int(GRUP_SAYISI * olcek))
+    gruplar = grup_listeleri(numara_sayisi, grup_sayisi)
+    aramalar = [ortak.numara((i * 7919) % (numara_sayisi * 2)) for i in range(ARAMA_SAYISI)]
+    grup_id = next(iter(gruplar))
+    sonuclar = {}
+
+    eski_bayt, (eski_beklenen, eski_ters) = bellek_olc(eski_kur, gruplar)
+    sonuclar[f'bellek_eski_{numara_sayisi}_mb'] = eski_bayt / 1e6
+    eski_kume = eski_beklenen[grup_id]
+
+    def eski_ters_arama():
+        for n in aramalar:
+            eski_ters.get(n, ())
+    def eski_uyelik():
+        for n in aramalar:
+            n in eski_kume  # noqa: B015
+    sonuclar['ters_indeks_arama_eski'] = ortak.sure_olc(eski_ters_arama, tekrar=3) / ARAMA_SAYISI
+    sonuclar['grup_uyelik_eski'] = ortak.sure_olc(eski_uyelik, tekrar=3) / ARAMA_SAYISI
+    del eski_beklenen, eski_ters, eski_kume
+
+    yeni_bayt, (yeni_beklenen, yeni_ters) = bellek_olc(yeni_kur, gruplar)
+    sonuclar[f'bellek_yeni_{numara_sayisi}_mb'] = yeni_bayt / 1e6
+    yeni_kume = yeni_beklenen[grup_id]
+
+    # sms_isle'deki gibi: gelen str numara int'e çevrilip aranır
+    def yeni_ters_arama():
+        for n in aramalar:
+            yeni_ters.get(int(n), ())
+    def yeni_uyelik():
+        for n in aramalar:
+            n in yeni_kume  # noqa: B015
+    sonuclar['ters_indeks_arama_yeni'] = ortak.sure_olc(yeni_ters_arama, tekrar=3) / ARAMA_SAYISI
+    sonuclar['grup_uyelik_yeni'] = ortak.sure_olc(yeni_uyelik, tekrar=3) / ARAMA_SAYISI
+    return sonuclar
+
+
+if __name__ == '__main__':
+    ortak.yazdir(calistir())
@@ -0,0 +1,60 @@
+"""
+Kalıcı depo maliyetlerini gerçekçi veri boyutlarında ölçer: SMS başına veri_kaydet,
+günlük (journal) yazımı, anlık görüntü sıkıştırması ve açılışta veri_yukle.
+
+Varsayılan ölçekte 1M numara / 500 grup kullanılır; --olcek ile küçültülebilir.
+Çalıştırma: python benchmarks/bench_depo.py
+"""
+import os
+import tempfile
+
+import ortak
+import veri_deposu
+from ortak import bot
+
+NUMARA_SAYISI = 1_000_000
+GRUP_SAYISI = 500
+SMS_SAYISI = 10000
+
+
+def calistir(olcek: float = 1.0) -> dict:
+    numara_sayisi = max(1000, int(NUMARA_SAYISI * olcek))
+    grup_sayisi = max(5, int(GRUP_SAYISI * olcek))
+    ortak.bota_yukle(*ortak.sentetik_veri(numara_sayisi, grup_sayisi))
+    sonuclar = {}
+
+    with tempfile.TemporaryDirectory() as dizin:
+        depo = veri_deposu.VeriDeposu(os.path.join(dizin, 'bot_data.json'), os.path.join(dizin, 'bot_data.journal'))
+        bot.depo = bot.kaydedici.depo = depo
+        grup_id = next(iter(bot.beklenen_numaralar))
+        kayitlar = [{'o': veri_deposu.SAY, 'g': [grup_id], 'n': ortak.numara(i)} for i in range(SMS_SAYISI)]
+
+        # SMS başına handler içindeki maliyet (sadece tampona ekleme)
+        def sms_kaydet():
+            for kayit in kayitlar:
+                bot.veri_kaydet(dict(kayit))
+        sonuclar['veri_kaydet_sms_basina'] = ortak.sure_olc(sms_kaydet) / SMS_SAYISI
+
+        # Arka plan kaydedicisinin günlüğe toplu yazımı (executor'da çalışan kısım)
+        tampon = depo.tamponu_al()
+        sonuclar['gunluge_yaz_kayit_basina'] = ortak.sure_olc(lambda: depo.gunluge_yaz(tampon)) / len(tampon)
+
+        # Sıkıştırma: loop üzerindeki kopya + executor'daki yazım
+        data = {}
+        def kopya():
+            data['v'] = depo.anlik_kopya(bot.beklenen_numaralar, bot.sms_raporu)
+        sonuclar[f'anlik_kopya_{numara_sayisi}'] = ortak.sure_olc(kopya)
+        sonuclar[f'anlik_goruntu_yaz_{numara_sayisi}'] = ortak.sure_olc(lambda: depo.anlik_goruntu_yaz(data['v']))
+
+        # Açılış: anlık görüntü + SMS_SAYISI kayıtlık günlüğün yeniden oynatılması
+        for kayit in kayitlar:
+            depo.ekle(dict(kayit))
+        depo.gunluge_yaz(depo.tamponu_al())
+        depo.kapat()
+        sonuclar[f'veri_yukle_{numara_sayisi}'] = ortak.sure_olc(bot.veri_yukle)
+        depo.kapat()
+    return sonuclar
+
+
+if __name__ == '__main__':
+    ortak.yazdir(calistir())
@@ -0,0 +1,162 @@
+"""
+Güncelleme alımını polling ve webhook modlarında sahte Bot API sunucusuyla
+(sahte_bot_api.py) karşılaştırır.
+
+Bot gerçek PTB Application'ıyla ayağa kaldırılır, sadece Bot API adresi yerel sahte
+sunucuya yönlendirilir. Her güncelleme ayrı bir sohbetten gelir ve sohbete giden ilk
+cevaba kadar geçen süre ölçülür:
+
+- gecikme: güncellemeler tek tek teslim edilir (bir önceki cevaplanınca sıradaki)
+- toplu: tüm güncellemeler aynı anda teslim edilir, güncelleme başına süre
+
+Her mod ESZAMANLI_GUNCELLEME=1 (sırayla) ve 8 ile ayrı ayrı ölçülür.
+
+Varsayılan olarak sentetik /id komutları kullanılır; --kayit ile her satırında bir
+Update JSON'u olan dosya verilebilir (cevabın aynı sohbete gitmesi gerekir).
+Webhook modunda yanlış gizli anahtarla gönderilen isteğin reddedildiği de kontrol edilir.
+
+Çalıştırma: python benchmarks/bench_guncelleme_alimi.py [--kayit guncellemeler.jsonl]
+"""
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import time
+
+import ortak
+from ortak import bot
+from sahte_bot_api import SahteBotApi
+
+GUNCELLEME_SAYISI = 1000
+GECIKME_ORNEGI = 200
+CEVAP_ZAMAN_ASIMI_SN = 10
+ESZAMANLI_DEGERLERI = (1, 8)
+
+
+def bos_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def id_komutu(i: int) -> dict:
+    return {
+        'update_id': i,
+        'message': {
+            'message_id': i, 'date': int(time.time()), 'text': '/id',
+            'chat': {'id': -(1000000000000 + i), 'type': 'supergroup', 'title': 'Bench'},
+            'from': {'id': bot.YETKILI_KULLANICI_IDS[0], 'is_bot': False, 'first_name': 'Bench'},
+            'entities': [{'type': 'bot_command', 'offset': 0, 'length': 3}],
+        },
+    }
+
+
+def numaralandir(guncellemeler: list[dict], baslangic: int) -> list[dict]:
+    """update_id'leri sırayla yeniden verir (getUpdates ofseti ve tekrar teslim için)."""
+    for i, g in enumerate(guncellemeler):
+        g['update_id'] = baslangic + i
+    return guncellemeler
+
+
+async def teslim_et(api: SahteBotApi, mod: str, guncelleme: dict) -> None:
+    if mod == 'webhook':
+        durum = await api.webhooka_gonder(guncelleme)
+        if durum != 200:
+            raise RuntimeError(f"Webhook güncellemeyi kabul etmedi: HTTP {durum}")
+    else:
+        api.kuyruga_ekle(guncelleme)
+
+
+async def cevaplari_olc(api: SahteBotApi, mod: str, guncellemeler: list[dict], toplu: bool) -> list[float]:
+    """Her güncellemenin teslimden cevaba süresini döner (cevaplanmayanlar hariç)."""
+    sureler = []
+
+    async def tek(g: dict) -> None:
+        gelecek = api.cevap_bekle(g['message']['chat']['id'])
+        baslangic = time.perf_counter()
+        await teslim_et(api, mod, g)
+        try:
+            sureler.append(await asyncio.wait_for(gelecek, CEVAP_ZAMAN_ASIMI_SN) - baslangic)
+        except asyncio.TimeoutError:
+            pass
+
+    if toplu:
+        await asyncio.gather(*(tek(g) for g in guncellemeler))
+    else:
+        for g in guncellemeler:
+            await tek(g)
+    return sureler
+
+
+async def mod_olc(mod: str, eszamanli: int, gecikme_guncellemeleri: list[dict], toplu_guncellemeler: list[dict]) -> dict:
+    api = SahteBotApi(bot.BOT_TOKEN)
+    bot.BOT_API_URL = await api.baslat()
+    bot.CALISMA_MODU = mod
+    bot.ESZAMANLI_GUNCELLEME = eszamanli
+    port = bos_port()
+    bot.WEBHOOK_DINLEME_ADRESI = '127.0.0.1'
+    bot.WEBHOOK_PORTU = port
+    bot.WEBHOOK_URL = f"http://127.0.0.1:{port}/{bot.WEBHOOK_YOLU}"
+
+    application = bot.uygulama_olustur()
+    await application.initialize()
+    await bot.guncelleme_alimini_baslat(application)
+    await application.start()
+    try:
+        if mod == 'webhook':
+            durum = await api.webhooka_gonder(id_komutu(0), anahtar='yanlis-anahtar')
+            if durum != 403:
+                raise RuntimeError(f"Yanlış gizli anahtarlı istek reddedilmedi: HTTP {durum}")
+
+        gecikmeler = await cevaplari_olc(api, mod, gecikme_guncellemeleri, toplu=False)
+        baslangic = time.perf_counter()
+        toplu_sureler = await cevaplari_olc(api, mod, toplu_guncellemeler, toplu=True)
+        toplu_sure = time.perf_counter() - baslangic
+    finally:
+        await application.updater.stop()
+        await application.stop()
+        await application.shutdown()
+        await api.durdur()
+
+    gecikmeler.sort()
+    on_ek = f'{mod}_e{eszamanli}'
+    return {
+        f'{on_ek}_gecikme_p50': statistics.median(gecikmeler),
+        f'{on_ek}_gecikme_p95': gecikmeler[int(len(gecikmeler) * 0.95) - 1],
+        f'{on_ek}_toplu_guncelleme_basina': toplu_sure / len(toplu_guncellemeler),
+        f'{on_ek}_cevaplanmayan': len(toplu_guncellemeler) - len(toplu_sureler),
+    }
+
+
+def guncellemeleri_hazirla(olcek: float, kayit: str | None) -> tuple[list[dict], list[dict]]:
+    if kayit:
+        with open(kayit) as f:
+            satirlar = [satir for satir in f if satir.strip()]
+        # İki ölçüm update_id'leri ayrı numaralandırdığı için nesneler paylaşılmaz
+        return [json.loads(satir) for satir in satirlar[:GECIKME_ORNEGI]], [json.loads(satir) for satir in satirlar]
+    sayi = max(50, int(GUNCELLEME_SAYISI * olcek))
+    return [id_komutu(i) for i in range(min(GECIKME_ORNEGI, sayi))], [id_komutu(i) for i in range(sayi)]
+
+
+def calistir(olcek: float = 1.0, kayit: str | None = None) -> dict:
+    sonuclar = {}
+    for mod in ('polling', 'webhook'):
+        for eszamanli in ESZAMANLI_DEGERLERI:
+            gecikme, toplu = guncellemeleri_hazirla(olcek, kayit)
+            numaralandir(gecikme, 1)
+            numaralandir(toplu, len(gecikme) + 1)
+            sonuc = asyncio.run(mod_olc(mod, eszamanli, gecikme, toplu))
+            cevaplanmayan = sonuc.pop(f'{mod}_e{eszamanli}_cevaplanmayan')
+            if cevaplanmayan:
+                print(f"{mod} (eşzamanlı {eszamanli}): {cevaplanmayan} güncelleme {CEVAP_ZAMAN_ASIMI_SN} sn içinde cevaplanmadı")
+            sonuclar.update(sonuc)
+    return sonuclar
+
+
+if __name__ == '__main__':
+    ayristirici = argparse.ArgumentParser(description="Polling ve webhook güncelleme alımını karşılaştırır")
+    ayristirici.add_argument('--kayit', help="Her satırda bir Update JSON'u olan dosya")
+    ayristirici.add_argument('--olcek', type=float, default=1.0)
+    argumanlar = ayristirici.parse_args()
+    ortak.yazdir(calistir(argumanlar.olcek, argumanlar.kayit))
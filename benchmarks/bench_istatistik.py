@@ -0,0 +1,64 @@
+"""
+Geçmiş istatistik deposunu aylarca birikmiş veriyle ölçer: toplu yazım ve
+/rapor 7g, /rapor 30g, /rapor 180g aralık sorguları.
+
+Varsayılan ölçekte 180 gün x 20 grup x günde 300 farklı numara (~1M günlük satır).
+Çalıştırma: python benchmarks/bench_istatistik.py
+"""
+import datetime
+import os
+import tempfile
+
+import ortak
+from ortak import bot
+from istatistik import IstatistikDeposu, gun_anahtari
+
+GUN_SAYISI = 180
+GRUP_SAYISI = 20
+GUNLUK_NUMARA = 300
+
+
+def calistir(olcek: float = 1.0) -> dict:
+    gun_sayisi = max(30, int(GUN_SAYISI * olcek))
+    grup_sayisi = max(2, int(GRUP_SAYISI * olcek))
+    gunluk_numara = max(50, int(GUNLUK_NUMARA * olcek))
+    bugun = datetime.datetime.now(bot.TIMEZONE).date()
+    sonuclar = {}
+
+    with tempfile.TemporaryDirectory() as dizin:
+        depo = IstatistikDeposu(os.path.join(dizin, 'istatistik.db'), bot.TIMEZONE, gunluk_saklama_gun=gun_sayisi + 1)
+        simdi_saat = int(datetime.datetime.now().timestamp() // 3600)
+
+        # Her gün için bir tampon: gün içinde numaralar kayarak farklı saatlere dağılır
+        def gecmisi_doldur():
+            for g in range(gun_sayisi):
+                gun = gun_anahtari(bugun - datetime.timedelta(days=g))
+                saat = simdi_saat - g * 24
+                tampon = {}
+                for grup in range(grup_sayisi):
+                    for i in range(gunluk_numara):
+                        tampon[(-100 - grup, saat - i % 24, gun, ortak.numara(g * 7 + i))] = 1 + i % 5
+                depo._yaz(tampon)
+        satir = gun_sayisi * grup_sayisi * gunluk_numara
+        sonuclar['istatistik_yaz_satir_basina'] = ortak.sure_olc(gecmisi_doldur) / satir
+
+        # SMS başına handler içindeki maliyet (sadece tampona ekleme)
+        def artir():
+            for i in range(10000):
+                depo.artir(-100, ortak.numara(i))
+        sonuclar['istatistik_artir_sms_basina'] = ortak.sure_olc(artir) / 10000
+        depo._tampon = {}
+
+        for gun in (7, 30, gun_sayisi):
+            baslangic = gun_anahtari(bugun - datetime.timedelta(days=gun - 1))
+            sonuclar[f'istatistik_sorgu_{gun}g'] = ortak.sure_olc(
+                lambda: depo._sorgula(-101, baslangic, gun_anahtari(bugun), 20), tekrar=5
+            )
+        # Bağlantı bu iş parçacığında açıldı; durdur() yerine doğrudan kapatılır
+        depo._kapat()
+        depo._yurutucu.shutdown()
+    return sonuclar
+
+
+if __name__ == '__main__':
+    ortak.yazdir(calistir())
@@ -0,0 +1,84 @@
+"""
+Log çağrısının çağıran thread'e (event loop) maliyetini eski senkron StreamHandler ile
+kuyruklu hat (loglama.py) arasında karşılaştırır. Yazma hedefi her satırda YAZMA_GECIKMESI_SN
+bekleyen yavaş bir akıştır (dolu disk / yavaş terminal / journald baskısı).
+
+- eski: basicConfig düzeni; f-string + biçimlendirme + yazma çağıranda
+- yeni: %-biçim, örnekleme filtresi ve kuyruğa koyma çağıranda; biçimlendirme ve yazma thread'de
+- yeni_kapali: seviyesi kapalı kategoride %-biçimli çağrı (argümanlar hiç birleştirilmez)
+
+Çalıştırma: python benchmarks/bench_loglama.py
+"""
+import logging
+import logging.handlers
+import queue
+import time
+
+import ortak
+import loglama
+
+YAZMA_GECIKMESI_SN = 0.0002
+METIN = "Uygulama Adı: Getir\nTel No: 5551234567\nMesaj: Getir doğrulama kodunuz: 483920\nKod: 483920\nSaat: 14:32:05"
+
+
+class YavasAkis:
+    def write(self, metin: str) -> None:
+        time.sleep(YAZMA_GECIKMESI_SN)
+
+    def flush(self) -> None:
+        pass
+
+
+def logger_kur(ad: str, isleyici: logging.Handler, seviye: int = logging.INFO) -> logging.Logger:
+    logger = logging.getLogger(f"bench_loglama.{ad}")
+    logger.handlers[:] = [isleyici]
+    logger.propagate = False
+    logger.setLevel(seviye)
+    return logger
+
+
+def calistir(olcek: float = 1.0) -> dict:
+    tekrar = max(200, int(2000 * olcek))
+    # ortak.py ölçümler için logları kapatır; bu ölçümde açık olmaları gerekiyor
+    logging.disable(logging.NOTSET)
+    try:
+        eski_isleyici = logging.StreamHandler(YavasAkis())
+        eski_isleyici.setFormatter(logging.Formatter(loglama.METIN_BICIMI))
+        eski = logger_kur('eski', eski_isleyici)
+
+        kuyruk = queue.Queue(tekrar * 2)
+        yeni_isleyici = loglama.KuyrukIsleyici(kuyruk)
+        # Ölçülen satır her seferinde geçsin; örnekleme maliyeti yine de ödenir
+        yeni_isleyici.addFilter(loglama.OrneklemeFiltresi(pencere_sn=10.0, adet=tekrar * 2))
+        yazici = logging.StreamHandler(YavasAkis())
+        yazici.setFormatter(loglama.JsonBicimleyici())
+        dinleyici = logging.handlers.QueueListener(kuyruk, yazici)
+        dinleyici.start()
+        yeni = logger_kur('yeni', yeni_isleyici)
+        yeni_kapali = logger_kur('yeni_kapali', yeni_isleyici, seviye=logging.WARNING)
+
+        def eski_cagri():
+            for i in range(tekrar):
+                eski.info(f"User-bot SMS'i yakaladı - Kaynak Grup ID: {-100123}, Mesaj ID: {i}, Metin: {METIN[:50]}...")
+
+        def yeni_cagri():
+            for i in range(tekrar):
+                yeni.info("User-bot SMS'i yakaladı - Kaynak Grup ID: %s, Mesaj ID: %s", -100123, i)
+
+        def yeni_kapali_cagri():
+            for i in range(tekrar):
+                yeni_kapali.debug("User-bot, SMS'i (ID: %s) Ana Bot'a başarıyla iletti.", i)
+
+        sonuclar = {
+            'log_eski_cagri': ortak.sure_olc(eski_cagri) / tekrar,
+            'log_yeni_cagri': ortak.sure_olc(yeni_cagri) / tekrar,
+            'log_yeni_kapali_seviye': ortak.sure_olc(yeni_kapali_cagri, tekrar=3) / tekrar,
+        }
+        dinleyici.stop()
+    finally:
+        logging.disable(logging.WARNING)
+    return sonuclar
+
+
+if __name__ == '__main__':
+    ortak.yazdir(calistir())
@@ -0,0 +1,72 @@
+"""
+/rapor (rapor_komutu) ve gün sonu raporu (rapor_gonder_job) oluşturma maliyetini
+büyük gruplarda ölçer. Telegram çağrıları sahte nesnelerle karşılanır.
+
+Gün sonu raporu için ayrıca event loop'un en uzun bloklandığı süre ölçülür; bu süre
+boyunca SMS yönlendirmesi de bekler.
+
+Çalıştırma: python benchmarks/bench_rapor.py
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+import ortak
+from ortak import bot
+
+
+def calistir(olcek: float = 1.0) -> dict:
+    sonuclar = {}
+
+    async def olc():
+        for sayacli_numara in (1000, 10000, 100000):
+            sayacli_numara = max(100, int(sayacli_numara * olcek))
+            # Tek grupta sayacli_numara adet SMS sayacı
+            beklenen, rapor = ortak.sentetik_veri(sayacli_numara, 1, sms_orani=1)
+            ortak.bota_yukle(beklenen, rapor)
+            grup_id = next(iter(rapor))
+            context = ortak.context()
+
+            async def komut():
+                await bot.rapor_komutu(ortak.guncelleme('/rapor', chat_id=grup_id), context)
+            sonuclar[f'rapor_komutu_{sayacli_numara}'] = await ortak.async_sure_olc(komut, tekrar=3)
+
+            async def tam_rapor():
+                c = ortak.context()
+                c.args = ['tum']
+                await bot.rapor_komutu(ortak.guncelleme('/rapor tum', chat_id=grup_id), c)
+            sonuclar[f'rapor_komutu_tum_{sayacli_numara}'] = await ortak.async_sure_olc(tam_rapor, tekrar=3)
+
+        # Gün sonu: 500 grup x 200 sayaç
+        ortak.bota_yukle(*ortak.sentetik_veri(max(1000, int(100000 * olcek)), 500, sms_orani=1))
+        hazir_rapor = bot.sms_raporu
+
+        async def gun_sonu():
+            bot.sms_raporu = dict(hazir_rapor)  # İş sonunda sms_raporu sıfırlanır
+            await bot.rapor_gonder_job(ortak.context())
+        sonuclar['rapor_gonder_job_500_grup'] = await ortak.async_sure_olc(gun_sonu, tekrar=3)
+
+        en_uzun = 0.0
+
+        async def nabiz():
+            nonlocal en_uzun
+            while True:
+                onceki = time.perf_counter()
+                await asyncio.sleep(0)
+                en_uzun = max(en_uzun, time.perf_counter() - onceki)
+
+        gorev = asyncio.create_task(nabiz())
+        await asyncio.sleep(0)
+        await gun_sonu()
+        gorev.cancel()
+        sonuclar['rapor_gonder_job_en_uzun_bloklama'] = en_uzun
+
+    with tempfile.TemporaryDirectory() as dizin:
+        bot.RAPOR_DURUM_DOSYASI = os.path.join(dizin, 'gun_sonu_raporu.json')
+        asyncio.run(olc())
+    return sonuclar
+
+
+if __name__ == '__main__':
+    ortak.yazdir(calistir())
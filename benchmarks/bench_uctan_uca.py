@@ -0,0 +1,484 @@
+"""
+Uçtan uca kayıt/yeniden oynatma yük düzeneği: kaynak gruplara düşen mesajların kaydını
+(JSONL) User-bot'un iletim mantığından (anlık dinleyici + start_message_polling boşluk
+kurtarma) ve Ana Bot'un sms_isleyici_bot'undan geçirip hedef gruplara teslime kadar
+ölçer. Pyrogram istemcisi ve Bot API süreç içi sahte nesnelerle değiştirilir; hız
+sınırları, tekrar önbellekleri, gönderici kuyruğu ve kalıcılık gerçek koddur.
+
+Kayıt biçimi (satır başına bir mesaj, zaman sırasıyla):
+  {"t": 1760000000.12, "chat_id": -100123, "id": 4567, "from_id": 777, "text": "Tel No: ..."}
+
+Raporlananlar: uçtan uca gecikme yüzdelikleri (kaynak gruba düşüşten hedef gruba
+teslime), kayıp (hiç teslim edilmeyen SMS/grup çiftleri), tekrar (aynı SMS'in aynı
+gruba fazladan gönderimi), verim ve event loop'un en uzun bloklanması.
+
+Hata enjeksiyonu: Pyrogram çağrılarında FloodWait, Bot API gönderimlerinde RetryAfter,
+anlık dinleyicinin mesaj kaçırması ve veri_kaydet'in arkasındaki disk yazmalarında
+gecikme (yavaş disk).
+
+Örnekler:
+  python benchmarks/bench_uctan_uca.py uret --cikti kayit.jsonl --sms 2000
+  python benchmarks/bench_uctan_uca.py oynat --kayit kayit.jsonl --hiz 10
+  python benchmarks/bench_uctan_uca.py oynat --kayit kayit.jsonl --hiz 0 --floodwait 0.01 --yavas-disk 0.5
+  python benchmarks/bench_uctan_uca.py kaydet --cikti kayit.jsonl --limit 5000   # gerçek hesapla
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+import ortak
+from ortak import bot
+
+# user_bot.py içe aktarılırken zorunlu ortam değişkenleri aranır
+os.environ.setdefault('API_ID', '1')
+os.environ.setdefault('API_HASH', 'bench')
+os.environ.setdefault('KAYNAK_GRUP_IDS', '-1001')
+os.environ.setdefault('SMS_BOT_IDS', '777')
+os.environ.setdefault('PYROGRAM_SESSION_STRING', 'bench')
+os.environ['IMLEC_DOSYASI'] = os.path.join(tempfile.gettempdir(), 'bench_user_bot_cursor.json')
+# Pyrogram içe aktarılırken asyncio.get_event_loop() çağırır; calistir.py'de önceki
+# benchmark'ların asyncio.run'ı geçerli loop'u temizlemiş olur
+asyncio.set_event_loop(asyncio.new_event_loop())
+
+import user_bot  # noqa: E402
+import gonderici as gonderici_modulu  # noqa: E402
+from pyrogram.errors import FloodWait  # noqa: E402
+from telegram.error import RetryAfter  # noqa: E402
+from hiz_siniri import TokenKovasi  # noqa: E402
+from istatistik import IstatistikDeposu  # noqa: E402
+from kopru import TelegramKopru  # noqa: E402
+from numara_kumesi import NumaraKumesi  # noqa: E402
+from sms_ayristirici import sms_ayristir  # noqa: E402
+from tekrar_onbellegi import TekrarOnbellegi  # noqa: E402
+from veri_deposu import VeriDeposu, ArkaPlanKaydedici  # noqa: E402
+
+SMS_BOT_ID = 777
+GURULTU_KULLANICISI = 999
+# Yeniden oynatma bittikten sonra bu kadar süre hiç teslim olmazsa ölçüm biter
+SESSIZLIK_SN = 5.0
+SON_BEKLEME_SN = 120.0
+
+
+# --- Kayıt üretme ve okuma ---
+def sentetik_kayit(sms_sayisi: int, numara_sayisi: int = 500, kaynak_sayisi: int = 2, saniyede: float = 20.0,
+                   tekrar_orani: float = 0.02, gurultu_orani: float = 0.05, tohum: int = 1) -> list[dict]:
+    """Patlamalı, ara sıra tekrarlı ve gürültülü (SMS botu dışından) sentetik kaynak grup kaydı üretir."""
+    rastgele = random.Random(tohum)
+    kaynaklar = [-(1001000000000 + i) for i in range(kaynak_sayisi)]
+    sonraki_id = {k: 1 for k in kaynaklar}
+    kayitlar = []
+    t = 1760000000.0
+    for i in range(sms_sayisi):
+        # Numaraların küçük bir kısmı patlama halinde art arda SMS alır
+        numara = ortak.numara(rastgele.randrange(numara_sayisi // 20 if rastgele.random() < 0.3 else numara_sayisi))
+        kaynak = rastgele.choice(kaynaklar)
+        metin = f"Uygulama Adı: Test\nTel No: {numara}\nMesaj: Kodunuz {100000 + i}\nKod: {100000 + i}\nSaat: {i}"
+        t += rastgele.expovariate(saniyede)
+        adet = 2 if rastgele.random() < tekrar_orani else 1
+        for _ in range(adet):
+            kayitlar.append({'t': t, 'chat_id': kaynak, 'id': sonraki_id[kaynak], 'from_id': SMS_BOT_ID, 'text': metin})
+            sonraki_id[kaynak] += 1
+        if rastgele.random() < gurultu_orani:
+            kayitlar.append({'t': t, 'chat_id': kaynak, 'id': sonraki_id[kaynak], 'from_id': GURULTU_KULLANICISI, 'text': 'merhaba'})
+            sonraki_id[kaynak] += 1
+    return kayitlar
+
+
+def kayit_oku(yol: str) -> list[dict]:
+    with open(yol) as f:
+        return [json.loads(satir) for satir in f if satir.strip()]
+
+
+def kayit_yaz(kayitlar: list[dict], yol: str) -> None:
+    with open(yol, 'w') as f:
+        for k in kayitlar:
+            f.write(json.dumps(k, ensure_ascii=False) + '\n')
+
+
+async def gercek_kayit_al(cikti: str, limit: int) -> None:
+    """Gerçek hesapla (user_bot ortam değişkenleri) kaynak grupların son `limit` mesajını kayda döker."""
+    kayitlar = []
+    await user_bot.user_app.start()
+    try:
+        for chat_id in user_bot.KAYNAK_GRUP_IDS:
+            async for m in user_bot.user_app.get_chat_history(chat_id=chat_id, limit=limit):
+                if m.text:
+                    kayitlar.append({'t': m.date.timestamp(), 'chat_id': chat_id, 'id': m.id,
+                                     'from_id': m.from_user.id if m.from_user else None, 'text': m.text})
+    finally:
+        await user_bot.user_app.stop()
+    kayitlar.sort(key=lambda k: (k['t'], k['id']))
+    kayit_yaz(kayitlar, cikti)
+    print(f"{len(kayitlar)} mesaj {cikti} dosyasına yazıldı.")
+
+
+# --- Sahte Pyrogram ve Bot API ---
+class Enjeksiyon:
+    """Hata enjeksiyonu ayarları ve gerçekleşen sayıları."""
+
+    def __init__(self, floodwait: float = 0.0, floodwait_sn: int = 2, retryafter: float = 0.0, retryafter_sn: int = 1,
+                 push_kaybi: float = 0.0, yavas_disk_sn: float = 0.0, tohum: int = 2):
+        self.floodwait, self.floodwait_sn = floodwait, floodwait_sn
+        self.retryafter, self.retryafter_sn = retryafter, retryafter_sn
+        self.push_kaybi = push_kaybi
+        self.yavas_disk_sn = yavas_disk_sn
+        self.rastgele = random.Random(tohum)
+        self.sayilar = {'floodwait': 0, 'retryafter': 0, 'push_kaybi': 0, 'yavas_yazma': 0}
+
+    def olur_mu(self, tur: str, olasilik: float) -> bool:
+        if olasilik and self.rastgele.random() < olasilik:
+            self.sayilar[tur] += 1
+            return True
+        return False
+
+
+class SahtePyrogram:
+    """user_bot.user_app yerine: kaynak grup geçmişi ve Ana Bot'a mesaj gönderimi."""
+
+    def __init__(self, enjeksiyon: Enjeksiyon, ana_bot_kuyrugu: asyncio.Queue):
+        self.enjeksiyon = enjeksiyon
+        self.gecmis: dict[int, list] = {}
+        self.ana_bot_kuyrugu = ana_bot_kuyrugu
+        self.iletilen = 0
+        self.son_iletim = 0.0
+
+    def yayinla(self, kayit: dict):
+        mesaj = SimpleNamespace(
+            id=kayit['id'], chat=SimpleNamespace(id=kayit['chat_id']), text=kayit['text'],
+            from_user=SimpleNamespace(id=kayit['from_id']) if kayit.get('from_id') is not None else None,
+            date=datetime.datetime.now(datetime.timezone.utc),
+        )
+        self.gecmis.setdefault(kayit['chat_id'], []).append(mesaj)
+        return mesaj
+
+    def _floodwait(self) -> None:
+        if self.enjeksiyon.olur_mu('floodwait', self.enjeksiyon.floodwait):
+            raise FloodWait(value=self.enjeksiyon.floodwait_sn)
+
+    async def get_chat_history(self, chat_id: int, limit: int = 0, offset_id: int = 0):
+        self._floodwait()
+        verilen = 0
+        for mesaj in reversed(self.gecmis.get(chat_id, ())):
+            if offset_id and mesaj.id >= offset_id:
+                continue
+            yield mesaj
+            verilen += 1
+            if limit and verilen >= limit:
+                return
+
+    async def send_message(self, chat_id, text: str):
+        self._floodwait()
+        self.iletilen += 1
+        self.son_iletim = time.perf_counter()
+        self.ana_bot_kuyrugu.put_nowait(text)
+
+
+class SahteBotApi:
+    """gonderici'nin kullandığı bot nesnesi: hedef gruplara teslimleri zamanlarıyla kaydeder."""
+
+    def __init__(self, enjeksiyon: Enjeksiyon, gecikme_sn: float = 0.0):
+        self.enjeksiyon = enjeksiyon
+        self.gecikme_sn = gecikme_sn
+        self.teslimler: list[tuple[float, str, int, str]] = []  # (zaman, metot, chat_id, metin)
+        self._mesaj_id = 0
+
+    async def _cagri(self, metot: str, chat_id: int, text: str) -> None:
+        if self.gecikme_sn:
+            await asyncio.sleep(self.gecikme_sn)
+        if self.enjeksiyon.olur_mu('retryafter', self.enjeksiyon.retryafter):
+            raise RetryAfter(retry_after=datetime.timedelta(seconds=self.enjeksiyon.retryafter_sn))
+        self.teslimler.append((time.perf_counter(), metot, chat_id, text))
+
+    async def send_message(self, chat_id: int, text: str, **kwargs):
+        await self._cagri('send', chat_id, text)
+        self._mesaj_id += 1
+        return SimpleNamespace(message_id=self._mesaj_id)
+
+    async def edit_message_text(self, chat_id: int, message_id: int, text: str, **kwargs):
+        await self._cagri('edit', chat_id, text)
+
+
+# --- Düzenek ---
+def sms_anahtari(metin: str) -> str | None:
+    # Hedef gruba giden metinde kod Markdown ile `...` içine alınır
+    sms = sms_ayristir(metin.replace('`', ''))
+    return sms.tekrar_anahtari() if sms is not None else None
+
+
+def izleme_kur(kayitlar: list[dict], grup_sayisi: int) -> dict:
+    """Kayıttaki her numarayı 1-2 gruba izletir; {numara: grup_idleri} döner."""
+    numaralar = sorted({sms.tel_no for k in kayitlar if (sms := sms_ayristir(k['text'])) is not None})
+    beklenen = {}
+    for i, numara in enumerate(numaralar):
+        gruplar = [-(2000000000 + i % grup_sayisi)]
+        if i % 10 == 0:
+            gruplar.append(-(2000000000 + (i + 1) % grup_sayisi))
+        for g in gruplar:
+            beklenen.setdefault(g, []).append(numara)
+    ortak.bota_yukle({g: NumaraKumesi(n) for g, n in beklenen.items()}, {})
+    return {numara: bot.numara_gruplari[int(numara)] for numara in numaralar}
+
+
+class Duzenek:
+    """Bir yeniden oynatma çalıştırması için User-bot ve Ana Bot durumunu sıfırdan kurar."""
+
+    def __init__(self, dizin: str, enjeksiyon: Enjeksiyon, hiz_siniri: bool, api_gecikmesi_sn: float):
+        self.enjeksiyon = enjeksiyon
+        self.ana_bot_kuyrugu: asyncio.Queue[str] = asyncio.Queue()
+        self.pyrogram = SahtePyrogram(enjeksiyon, self.ana_bot_kuyrugu)
+        self.bot_api = SahteBotApi(enjeksiyon, api_gecikmesi_sn)
+        self.hiz_siniri = hiz_siniri
+        self.dizin = dizin
+        self._gorevler: list[asyncio.Task] = []
+        self._eski_hizlar = (gonderici_modulu.GENEL_HIZ, gonderici_modulu.SOHBET_HIZ, gonderici_modulu.SOHBET_KAPASITE)
+
+    def _yavaslat(self, fonksiyon):
+        def yavas(*args):
+            if self.enjeksiyon.yavas_disk_sn:
+                self.enjeksiyon.sayilar['yavas_yazma'] += 1
+                time.sleep(self.enjeksiyon.yavas_disk_sn)
+            return fonksiyon(*args)
+        return yavas
+
+    async def baslat(self, kaynaklar: list[int]) -> None:
+        if not self.hiz_siniri:
+            gonderici_modulu.GENEL_HIZ = gonderici_modulu.SOHBET_HIZ = gonderici_modulu.SOHBET_KAPASITE = 1e9
+        # User-bot
+        user_bot.user_app = self.pyrogram
+        user_bot.kopru = TelegramKopru(self.pyrogram, 'SahteAnaBot')
+        user_bot.kaynaklar = {chat_id: user_bot.Kaynak(chat_id) for chat_id in kaynaklar}
+        user_bot.sms_bot_idleri = frozenset([SMS_BOT_ID])
+        user_bot.islenen_mesajlar = TekrarOnbellegi('user_bot', boyut=user_bot.USER_BOT_TEKRAR_BOYUTU, sure_sn=user_bot.USER_BOT_TEKRAR_SURESI_SN)
+        user_bot.IMLEC_DOSYASI = os.path.join(self.dizin, 'cursor.json')
+        user_bot.KURTARMA_ARALIGI_SN = 1.0
+        user_bot.SAYFA_BEKLEMESI_SN = 0.05
+        user_bot.floodwait_bitisi = 0.0
+        if not self.hiz_siniri:
+            user_bot.api_kovasi = TokenKovasi(1e9, 1e9)
+        # Ana Bot
+        depo = VeriDeposu(os.path.join(self.dizin, 'bot_data.json'), os.path.join(self.dizin, 'bot_data.journal'))
+        depo.gunluge_yaz = self._yavaslat(depo.gunluge_yaz)
+        depo.anlik_goruntu_yaz = self._yavaslat(depo.anlik_goruntu_yaz)
+        bot.depo = depo
+        bot.kaydedici = ArkaPlanKaydedici(depo, lambda: (bot.beklenen_numaralar, bot.sms_raporu), aralik_sn=bot.MAKS_VERI_KAYBI_SN)
+        bot.istatistik = IstatistikDeposu(os.path.join(self.dizin, 'istatistik.db'), bot.TIMEZONE)
+        bot.tekrar_onbellegi = TekrarOnbellegi('ana_bot', boyut=bot.TEKRAR_ONBELLEK_BOYUTU, sure_sn=bot.TEKRAR_ONBELLEK_SURESI_SN)
+        bot.gonderici = gonderici_modulu.Gonderici(
+            birlestirme_penceresi_sn=bot.BIRLESTIRME_PENCERESI_SN, maks_duzenleme=bot.BIRLESTIRME_MAKS_DUZENLEME
+        )
+        bot.kaydedici.baslat()
+        bot.istatistik.baslat()
+        bot.gonderici.baslat(self.bot_api)
+        self._gorevler = [
+            asyncio.create_task(self._ana_bot_tuketicisi()),
+            asyncio.create_task(user_bot.start_message_polling()),
+        ]
+        await asyncio.sleep(0.05)  # İlk çalıştırma imleç taraması
+
+    async def _ana_bot_tuketicisi(self) -> None:
+        """Telegram'ın user-bot mesajlarını Ana Bot'a sırayla teslim etmesinin yerine geçer."""
+        context = ortak.context()
+        while True:
+            metin = await self.ana_bot_kuyrugu.get()
+            try:
+                await bot.sms_isleyici_bot(ortak.guncelleme(metin, kullanici_id=bot.USER_BOT_ID), context)
+            except Exception as e:
+                # Görev ölürse sonraki tüm SMS'ler kayıp görünür; hatayı gösterip devam et
+                print(f"sms_isleyici_bot hatası: {e!r}")
+            finally:
+                self.ana_bot_kuyrugu.task_done()
+
+    async def yayinla(self, kayit: dict) -> None:
+        """Mesajı kaynak grubun geçmişine ekler ve (kaybolmadıysa) anlık dinleyiciye verir."""
+        mesaj = self.pyrogram.yayinla(kayit)
+        if (mesaj.chat.id in user_bot.kaynaklar and mesaj.from_user and mesaj.from_user.id in user_bot.sms_bot_idleri
+                and not self.enjeksiyon.olur_mu('push_kaybi', self.enjeksiyon.push_kaybi)):
+            # Pyrogram işleyicileri ayrı görevlerde çalıştırır
+            asyncio.create_task(user_bot.yeni_sms_dinleyici(self.pyrogram, mesaj))
+
+    async def durdur(self) -> None:
+        for gorev in self._gorevler:
+            gorev.cancel()
+        await asyncio.gather(*self._gorevler, return_exceptions=True)
+        await bot.gonderici.durdur(zaman_asimi=1.0)
+        await bot.kaydedici.durdur()
+        await bot.istatistik.durdur()
+        gonderici_modulu.GENEL_HIZ, gonderici_modulu.SOHBET_HIZ, gonderici_modulu.SOHBET_KAPASITE = self._eski_hizlar
+
+
+def yuzdelik(sirali: list[float], oran: float) -> float:
+    if not sirali:
+        return float('nan')
+    return sirali[min(len(sirali) - 1, int(len(sirali) * oran))]
+
+
+async def oynat(kayitlar: list[dict], hiz: float = 0.0, grup_sayisi: int = 200, enjeksiyon: Enjeksiyon | None = None,
+                hiz_siniri: bool = True, api_gecikmesi_sn: float = 0.0) -> dict:
+    """
+    Kaydı `hiz` katı hızla (0 = bekleme yok) oynatır ve ölçüm sözlüğünü döner.
+    Süreler saniye, diğerleri adettir.
+    """
+    enjeksiyon = enjeksiyon or Enjeksiyon()
+    izleyenler = izleme_kur(kayitlar, grup_sayisi)
+    kaynaklar = sorted({k['chat_id'] for k in kayitlar})
+
+    # Beklenen teslimler: SMS botundan gelen her farklı SMS, numarayı izleyen her gruba bir kez
+    beklenen = set()
+    for k in kayitlar:
+        sms = sms_ayristir(k['text']) if k.get('from_id') == SMS_BOT_ID else None
+        if sms is not None:
+            beklenen.update((sms.tekrar_anahtari(), g) for g in izleyenler.get(sms.tel_no, ()))
+
+    with tempfile.TemporaryDirectory() as dizin:
+        duzenek = Duzenek(dizin, enjeksiyon, hiz_siniri, api_gecikmesi_sn)
+        await duzenek.baslat(kaynaklar)
+        yayin_zamani: dict[str, float] = {}
+
+        en_uzun_blok = 0.0
+
+        async def nabiz():
+            nonlocal en_uzun_blok
+            while True:
+                onceki = time.perf_counter()
+                await asyncio.sleep(0.001)
+                en_uzun_blok = max(en_uzun_blok, time.perf_counter() - onceki - 0.001)
+        nabiz_gorevi = asyncio.create_task(nabiz())
+
+        baslangic = time.perf_counter()
+        ilk_t = kayitlar[0]['t'] if kayitlar else 0.0
+        for k in kayitlar:
+            if hiz:
+                bekle = (k['t'] - ilk_t) / hiz - (time.perf_counter() - baslangic)
+                if bekle > 0:
+                    await asyncio.sleep(bekle)
+            anahtar = sms_anahtari(k['text'])
+            if anahtar is not None:
+                yayin_zamani.setdefault(anahtar, time.perf_counter())
+            await duzenek.yayinla(k)
+            if not hiz:
+                await asyncio.sleep(0)
+        yayin_bitis = time.perf_counter()
+
+        # Kuyruklar boşalıp teslimler durana kadar bekle (kaçan mesajlar boşluk kurtarmayla gelir)
+        son_sayi, son_degisim = -1, time.perf_counter()
+        while time.perf_counter() - yayin_bitis < SON_BEKLEME_SN:
+            await asyncio.sleep(0.1)
+            sayi = len(duzenek.bot_api.teslimler)
+            if sayi != son_sayi:
+                son_sayi, son_degisim = sayi, time.perf_counter()
+            elif time.perf_counter() - son_degisim > max(SESSIZLIK_SN, 2 * user_bot.KURTARMA_ARALIGI_SN):
+                break
+        nabiz_gorevi.cancel()
+        await duzenek.durdur()
+
+    # Teslimleri eşleştir: birleştirilmiş mesajlarda her parça ayrı SMS'tir
+    teslim_zamani: dict[tuple, float] = {}
+    gonderim_sayisi: dict[tuple, int] = {}
+    for zaman, metot, chat_id, metin in duzenek.bot_api.teslimler:
+        for parca in metin.split(gonderici_modulu.BIRLESIK_AYIRICI):
+            anahtar = sms_anahtari(parca)
+            if anahtar is None:
+                continue
+            cift = (anahtar, chat_id)
+            teslim_zamani.setdefault(cift, zaman)
+            if metot == 'send':
+                gonderim_sayisi[cift] = gonderim_sayisi.get(cift, 0) + 1
+
+    gecikmeler = sorted(teslim_zamani[c] - yayin_zamani[c[0]] for c in teslim_zamani if c[0] in yayin_zamani)
+    son_teslim = max(teslim_zamani.values(), default=baslangic)
+    sonuc = {
+        'kayit_mesaj': len(kayitlar),
+        'beklenen_teslim': len(beklenen),
+        'teslim': len(beklenen & teslim_zamani.keys()),
+        'kayip': len(beklenen - teslim_zamani.keys()),
+        'tekrar': sum(n - 1 for n in gonderim_sayisi.values() if n > 1),
+        'beklenmeyen_teslim': len(teslim_zamani.keys() - beklenen),
+        'gecikme_p50': statistics.median(gecikmeler) if gecikmeler else float('nan'),
+        'gecikme_p95': yuzdelik(gecikmeler, 0.95),
+        'gecikme_p99': yuzdelik(gecikmeler, 0.99),
+        'gecikme_maks': gecikmeler[-1] if gecikmeler else float('nan'),
+        'verim_teslim_sn': len(teslim_zamani) / max(1e-9, son_teslim - baslangic),
+        'user_bot_iletim_sn': duzenek.pyrogram.iletilen / max(1e-9, duzenek.pyrogram.son_iletim - baslangic),
+        'en_uzun_loop_bloklamasi': en_uzun_blok,
+    }
+    sonuc.update({f'enjekte_{tur}': sayi for tur, sayi in enjeksiyon.sayilar.items()})
+    return sonuc
+
+
+def rapor_yazdir(sonuc: dict) -> None:
+    genislik = max(len(ad) for ad in sonuc)
+    for ad, deger in sonuc.items():
+        if ad.startswith(('gecikme_', 'en_uzun_')):
+            print(f"{ad:<{genislik}} {deger * 1000:>12.1f} ms")
+        elif ad.endswith('_sn'):
+            print(f"{ad:<{genislik}} {deger:>12.1f} /sn")
+        else:
+            print(f"{ad:<{genislik}} {deger:>12}")
+
+
+def calistir(olcek: float = 1.0) -> dict:
+    """calistir.py için: hız sınırları kapalı, hatasız, azami hızda sentetik kayıt; mesaj başına süreler."""
+    kayitlar = sentetik_kayit(max(200, int(2000 * olcek)))
+    sonuc = asyncio.run(oynat(kayitlar, hiz=0, hiz_siniri=False))
+    if sonuc['kayip'] or sonuc['tekrar']:
+        print(f"uyarı: {sonuc['kayip']} kayıp, {sonuc['tekrar']} tekrar")
+    return {
+        'uctan_uca_gecikme_p50': sonuc['gecikme_p50'],
+        'uctan_uca_gecikme_p99': sonuc['gecikme_p99'],
+        'uctan_uca_teslim_basina': 1 / sonuc['verim_teslim_sn'],
+    }
+
+
+def main() -> None:
+    ayristirici = argparse.ArgumentParser(description="Uçtan uca kayıt/yeniden oynatma yük düzeneği")
+    alt = ayristirici.add_subparsers(dest='komut', required=True)
+
+    uret = alt.add_parser('uret', help="Sentetik kayıt üret")
+    uret.add_argument('--cikti', required=True)
+    uret.add_argument('--sms', type=int, default=2000)
+    uret.add_argument('--saniyede', type=float, default=20.0, help="Kayıttaki ortalama SMS hızı")
+
+    kaydet = alt.add_parser('kaydet', help="Gerçek hesapla kaynak grup geçmişini kayda dök")
+    kaydet.add_argument('--cikti', required=True)
+    kaydet.add_argument('--limit', type=int, default=5000)
+
+    oynat_ = alt.add_parser('oynat', help="Kaydı yeniden oynat ve ölç")
+    oynat_.add_argument('--kayit', help="JSONL kayıt (verilmezse sentetik)")
+    oynat_.add_argument('--hiz', type=float, default=1.0, help="1 = gerçek zaman, 10 = on kat, 0 = azami")
+    oynat_.add_argument('--grup-sayisi', type=int, default=200)
+    oynat_.add_argument('--hiz-siniri-yok', action='store_true', help="Gönderici ve user-bot hız sınırlarını kapat")
+    oynat_.add_argument('--api-gecikmesi-ms', type=float, default=0.0, help="Sahte Bot API çağrı başına gecikme")
+    oynat_.add_argument('--floodwait', type=float, default=0.0, help="Pyrogram çağrısı başına FloodWait olasılığı")
+    oynat_.add_argument('--floodwait-sn', type=int, default=2)
+    oynat_.add_argument('--retryafter', type=float, default=0.0, help="Bot API gönderimi başına RetryAfter olasılığı")
+    oynat_.add_argument('--retryafter-sn', type=int, default=1)
+    oynat_.add_argument('--push-kaybi', type=float, default=0.0, help="Anlık dinleyicinin mesaj kaçırma olasılığı")
+    oynat_.add_argument('--yavas-disk', type=float, default=0.0, help="veri_kaydet disk yazması başına ek gecikme (sn)")
+    argumanlar = ayristirici.parse_args()
+
+    if argumanlar.komut == 'uret':
+        kayit_yaz(sentetik_kayit(argumanlar.sms, saniyede=argumanlar.saniyede), argumanlar.cikti)
+    elif argumanlar.komut == 'kaydet':
+        asyncio.run(gercek_kayit_al(argumanlar.cikti, argumanlar.limit))
+    else:
+        kayitlar = kayit_oku(argumanlar.kayit) if argumanlar.kayit else sentetik_kayit(2000)
+        enjeksiyon = Enjeksiyon(
+            floodwait=argumanlar.floodwait, floodwait_sn=argumanlar.floodwait_sn,
+            retryafter=argumanlar.retryafter, retryafter_sn=argumanlar.retryafter_sn,
+            push_kaybi=argumanlar.push_kaybi, yavas_disk_sn=argumanlar.yavas_disk,
+        )
+        rapor_yazdir(asyncio.run(oynat(
+            kayitlar, hiz=argumanlar.hiz, grup_sayisi=argumanlar.grup_sayisi, enjeksiyon=enjeksiyon,
+            hiz_siniri=not argumanlar.hiz_siniri_yok, api_gecikmesi_sn=argumanlar.api_gecikmesi_ms / 1000,
+        )))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+sms_isleyici_bot yönlendirme maliyetini grup sayısına göre ölçer.
+
+Her grupta 100 numara olacak şekilde 10'dan 10.000 gruba kadar sentetik veri
+kurulur ve SMS başına ortalama süre ölçülür. Ters indeks sayesinde süre grup
+sayısından bağımsız (düz) kalmalıdır.
+
+Çalıştırma: python benchmarks/bench_yonlendirme.py
+"""
+import asyncio
+import time
+
+import ortak
+from ortak import bot
+
+NUMARA_PER_GRUP = 100
+SMS_SAYISI = 2000
+
+
+def veri_kur(grup_sayisi: int) -> list[str]:
+    ortak.bota_yukle(*ortak.sentetik_veri(grup_sayisi * NUMARA_PER_GRUP, grup_sayisi, sms_orani=0))
+    # Her SMS rastgele bir gruptaki bir numaraya gelsin
+    return [ortak.numara((i * 7919) % (grup_sayisi * NUMARA_PER_GRUP)) for i in range(SMS_SAYISI)]
+
+
+def sms_metni(tel_no: str) -> str:
+    return f"Uygulama Adı: Test\nTel No: {tel_no}\nMesaj: Kodunuz 123456\nKod: 123456\nSaat: 12:00"
+
+
+async def olc(grup_sayisi: int) -> float:
+    numaralar = veri_kur(grup_sayisi)
+    context = ortak.context()
+    guncellemeler = [ortak.guncelleme(sms_metni(n), kullanici_id=bot.USER_BOT_ID) for n in numaralar]
+    baslangic = time.perf_counter()
+    for u in guncellemeler:
+        await bot.sms_isleyici_bot(u, context)
+    sure = time.perf_counter() - baslangic
+    # Gönderim kuyruğu burada ölçülmüyor (hız sınırı süreyi belirler), boşalt
+    bot.gonderici.kuyruk = asyncio.Queue()
+    return sure / len(guncellemeler)
+
+
+def calistir(olcek: float = 1.0) -> dict:
+    async def hepsi():
+        return {f"yonlendirme_sms_basina_{g}_grup": await olc(g) for g in (10, 100, 1000, 10000)}
+    return asyncio.run(hepsi())
+
+
+if __name__ == '__main__':
+    ortak.yazdir(calistir())
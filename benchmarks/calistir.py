@@ -0,0 +1,43 @@
+"""
+Tüm benchmark'ları çalıştırır, sonuçları benchmarks/sonuclar/<git sürümü>.json
+dosyasına kaydeder ve istenirse önceki bir ölçümle karşılaştırır.
+
+Örnekler:
+  python benchmarks/calistir.py                       # tam ölçek (1M numara / 500 grup)
+  python benchmarks/calistir.py --olcek 0.1           # hızlı tur
+  python benchmarks/calistir.py --karsilastir abc1234 # abc1234 ölçümüne göre % değişim
+  python benchmarks/calistir.py --sadece depo rapor
+"""
+import argparse
+import importlib
+
+import ortak
+
+BENCHMARKLAR = ['ayiklama', 'ayristirici', 'yonlendirme', 'depo', 'rapor', 'istatistik', 'aktif', 'bellek', 'guncelleme_alimi', 'uctan_uca', 'loglama']
+
+
+def main() -> None:
+    ayristirici = argparse.ArgumentParser(description="Bot sıcak yolları için benchmark paketi")
+    ayristirici.add_argument('--olcek', type=float, default=1.0, help="Veri boyutu çarpanı (varsayılan 1.0)")
+    ayristirici.add_argument('--sadece', nargs='*', choices=BENCHMARKLAR, help="Sadece bu benchmark'ları çalıştır")
+    ayristirici.add_argument('--karsilastir', metavar='SURUM', help="Bu sürümün kayıtlı sonuçlarıyla karşılaştır")
+    ayristirici.add_argument('--etiket', help="Sonuç dosyasının adı (varsayılan: git sürümü)")
+    ayristirici.add_argument('--kaydetme', action='store_true', help="Sonuçları diske yazma")
+    argumanlar = ayristirici.parse_args()
+
+    sonuclar = {}
+    for ad in argumanlar.sadece or BENCHMARKLAR:
+        print(f"--- {ad}")
+        modul = importlib.import_module(f"bench_{ad}")
+        sonuclar.update(modul.calistir(argumanlar.olcek))
+
+    onceki = ortak.sonuclari_yukle(argumanlar.karsilastir) if argumanlar.karsilastir else None
+    print()
+    ortak.yazdir(sonuclar, onceki)
+
+    if not argumanlar.kaydetme:
+        print(f"\nSonuçlar kaydedildi: {ortak.sonuclari_kaydet(sonuclar, argumanlar.etiket)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Benchmark'lar için ortak yardımcılar: bot modülünü çevrimdışı içe aktarma,
+sahte Update/context nesneleri, sentetik veri üretimi, zamanlama ve sonuç saklama.
+"""
+import datetime
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+BENCH_DIZINI = os.path.dirname(os.path.abspath(__file__))
+KOK_DIZIN = os.path.dirname(BENCH_DIZINI)
+SONUC_DIZINI = os.path.join(BENCH_DIZINI, 'sonuclar')
+
+sys.path.insert(0, KOK_DIZIN)
+
+# bot.py içe aktarılırken zorunlu ortam değişkenleri aranır; çevrimdışı ölçüm için sahte değerler
+os.environ.setdefault('BOT_TOKEN', '123456:BENCH')
+os.environ.setdefault('YETKILI_KULLANICI_IDS', '1')
+os.environ.setdefault('USER_BOT_ID', '2')
+
+import bot  # noqa: E402
+from numara_kumesi import NumaraKumesi  # noqa: E402
+from raporlama import RaporSayaci  # noqa: E402
+
+# Ölçümlere log I/O'su karışmasın
+logging.disable(logging.WARNING)
+
+
+class SahteBot:
+    """context.bot yerine geçer; gönderilen ve düzenlenen mesajları sadece sayar."""
+
+    def __init__(self):
+        self.gonderilen = 0
+        self.duzenlenen = 0
+
+    async def send_message(self, **kwargs):
+        self.gonderilen += 1
+        return SimpleNamespace(message_id=self.gonderilen)
+
+    async def edit_message_text(self, **kwargs):
+        self.duzenlenen += 1
+
+    async def send_document(self, **kwargs):
+        self.gonderilen += 1
+
+
+class SahteMesaj:
+    def __init__(self, metin: str, chat_id: int, kullanici_id: int):
+        self.text = metin
+        self.message_id = 1
+        self.chat_id = chat_id
+        self.from_user = SimpleNamespace(id=kullanici_id)
+        self.date = datetime.datetime.now(datetime.timezone.utc)
+        self.reply_to_message = None
+        self.document = None
+        self.caption = None
+        self.yanitlar = []
+
+    async def reply_text(self, text=None, **kwargs):
+        self.yanitlar.append(text)
+
+    async def reply_document(self, document=None, **kwargs):
+        self.yanitlar.append(document.read())
+
+
+def guncelleme(metin: str, chat_id: int = -1, kullanici_id: int | None = None):
+    """Komut veya SMS işleyicilerine verilecek sahte Update nesnesi."""
+    if kullanici_id is None:
+        kullanici_id = bot.YETKILI_KULLANICI_IDS[0]
+    mesaj = SahteMesaj(metin, chat_id, kullanici_id)
+    return SimpleNamespace(
+        message=mesaj,
+        effective_user=SimpleNamespace(id=kullanici_id),
+        effective_chat=SimpleNamespace(id=chat_id, title='Bench'),
+    )
+
+
+def context():
+    return SimpleNamespace(bot=SahteBot(), args=[])
+
+
+def numara(i: int) -> str:
+    return f"5{i:09d}"
+
+
+def sentetik_veri(numara_sayisi: int, grup_sayisi: int, sms_orani: float = 0.1) -> tuple[dict, dict]:
+    """
+    numara_sayisi numarayı grup_sayisi gruba eşit dağıtır; numaraların sms_orani kadarına
+    1-20 arası SMS sayacı atar. (beklenen_numaralar, sms_raporu) döner.
+    """
+    beklenen = {}
+    rapor = {}
+    grup_basina = max(1, numara_sayisi // grup_sayisi)
+    for g in range(grup_sayisi):
+        grup_id = -(1000000000 + g)
+        numaralar = [numara(g * grup_basina + i) for i in range(grup_basina)]
+        beklenen[grup_id] = NumaraKumesi(numaralar)
+        adim = max(1, int(1 / sms_orani)) if sms_orani else 0
+        if adim:
+            rapor[grup_id] = {n: 1 + (i * 7) % 20 for i, n in enumerate(numaralar[::adim])}
+    return beklenen, rapor
+
+
+def bota_yukle(beklenen: dict, rapor: dict) -> None:
+    bot.beklenen_numaralar = beklenen
+    bot.sms_raporu = {grup_id: RaporSayaci(sayilar) for grup_id, sayilar in rapor.items()}
+    bot.ters_indeksi_olustur()
+
+
+def sure_olc(fonksiyon, tekrar: int = 1) -> float:
+    """fonksiyon'u tekrar kez çalıştırır, çağrı başına en iyi süreyi (sn) döner."""
+    en_iyi = float('inf')
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        fonksiyon()
+        en_iyi = min(en_iyi, time.perf_counter() - baslangic)
+    return en_iyi
+
+
+async def async_sure_olc(fonksiyon, tekrar: int = 1) -> float:
+    """Asenkron sürümü: `await fonksiyon()` için çağrı başına en iyi süre (sn)."""
+    en_iyi = float('inf')
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        await fonksiyon()
+        en_iyi = min(en_iyi, time.perf_counter() - baslangic)
+    return en_iyi
+
+
+def git_surumu() -> str:
+    try:
+        sha = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=KOK_DIZIN, text=True).strip()
+        kirli = subprocess.call(['git', 'diff', '--quiet', 'HEAD'], cwd=KOK_DIZIN) != 0
+        return sha + ('-kirli' if kirli else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'bilinmiyor'
+
+
+def sonuclari_kaydet(sonuclar: dict, etiket: str | None = None) -> str:
+    """Sonuçları benchmarks/sonuclar/<git sürümü>.json dosyasına yazar, yolu döner."""
+    os.makedirs(SONUC_DIZINI, exist_ok=True)
+    etiket = etiket or git_surumu()
+    yol = os.path.join(SONUC_DIZINI, f"{etiket}.json")
+    with open(yol, 'w') as f:
+        json.dump({'surum': etiket, 'zaman': time.time(), 'sonuclar': sonuclar}, f, indent=2, sort_keys=True)
+    return yol
+
+
+def sonuclari_yukle(etiket: str) -> dict:
+    with open(os.path.join(SONUC_DIZINI, f"{etiket}.json")) as f:
+        return json.load(f)['sonuclar']
+
+
+def yazdir(sonuclar: dict, onceki: dict | None = None) -> None:
+    """
+    Sonuçları (ve verilmişse önceki ölçüme göre değişimi) tablo olarak yazdırır.
+    Adı '_mb' ile biten sonuçlar megabayt, diğerleri saniye cinsindendir.
+    """
+    genislik = max((len(ad) for ad in sonuclar), default=10)
+    for ad, sure in sonuclar.items():
+        if ad.endswith('_mb'):
+            satir = f"{ad:<{genislik}} {sure:>14.1f} MB"
+        else:
+            satir = f"{ad:<{genislik}} {sure * 1e6:>14.1f} µs"
+        if onceki and ad in onceki and onceki[ad]:
+            degisim = (sure - onceki[ad]) / onceki[ad] * 100
+            satir += f" {degisim:>+8.1f}%"
+        print(satir)
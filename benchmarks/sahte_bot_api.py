@@ -0,0 +1,155 @@
+"""
+Çevrimdışı ölçüm için yerel sahte Bot API sunucusu.
+
+Botun kullandığı kadarını taklit eder: getMe, getUpdates (uzun yoklama), setWebhook /
+deleteWebhook, sendMessage ve benzerleri. Bot bu sunucuya BOT_API_URL ile yönlendirilir.
+Kayıtlı/sentetik güncellemeler polling modunda getUpdates cevabıyla, webhook modunda
+botun webhook adresine gizli anahtar başlığıyla POST edilerek teslim edilir. Botun her
+giden isteği zamanıyla kaydedilir; böylece teslimden cevaba kadar geçen süre ölçülür.
+
+Bağımlılık olarak sadece standart kütüphane ve PTB'nin zaten kullandığı httpx gerekir.
+"""
+import asyncio
+import json
+import time
+from urllib.parse import parse_qsl
+
+import httpx
+
+# Cevapta sohbet bilgisi döndürülen (ve cevap beklerken eşleştirilen) metotlar
+SOHBET_METOTLARI = ('sendMessage', 'sendDocument', 'editMessageText')
+
+
+class SahteBotApi:
+    """Tek token için sahte Bot API. baslat() ile açılır, durdur() ile kapanır."""
+
+    def __init__(self, token: str):
+        self.token = token
+        self.url = None
+        self.webhook_url = None
+        self.webhook_anahtari = None
+        self.istekler: list[tuple[float, str, dict]] = []  # (zaman, metot, parametreler)
+        self._bekleyenler: list[dict] = []  # getUpdates ile verilecek güncellemeler
+        self._yeni_guncelleme = asyncio.Event()
+        self._cevap_beklenenler: dict[int, asyncio.Future] = {}  # chat_id -> ilk cevabın zamanı
+        self._mesaj_sayaci = 0
+        self._sunucu = None
+        self._istemci = None
+        self._baglantilar: set[asyncio.Task] = set()
+
+    async def baslat(self, adres: str = '127.0.0.1', port: int = 0) -> str:
+        self._sunucu = await asyncio.start_server(self._baglanti, adres, port)
+        port = self._sunucu.sockets[0].getsockname()[1]
+        self.url = f"http://{adres}:{port}"
+        self._istemci = httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_connections=100))
+        return self.url
+
+    async def durdur(self) -> None:
+        await self._istemci.aclose()
+        self._sunucu.close()
+        # Açık kalan keep-alive bağlantılarının görevlerini de kapat
+        for gorev in self._baglantilar:
+            gorev.cancel()
+        await asyncio.gather(*self._baglantilar, return_exceptions=True)
+        await self._sunucu.wait_closed()
+
+    # --- Teslim ---
+    def cevap_bekle(self, chat_id: int) -> asyncio.Future:
+        """Bu sohbete giden ilk isteğin zamanını (perf_counter) verecek Future."""
+        gelecek = asyncio.get_running_loop().create_future()
+        self._cevap_beklenenler[chat_id] = gelecek
+        return gelecek
+
+    def kuyruga_ekle(self, guncelleme: dict) -> None:
+        """Güncellemeyi bir sonraki getUpdates cevabına ekler (polling modu)."""
+        self._bekleyenler.append(guncelleme)
+        self._yeni_guncelleme.set()
+
+    async def webhooka_gonder(self, guncelleme: dict, anahtar: str | None = None) -> int:
+        """Güncellemeyi botun webhook adresine POST eder (webhook modu), HTTP durum kodunu döner."""
+        anahtar = self.webhook_anahtari if anahtar is None else anahtar
+        basliklar = {'X-Telegram-Bot-Api-Secret-Token': anahtar} if anahtar else {}
+        cevap = await self._istemci.post(self.webhook_url, json=guncelleme, headers=basliklar)
+        return cevap.status_code
+
+    # --- HTTP ---
+    async def _baglanti(self, okuyucu: asyncio.StreamReader, yazici: asyncio.StreamWriter) -> None:
+        gorev = asyncio.current_task()
+        self._baglantilar.add(gorev)
+        try:
+            while True:
+                istek_satiri = await okuyucu.readline()
+                if not istek_satiri:
+                    break
+                yol = istek_satiri.split()[1].decode()
+                basliklar = {}
+                while (satir := await okuyucu.readline()) not in (b'\r\n', b'\n', b''):
+                    ad, _, deger = satir.decode('latin-1').partition(':')
+                    basliklar[ad.strip().lower()] = deger.strip()
+                govde = await okuyucu.readexactly(int(basliklar.get('content-length', 0)))
+                sonuc = await self._cagir(yol.rsplit('/', 1)[-1], self._parametreler(basliklar, govde))
+                cevap = json.dumps({'ok': True, 'result': sonuc}).encode()
+                yazici.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(cevap)}\r\n\r\n".encode() + cevap
+                )
+                await yazici.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # CancelledError: durdur() bağlantıyı kapatıyor; asyncio.start_server iptali hata sanmasın
+            pass
+        finally:
+            self._baglantilar.discard(gorev)
+            yazici.close()
+
+    @staticmethod
+    def _parametreler(basliklar: dict, govde: bytes) -> dict:
+        tur = basliklar.get('content-type', '')
+        if tur.startswith('application/json'):
+            return json.loads(govde or b'{}')
+        if tur.startswith('application/x-www-form-urlencoded'):
+            # PTB her değeri JSON olarak kodlayıp form alanı olarak gönderir
+            parametreler = {}
+            for ad, deger in parse_qsl(govde.decode()):
+                try:
+                    parametreler[ad] = json.loads(deger)
+                except ValueError:
+                    parametreler[ad] = deger
+            return parametreler
+        return {}  # multipart (dosya yükleme): içerik ölçüm için gerekmiyor
+
+    async def _cagir(self, metot: str, parametreler: dict):
+        simdi = time.perf_counter()
+        self.istekler.append((simdi, metot, parametreler))
+        if metot == 'getMe':
+            return {'id': int(self.token.split(':')[0]), 'is_bot': True, 'first_name': 'Sahte', 'username': 'SahteBot'}
+        if metot == 'getUpdates':
+            return await self._guncellemeleri_ver(parametreler)
+        if metot == 'setWebhook':
+            self.webhook_url = parametreler.get('url')
+            self.webhook_anahtari = parametreler.get('secret_token')
+            return True
+        if metot == 'deleteWebhook':
+            self.webhook_url = self.webhook_anahtari = None
+            return True
+        if metot in SOHBET_METOTLARI:
+            chat_id = parametreler.get('chat_id')
+            gelecek = self._cevap_beklenenler.pop(chat_id, None)
+            if gelecek is not None and not gelecek.done():
+                gelecek.set_result(simdi)
+            self._mesaj_sayaci += 1
+            return {
+                'message_id': self._mesaj_sayaci, 'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'supergroup', 'title': 'Sahte'}, 'text': parametreler.get('text', ''),
+            }
+        return True
+
+    async def _guncellemeleri_ver(self, parametreler: dict) -> list:
+        ofset = parametreler.get('offset') or 0
+        self._bekleyenler = [g for g in self._bekleyenler if g['update_id'] >= ofset]
+        if not self._bekleyenler:
+            self._yeni_guncelleme.clear()
+            try:
+                await asyncio.wait_for(self._yeni_guncelleme.wait(), parametreler.get('timeout') or 0)
+            except asyncio.TimeoutError:
+                return []
+        return self._bekleyenler[:parametreler.get('limit') or 100]
@@ -1,16 +1,30 @@
 import os
 import json
-import re
+import asyncio
 import datetime
 import logging
+import secrets
+import tempfile
+import time
 from dotenv import load_dotenv
 from pytz import timezone
-from datetime import time
 
 import telegram
-from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, MessageHandler, filters, ContextTypes
+
+import veri_deposu
+from veri_deposu import VeriDeposu, ArkaPlanKaydedici
+from gonderici import Gonderici
+from kopru import soket_sunucusu_baslat
+from sms_ayristirici import sms_ayristir
+import metrikler
+import loglama
+from raporlama import RaporSayaci, CSV_ESIGI, parcalara_bol, csv_olustur
+from istatistik import IstatistikDeposu, tarih_araligi_ayikla
+from numara_aktarimi import numaralari_oku, MAKS_DOSYA_BOYUTU, KABUL_EDILEN_UZANTILAR
+from numara_kumesi import NumaraKumesi
+from tekrar_onbellegi import TekrarOnbellegi
 
 # .env dosyasını yükle
 load_dotenv()
@@ -33,6 +47,64 @@ try:
     # Bu satırdaki görünmeyen karakteri temizledim
     USER_BOT_ID = int(os.getenv('USER_BOT_ID')) 
 
+    # Veri en geç bu kadar saniyede bir diske yazılır (kabul edilen en uzun veri kaybı penceresi)
+    MAKS_VERI_KAYBI_SN = float(os.getenv('MAKS_VERI_KAYBI_SN', '2'))
+    # Bu kadar değişiklik birikirse aralık dolmadan yazılır
+    KAYIT_DEGISIKLIK_ESIGI = int(os.getenv('KAYIT_DEGISIKLIK_ESIGI', '500'))
+    # Ayarlanırsa user-bot'tan SMS'ler ayrıca bu Unix soketinden de kabul edilir (KOPRU_MODU=soket)
+    KOPRU_SOKET_YOLU = os.getenv('KOPRU_SOKET_YOLU')
+    # Ayarlanırsa Prometheus metrikleri 127.0.0.1:<port>/metrics adresinden yayınlanır
+    METRIK_PORTU = int(os.getenv('METRIK_PORTU', '0'))
+    # Geçmiş istatistiklerde saatlik kayıtlar bu kadar gün, günlük özetler bu kadar gün saklanır
+    SAATLIK_SAKLAMA_GUN = int(os.getenv('SAATLIK_SAKLAMA_GUN', '14'))
+    GUNLUK_SAKLAMA_GUN = int(os.getenv('GUNLUK_SAKLAMA_GUN', '400'))
+    # Aynı SMS (Tel No, Kod, Saat) bu süre içinde tekrar gelirse yönlendirilmez ve sayılmaz
+    TEKRAR_ONBELLEK_BOYUTU = int(os.getenv('TEKRAR_ONBELLEK_BOYUTU', '10000'))
+    TEKRAR_ONBELLEK_SURESI_SN = float(os.getenv('TEKRAR_ONBELLEK_SURESI_SN', '600'))
+    # Ayarlanırsa tekrar önbelleği kapanışta bu dosyaya yazılır ve açılışta geri yüklenir
+    TEKRAR_ONBELLEK_DOSYASI = os.getenv('TEKRAR_ONBELLEK_DOSYASI')
+    # > 0 ise aynı numaraya bu süre içinde gelen SMS'ler gruba yeni mesaj olarak değil,
+    # ilk mesaj düzenlenerek (en yeni kod en üstte) eklenir. 0 = kapalı.
+    BIRLESTIRME_PENCERESI_SN = float(os.getenv('BIRLESTIRME_PENCERESI_SN', '0'))
+    # Bir mesaja en fazla bu kadar SMS eklenir (düzenleme sınırı), sonrası yeni mesaj açar
+    BIRLESTIRME_MAKS_DUZENLEME = int(os.getenv('BIRLESTIRME_MAKS_DUZENLEME', '5'))
+    # Gün sonu raporunun saati (Türkiye saati, SS:DD)
+    RAPOR_SAATI = datetime.time.fromisoformat(os.getenv('RAPOR_SAATI', '23:55'))
+    # Bot rapor saatinde kapalıysa açılıştan bu kadar saniye sonra kaçırılan rapor gönderilir
+    RAPOR_TELAFI_GECIKMESI_SN = float(os.getenv('RAPOR_TELAFI_GECIKMESI_SN', '60'))
+    # Güncellemelerin alınma yolu: 'polling' (varsayılan, getUpdates) veya 'webhook' (gömülü HTTP sunucusu)
+    CALISMA_MODU = os.getenv('CALISMA_MODU', 'polling')
+    # Webhook modunda Telegram'ın güncellemeleri POST edeceği dışarıdan erişilebilir adres (ör. https://alan.adi/telegram)
+    WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+    WEBHOOK_DINLEME_ADRESI = os.getenv('WEBHOOK_DINLEME_ADRESI', '0.0.0.0')
+    WEBHOOK_PORTU = int(os.getenv('WEBHOOK_PORTU', '8443'))
+    # Gömülü sunucunun dinlediği yol; ters vekil (reverse proxy) WEBHOOK_URL'yi buraya yönlendirmeli
+    WEBHOOK_YOLU = os.getenv('WEBHOOK_YOLU', 'telegram')
+    # Telegram her isteğe bu anahtarı başlıkta ekler, eşleşmeyen istekler reddedilir.
+    # Verilmezse her açılışta rastgele üretilir (setWebhook ile yeniden kaydedildiği için yeterli).
+    WEBHOOK_GIZLI_ANAHTAR = os.getenv('WEBHOOK_GIZLI_ANAHTAR') or secrets.token_urlsafe(32)
+    # Telegram'ın webhook'a aynı anda açabileceği en fazla bağlantı (1-100)
+    WEBHOOK_MAKS_BAGLANTI = int(os.getenv('WEBHOOK_MAKS_BAGLANTI', '40'))
+    # Aynı anda işlenebilecek güncelleme sayısı (1 = sırayla; /ver, /sil belgeleri zaten ayrıca çalışır)
+    ESZAMANLI_GUNCELLEME = int(os.getenv('ESZAMANLI_GUNCELLEME', '1'))
+    # Ayarlanırsa Bot API istekleri api.telegram.org yerine bu sunucuya gider (yerel Bot API sunucusu, test düzeneği)
+    BOT_API_URL = os.getenv('BOT_API_URL')
+    # Log seviyesi; kategori bazında ayrıca LOG_SEVIYELERI ile (ör. "gonderici=WARNING,telegram=INFO")
+    LOG_SEVIYESI = loglama.seviye_ayikla(os.getenv('LOG_SEVIYESI', 'INFO'))
+    # httpx her Bot API isteğini INFO'da loglar; varsayılan olarak susturulur
+    LOG_SEVIYELERI = loglama.seviyeleri_ayikla(os.getenv('LOG_SEVIYELERI', 'httpx=WARNING'))
+    # 'json' (satır başına bir JSON kaydı) veya 'metin' (eski düz biçim)
+    LOG_BICIMI = os.getenv('LOG_BICIMI', 'json')
+    # Aynı log satırı bu pencerede en fazla bu kadar yazılır, fazlası sayılıp bastırılır (0 = örnekleme yok)
+    LOG_ORNEKLEME_PENCERESI_SN = float(os.getenv('LOG_ORNEKLEME_PENCERESI_SN', '10'))
+    LOG_ORNEKLEME_ADEDI = int(os.getenv('LOG_ORNEKLEME_ADEDI', '20'))
+    if LOG_BICIMI not in ('json', 'metin'):
+        raise ValueError(f"Geçersiz LOG_BICIMI: {LOG_BICIMI} (json veya metin olmalı).")
+    if CALISMA_MODU not in ('polling', 'webhook'):
+        raise ValueError(f"Geçersiz CALISMA_MODU: {CALISMA_MODU} (polling veya webhook olmalı).")
+    if CALISMA_MODU == 'webhook' and not WEBHOOK_URL:
+        raise ValueError("Webhook modunda WEBHOOK_URL tanımlanmalıdır.")
+
     if not all([BOT_TOKEN, YETKILI_KULLANICI_IDS, USER_BOT_ID]):
         raise ValueError("Ortam değişkenlerinin hepsi tanımlanmalıdır (BOT_TOKEN, YETKILI_KULLANICI_IDS, USER_BOT_ID).")
 
@@ -41,44 +113,118 @@ except (TypeError, ValueError) as e:
     exit(1) # Hata varsa botu durdur
 
 # --- KULLANICIYA ÖZEL AYARLAR ---
-# Gün sonu raporlarının gönderileceği ID
-RAPOR_ALICISI_ID = 6672759317 # <<< Burası senin ID'n
+# Gün sonu raporlarının gönderileceği ID'ler; RAPOR_ALICI_IDS ile (virgülle ayrılmış) değiştirilebilir
+RAPOR_ALICILARI = [int(id.strip()) for id in os.getenv('RAPOR_ALICI_IDS', '6672759317').split(',') if id.strip()] # <<< Varsayılan: senin ID'n
 
-# Kalıcı veri dosyası
+# Kalıcı veri dosyası (anlık görüntü) ve değişiklik günlüğü
 VERI_DOSYASI = 'bot_data.json'
+GUNLUK_DOSYASI = 'bot_data.journal'
+# Saatlik/günlük geçmiş SMS istatistikleri (SQLite)
+ISTATISTIK_DOSYASI = 'sms_istatistik.db'
+# Son gönderilen gün sonu raporunun tarihi (kaçırılan raporu açılışta telafi etmek için)
+RAPOR_DURUM_DOSYASI = 'gun_sonu_raporu.json'
+# Gün sonu raporu hiçbir alıcıya gönderilemezse tekrar deneme aralığı
+RAPOR_TEKRAR_DENEME_SN = 900
 # Saat Dilimi Ayarı (Türkiye Saati)
 TIMEZONE = timezone('Europe/Istanbul')
 
-# Basit bir günlük tutma (logging) ayarı
-logging.basicConfig(
-  format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-  level=logging.INFO
+# Loglar kuyruk üzerinden ayrı thread'de yazılır; event loop log I/O'su için beklemez
+loglama.kur(
+  seviye=LOG_SEVIYESI,
+  kategori_seviyeleri=LOG_SEVIYELERI,
+  bicim=LOG_BICIMI,
+  ornekleme_penceresi_sn=LOG_ORNEKLEME_PENCERESI_SN,
+  ornekleme_adedi=LOG_ORNEKLEME_ADEDI
 )
 logger = logging.getLogger(__name__)
 
+depo = VeriDeposu(VERI_DOSYASI, GUNLUK_DOSYASI)
+metrikler.kayit.gosterge('izlenen_numara_sayisi', "En az bir grubun izlediği farklı numara sayısı").fonksiyon_ayarla(lambda: len(numara_gruplari))
+metrikler.kayit.gosterge('izlenen_grup_sayisi', "Numara izleyen grup sayısı").fonksiyon_ayarla(lambda: len(beklenen_numaralar))
+kaydedici = ArkaPlanKaydedici(
+  depo,
+  lambda: (beklenen_numaralar, sms_raporu),
+  aralik_sn=MAKS_VERI_KAYBI_SN,
+  degisiklik_esigi=KAYIT_DEGISIKLIK_ESIGI
+)
+
+istatistik = IstatistikDeposu(
+  ISTATISTIK_DOSYASI,
+  TIMEZONE,
+  saatlik_saklama_gun=SAATLIK_SAKLAMA_GUN,
+  gunluk_saklama_gun=GUNLUK_SAKLAMA_GUN,
+  aralik_sn=MAKS_VERI_KAYBI_SN
+)
+
+tekrar_onbellegi = TekrarOnbellegi('ana_bot', boyut=TEKRAR_ONBELLEK_BOYUTU, sure_sn=TEKRAR_ONBELLEK_SURESI_SN)
+
+gonderici = Gonderici(birlestirme_penceresi_sn=BIRLESTIRME_PENCERESI_SN, maks_duzenleme=BIRLESTIRME_MAKS_DUZENLEME)
+kopru_sunucusu = None # KOPRU_SOKET_YOLU ayarlıysa user-bot'tan SMS alan Unix soket sunucusu
+metrik_sunucusu = None
+
+# --- Metrikler ---
+SMS_ASAMA_SURESI = metrikler.kayit.histogram('sms_asama_suresi_saniye', "SMS işleme aşamalarının süresi", ('asama',))
+KOPRU_GECIKMESI = SMS_ASAMA_SURESI.etiket('kopru')           # User-bot gönderimi -> Ana Bot'a ulaşma (Telegram modu)
+AYRISTIRMA_SURESI = SMS_ASAMA_SURESI.etiket('ayristirma')
+YONLENDIRME_SURESI = SMS_ASAMA_SURESI.etiket('yonlendirme')  # Hedef grup araması + kuyruğa alma + sayaçlar
+SMS_ISLENEN = metrikler.kayit.sayac('sms_islenen_toplam', "Ana Bot'a ulaşan SMS'ler", ('sonuc',))
+
 # --- Kalıcı Veri Yapısı ---
-beklenen_numaralar = {} # Anahtar: hedef_grup_id, Değer: set(numaralar)
-sms_raporu = {}    # Anahtar: hedef_grup_id, Değer: {tel_no: count}
+beklenen_numaralar = {} # Anahtar: hedef_grup_id, Değer: NumaraKumesi (sıralı int64 dizisi)
+sms_raporu = {}    # Anahtar: hedef_grup_id, Değer: RaporSayaci ({tel_no: count} + toplam + ilk-K)
+numara_gruplari = {} # Ters indeks -> Anahtar: int(tel_no), Değer: tuple(hedef_grup_id)
+
+def grup_kumesi(grup_id: int) -> NumaraKumesi:
+  """Grubun numara kümesini döner; yoksa boş küme oluşturur."""
+  numaralar = beklenen_numaralar.get(grup_id)
+  if numaralar is None:
+    numaralar = beklenen_numaralar[grup_id] = NumaraKumesi()
+  return numaralar
+
+def ters_indeksi_olustur():
+  """beklenen_numaralar'dan numara -> grup ters indeksini baştan kurar."""
+  global numara_gruplari
+  numara_gruplari = {}
+  for grup_id, numaralar in beklenen_numaralar.items():
+    ters_indekse_ekle(grup_id, numaralar.tamsayilar())
+
+def ters_indekse_ekle(grup_id: int, numaralar) -> None:
+  """Verilen numaraları (int) ters indekste grup_id'ye bağlar."""
+  # Tek grupta olan numaralar aynı tuple nesnesini paylaşır
+  tekli = (grup_id,)
+  for numara in numaralar:
+    gruplar = numara_gruplari.get(numara)
+    if gruplar is None:
+      numara_gruplari[numara] = tekli
+    elif grup_id not in gruplar:
+      numara_gruplari[numara] = gruplar + tekli
+
+def ters_indeksten_cikar(grup_id: int, numaralar) -> None:
+  """Verilen numaraların (int) grup_id ile bağını ters indeksten kaldırır."""
+  for numara in numaralar:
+    gruplar = numara_gruplari.get(numara)
+    if gruplar is None or grup_id not in gruplar:
+      continue
+    if len(gruplar) == 1:
+      del numara_gruplari[numara]
+    else:
+      numara_gruplari[numara] = tuple(g for g in gruplar if g != grup_id)
 
 def veri_yukle():
-  """Kayıtlı verileri dosyadan belleğe yükler."""
+  """Kayıtlı verileri anlık görüntü + günlükten belleğe yükler."""
   global beklenen_numaralar, sms_raporu
-  if os.path.exists(VERI_DOSYASI):
-    with open(VERI_DOSYASI, 'r') as f:
-      data = json.load(f)
-      beklenen_numaralar = {int(k): set(v) for k, v in data.get('beklenen_numaralar', {}).items()}
-      sms_raporu = {int(k): v for k, v in data.get('sms_raporu', {}).items()}
+  beklenen_numaralar, sms_raporu = depo.yukle()
+  ters_indeksi_olustur()
   logger.info("Veri başarıyla yüklendi.")
 
-def veri_kaydet():
-  """Bellekteki verileri dosyaya kaydeder."""
-  data = {
-    'beklenen_numaralar': {k: list(v) for k, v in beklenen_numaralar.items()},
-    'sms_raporu': sms_raporu
-  }
-  with open(VERI_DOSYASI, 'w') as f:
-    json.dump(data, f, indent=4)
-  logger.info("Veri başarıyla kaydedildi.")
+def veri_kaydet(*kayitlar: dict):
+  """
+  Değişiklik kayıtlarını depoya ekler ve veriyi kirli olarak işaretler.
+  Diske yazma işini arka plan kaydedicisi event loop dışında yapar.
+  """
+  for kayit in kayitlar:
+    depo.ekle(kayit)
+  kaydedici.kirli_isaretle(len(kayitlar))
 
 # --- Yardımcı Fonksiyonlar ---
 
@@ -90,20 +236,6 @@ def numaralari_ayikla(metin: str) -> set:
       numaralar.add(satir)
   return numaralar
 
-def mesajdan_tel_no_bul(mesaj_metni: str) -> str | None:
-  """Mesaj metninden 'Tel No: XXXXXXXXXX' kısmını bulur."""
-  eslesme = re.search(r'Tel No:\s*(\d{10})', mesaj_metni)
-  if eslesme:
-    return eslesme.group(1)
-  return None
-
-def mesajdan_bilgi_al(mesaj_metni: str, anahtar: str) -> str | None:
-  """Mesaj metninden belirli bir anahtara ait değeri bulur."""
-  eslesme = re.search(rf'{anahtar}:\s*(.*?)(?:\n|$)', mesaj_metni, re.IGNORECASE)
-  if eslesme:
-    return eslesme.group(1).strip()
-  return None
-
 # Yetki kontrol decorator'ı
 def yetkili_mi(func):
   """Sadece YETKILI_KULLANICI_IDS listesindekilerin komutları çalıştırmasına izin veren decorator."""
@@ -118,11 +250,84 @@ def yetkili_mi(func):
     return await func(update, context)
   return wrapper
 
+async def belgeden_aktar(update: Update, belge: telegram.Document, silme: bool) -> None:
+  """
+  .txt/.csv belgesindeki numaraları parça parça gruba ekler (ya da gruptan siler).
+  Parçalar arasında event loop'a sıra verilir; günlüğe içe aktarım başına tek kayıt yazılır.
+  """
+  hedef_grup_id = update.message.chat_id
+  if not (belge.file_name or '').lower().endswith(KABUL_EDILEN_UZANTILAR):
+    await update.message.reply_text("⚠️ Hata: sadece .txt veya .csv dosyası kabul edilir.")
+    return
+  if belge.file_size and belge.file_size > MAKS_DOSYA_BOYUTU:
+    await update.message.reply_text("⚠️ Hata: dosya 20 MB'tan büyük olamaz.")
+    return
+
+  telegram_dosyasi = await belge.get_file()
+  degisenler = []
+  okunan = gecersiz = 0
+  with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as dosya:
+    await telegram_dosyasi.download_to_memory(dosya)
+    dosya.seek(0)
+    for numaralar, parca_gecersiz in numaralari_oku(dosya):
+      okunan += len(numaralar)
+      gecersiz += parca_gecersiz
+      # Küme her parçada yeniden alınır: arada /silhepsi çalışmış olabilir
+      if silme:
+        mevcut = beklenen_numaralar.get(hedef_grup_id)
+        etkilenenler = mevcut.cikar(numaralar) if mevcut is not None else []
+        ters_indeksten_cikar(hedef_grup_id, etkilenenler)
+      else:
+        etkilenenler = grup_kumesi(hedef_grup_id).ekle(numaralar)
+        ters_indekse_ekle(hedef_grup_id, etkilenenler)
+      degisenler.extend(etkilenenler)
+      # Büyük dosyalarda SMS yönlendirmesi içe aktarımın bitmesini beklemesin
+      await asyncio.sleep(0)
+
+  # Sadece hâlâ geçerli olan değişiklikler günlüğe yazılır (içe aktarım sürerken
+  # başka bir komut aynı numaraları değiştirmiş olabilir)
+  mevcut = beklenen_numaralar.get(hedef_grup_id) or NumaraKumesi()
+  if silme:
+    kalici = [n for n in degisenler if n not in mevcut]
+    if kalici:
+      veri_kaydet({'o': veri_deposu.SIL, 'g': hedef_grup_id, 'n': kalici})
+    await update.message.reply_text(
+      f"✅ Dosyadan {len(degisenler)} numara bu gruptan kaldırıldı. "
+      f"{okunan - len(degisenler)} numara grupta yoktu, {gecersiz} geçersiz değer atlandı. "
+      f"Bu grupta toplamda {len(mevcut)} numara aktif."
+    )
+  else:
+    kalici = [n for n in degisenler if n in mevcut]
+    if kalici:
+      veri_kaydet({'o': veri_deposu.EKLE, 'g': hedef_grup_id, 'n': kalici})
+    await update.message.reply_text(
+      f"✅ Dosyadan {len(degisenler)} numara bu gruba eklendi. "
+      f"{okunan - len(degisenler)} numara zaten vardı veya dosyada tekrarlandı, {gecersiz} geçersiz değer atlandı. "
+      f"Bu grupta toplamda {len(mevcut)} numara aktif."
+    )
+  logger.info(
+    f"Hedef Grup ID {hedef_grup_id} için '{belge.file_name}' dosyasından {len(degisenler)} numara "
+    f"{'silindi' if silme else 'eklendi'} ({okunan} okunan, {gecersiz} geçersiz)."
+  )
+
 # --- Komut İşleyicileri ---
 
+@yetkili_mi
+async def belge_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+  """Açıklaması /ver veya /sil olan .txt/.csv belgeleri."""
+  komut = update.message.caption.split()[0].split('@')[0].lower()
+  await belgeden_aktar(update, update.message.document, silme=(komut == '/sil'))
+
+
 @yetkili_mi
 async def ver_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
   hedef_grup_id = update.message.chat_id
+  # Bir belgeye yanıt olarak yazılan /ver: numaralar dosyadan okunur
+  yanitlanan = update.message.reply_to_message
+  if yanitlanan and yanitlanan.document:
+    await belgeden_aktar(update, yanitlanan.document, silme=False)
+    return
+
   argumanlar = update.message.text.split('/ver', 1)[-1].strip()
   yeni_numaralar = numaralari_ayikla(argumanlar)
 
@@ -130,11 +335,12 @@ async def ver_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     await update.message.reply_text("⚠️ Hata: yanlış komut yazdın.")
     return
 
-  mevcut_numaralar = beklenen_numaralar.get(hedef_grup_id, set())
-  mevcut_numaralar.update(yeni_numaralar)
-  beklenen_numaralar[hedef_grup_id] = mevcut_numaralar
+  mevcut_numaralar = grup_kumesi(hedef_grup_id)
+  eklenenler = mevcut_numaralar.ekle(yeni_numaralar)
+  ters_indekse_ekle(hedef_grup_id, eklenenler)
 
-  veri_kaydet()
+  if eklenenler:
+    veri_kaydet({'o': veri_deposu.EKLE, 'g': hedef_grup_id, 'n': eklenenler})
 
   await update.message.reply_text(
     f"✅ {len(yeni_numaralar)} numara bu gruba eklendi. Bu grupta toplamda {len(mevcut_numaralar)} numara aktif."
@@ -145,6 +351,11 @@ async def ver_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
 @yetkili_mi
 async def sil_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
   hedef_grup_id = update.message.chat_id
+  yanitlanan = update.message.reply_to_message
+  if yanitlanan and yanitlanan.document:
+    await belgeden_aktar(update, yanitlanan.document, silme=True)
+    return
+
   argumanlar = update.message.text.split('/sil', 1)[-1].strip()
   silinecek_numaralar = numaralari_ayikla(argumanlar)
 
@@ -157,14 +368,12 @@ async def sil_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     await update.message.reply_text("⚠️ Hata: Bu grupta zaten izlenen kayıtlı numara bulunmuyor.")
     return
 
-  silinen_sayisi = 0
-  for numara in silinecek_numaralar:
-    if numara in mevcut_numaralar:
-      mevcut_numaralar.remove(numara)
-      silinen_sayisi += 1
+  silinenler = mevcut_numaralar.cikar(silinecek_numaralar)
+  silinen_sayisi = len(silinenler)
+  ters_indeksten_cikar(hedef_grup_id, silinenler)
 
-  beklenen_numaralar[hedef_grup_id] = mevcut_numaralar
-  veri_kaydet()
+  if silinenler:
+    veri_kaydet({'o': veri_deposu.SIL, 'g': hedef_grup_id, 'n': silinenler})
 
   if silinen_sayisi > 0:
     await update.message.reply_text(
@@ -180,8 +389,8 @@ async def sil_hepsi_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -
   hedef_grup_id = update.message.chat_id
   if hedef_grup_id in beklenen_numaralar:
     silinen_sayisi = len(beklenen_numaralar[hedef_grup_id])
-    del beklenen_numaralar[hedef_grup_id]
-    veri_kaydet()
+    ters_indeksten_cikar(hedef_grup_id, beklenen_numaralar.pop(hedef_grup_id).tamsayilar())
+    veri_kaydet({'o': veri_deposu.SIL_HEPSI, 'g': hedef_grup_id})
 
     await update.message.reply_text(
       f"✅ {silinen_sayisi} numaranın tamamı bu gruptan kaldırıldı."
@@ -191,52 +400,192 @@ async def sil_hepsi_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     await update.message.reply_text("Bu grupta zaten kayıtlı numara bulunmuyor.")
 
 
+def aktif_sayfasi(grup_id: int, sonra: str | None = None, once: str | None = None):
+  """
+  /aktif için bir sayfanın metnini ve gezinme klavyesini döner; grupta numara yoksa (None, None).
+  Düğmeler imleç olarak sayfanın ilk/son numarasını taşır (callback_data: aktif|s|<numara> / aktif|o|<numara>).
+  """
+  aktif_numaralar = beklenen_numaralar.get(grup_id)
+  if not aktif_numaralar:
+    return None, None
+
+  # Küme zaten sıralı: imleç bisect ile bulunur, sayfa başına O(log n + sayfa)
+  sayfa, baslangic = aktif_numaralar.sayfa(sonra=sonra, once=once)
+  if not sayfa:
+    # İmlecin ötesinde numara kalmadı (ör. arada silindi); ilk sayfaya dön
+    sayfa, baslangic = aktif_numaralar.sayfa()
+  toplam = len(aktif_numaralar)
+
+  mesaj = f"AKTİF NUMARALAR ({toplam} numara, {baslangic + 1}-{baslangic + len(sayfa)} arası)\n\n"
+  mesaj += '\n'.join([f"• `{numara}`" for numara in sayfa])
+  mesaj += "\n\nBu numaralara gelen SMS'ler bu gruba yönlendirilir."
+
+  dugmeler = []
+  if baslangic > 0:
+    dugmeler.append(InlineKeyboardButton("◀️ Önceki", callback_data=f"aktif|o|{sayfa[0]}"))
+  if baslangic + len(sayfa) < toplam:
+    dugmeler.append(InlineKeyboardButton("Sonraki ▶️", callback_data=f"aktif|s|{sayfa[-1]}"))
+  return mesaj, InlineKeyboardMarkup([dugmeler]) if dugmeler else None
+
+
 @yetkili_mi
 async def aktif_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
   grup_id = update.message.chat_id
-  aktif_numaralar = beklenen_numaralar.get(grup_id)
+  mesaj, klavye = aktif_sayfasi(grup_id)
 
-  if not aktif_numaralar:
+  if mesaj is None:
     await update.message.reply_text("Bu grupta aktif numara bulunmamaktadır.")
     return
 
-  mesaj = f"AKTİF NUMARALAR ({len(aktif_numaralar)} numara)\n\n"
-  numara_listesi = sorted(list(aktif_numaralar))
-  mesaj += '\n'.join([f"• `{numara}`" for numara in numara_listesi])
-  mesaj += "\n\nBu numaralara gelen SMS'ler bu gruba yönlendirilir."
-
   await update.message.reply_text(
     text=mesaj,
+    reply_markup=klavye,
     parse_mode=telegram.constants.ParseMode.MARKDOWN
   )
   logger.info(f"Grup ID {grup_id}'ye aktif numaralar listesi gönderildi.")
 
 
+async def aktif_sayfa_dugmesi(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+  """/aktif mesajındaki Önceki/Sonraki düğmeleri: aynı mesajı bir sonraki sayfayla düzenler."""
+  sorgu = update.callback_query
+  if update.effective_user.id not in YETKILI_KULLANICI_IDS:
+    await sorgu.answer("❌ Yetkiniz yoktur.", show_alert=True)
+    return
+
+  _, yon, imlec = sorgu.data.split('|', 2)
+  if not imlec.isdigit():
+    await sorgu.answer()
+    return
+  mesaj, klavye = aktif_sayfasi(
+    sorgu.message.chat_id,
+    sonra=imlec if yon == 's' else None,
+    once=imlec if yon == 'o' else None
+  )
+  await sorgu.answer()
+  if mesaj is None:
+    await sorgu.edit_message_text("Bu grupta aktif numara bulunmamaktadır.")
+    return
+  try:
+    await sorgu.edit_message_text(text=mesaj, reply_markup=klavye, parse_mode=telegram.constants.ParseMode.MARKDOWN)
+  except telegram.error.BadRequest as e:
+    # Aynı düğmeye iki kez basılınca içerik değişmez; Telegram bunu hata olarak döner
+    if 'not modified' not in str(e).lower():
+      raise
+
+
+@yetkili_mi
+async def ara_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+  grup_id = update.message.chat_id
+  onek = context.args[0] if context.args else ''
+  if not onek.isdigit() or len(onek) > 10:
+    await update.message.reply_text("Kullanım: /ara <numaranın başı> (ör. /ara 532)")
+    return
+
+  aktif_numaralar = beklenen_numaralar.get(grup_id)
+  eslesenler, toplam = aktif_numaralar.onek_ara(onek) if aktif_numaralar else ([], 0)
+  if not toplam:
+    await update.message.reply_text(f"Bu grupta {onek} ile başlayan aktif numara yok.")
+    return
+
+  mesaj = f"{onek} İLE BAŞLAYAN NUMARALAR ({toplam} numara)\n\n"
+  mesaj += '\n'.join([f"• `{numara}`" for numara in eslesenler])
+  if toplam > len(eslesenler):
+    mesaj += f"\n\n(İlk {len(eslesenler)} sonuç gösterildi. Aramayı daraltmak için daha uzun bir başlangıç yazın.)"
+
+  await update.message.reply_text(text=mesaj, parse_mode=telegram.constants.ParseMode.MARKDOWN)
+  logger.info(f"Grup ID {grup_id}'de '{onek}' araması: {toplam} sonuç.")
+
+
+async def raporu_gonder(metin_gonder, belge_gonder, baslik: str, rapor_data: RaporSayaci, son: str, dosya_adi: str) -> None:
+  """
+  Tam raporu gönderir: küçük raporlar Telegram sınırını aşmayan mesaj parçaları halinde,
+  büyük raporlar (CSV_ESIGI üzeri numara) CSV belgesi olarak. Tam metin bellekte hiç
+  birleştirilmez.
+  """
+  if len(rapor_data) > CSV_ESIGI:
+    dosya = csv_olustur(['Tel No', 'SMS'], rapor_data.sirali())
+    with dosya:
+      await belge_gonder(document=dosya, filename=dosya_adi, caption=f"{baslik}\n{son}")
+    return
+
+  satirlar = (f"• {tel_no}: {count} SMS" for tel_no, count in rapor_data.sirali())
+  for parca in parcalara_bol(baslik, satirlar, son):
+    await metin_gonder(text=parca, parse_mode=telegram.constants.ParseMode.MARKDOWN)
+
+
+async def gecmis_raporu_gonder(update: Update, grup_id: int, baslangic: datetime.date, bitis: datetime.date) -> None:
+  """Önceden toplanmış günlük istatistiklerden tarih aralığı raporu gönderir."""
+  sonuc = await istatistik.sorgula(grup_id, baslangic, bitis)
+  aralik = baslangic.isoformat() if baslangic == bitis else f"{baslangic.isoformat()} - {bitis.isoformat()}"
+
+  if not sonuc['toplam']:
+    await update.message.reply_text(f"{aralik} aralığında bu grupta SMS kaydı bulunmamaktadır.")
+    return
+
+  satirlar = [f"• {tel_no}: {count} SMS" for tel_no, count in sonuc['en_cok']]
+  if sonuc['numara_sayisi'] > len(sonuc['en_cok']):
+    satirlar.append(f"\n(En çok SMS alan {len(sonuc['en_cok'])} numara gösterildi, toplam {sonuc['numara_sayisi']} numara.)")
+
+  await update.message.reply_text(
+    text=f"GEÇMİŞ SMS RAPORU ({aralik})\n\n" + "\n".join(satirlar) + f"\n\n--- \nToplam Gelen SMS: {sonuc['toplam']}",
+    parse_mode=telegram.constants.ParseMode.MARKDOWN
+  )
+  logger.info(f"Grup ID {grup_id}'ye {aralik} geçmiş raporu gönderildi.")
+
+
 @yetkili_mi
 async def rapor_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
   grup_id = update.message.chat_id
+
+  # "/rapor 7g", "/rapor 2026-10-01 2026-10-15": geçmiş istatistiklerden
+  if context.args and context.args[0].lower() != 'tum':
+    aralik = tarih_araligi_ayikla(context.args, datetime.datetime.now(TIMEZONE).date())
+    if aralik is None:
+      await update.message.reply_text(
+        "Kullanım: /rapor, /rapor tum, /rapor 7g, /rapor 2026-10-01 veya /rapor 2026-10-01 2026-10-15"
+      )
+      return
+    await gecmis_raporu_gonder(update, grup_id, *aralik)
+    return
+
   rapor_data = sms_raporu.get(grup_id)
 
   if not rapor_data:
     await update.message.reply_text("Bu grupta henüz SMS kaydı bulunmamaktadır.")
     return
 
-  mesaj = "ANLIK SMS DURUM RAPORU \n\n"
-  toplam_sms = 0
+  son = f"\n--- \nToplam Gelen SMS: {rapor_data.toplam}"
 
-  for tel_no, count in sorted(rapor_data.items(), key=lambda item: item[1], reverse=True):
-    mesaj += f"• {tel_no}: {count} SMS\n"
-    toplam_sms += count
+  # "/rapor tum": tüm numaralar (parça parça mesaj veya CSV)
+  if context.args and context.args[0].lower() == 'tum':
+    await raporu_gonder(
+      update.message.reply_text, update.message.reply_document,
+      "ANLIK SMS DURUM RAPORU (TAM)\n", rapor_data, son, f"rapor_{grup_id}.csv"
+    )
+    logger.info(f"Grup ID {grup_id}'ye tam durum raporu gönderildi.")
+    return
 
-  mesaj += f"\n--- \nToplam Gelen SMS: {toplam_sms}"
+  # Varsayılan: artımlı tutulan ilk-K listesi, O(K)
+  en_cok = rapor_data.en_cok()
+  satirlar = [f"• {tel_no}: {count} SMS" for tel_no, count in en_cok]
+  if len(rapor_data) > len(en_cok):
+    satirlar.append(f"\n(En çok SMS alan {len(en_cok)} numara gösterildi, toplam {len(rapor_data)} numara. Tam liste: /rapor tum)")
 
   await update.message.reply_text(
-    text=mesaj,
+    text="ANLIK SMS DURUM RAPORU \n\n" + "\n".join(satirlar) + "\n" + son,
     parse_mode=telegram.constants.ParseMode.MARKDOWN
   )
   logger.info(f"Grup ID {grup_id}'ye anlık durum raporu gönderildi.")
 
 
+@yetkili_mi
+async def metrik_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+  ozet = metrikler.kayit.ozet() or "Henüz ölçüm yok."
+  # Telegram mesaj sınırını aşmamak için kırp
+  await update.message.reply_text(f"METRİKLER\n\n{ozet[:4000]}")
+  logger.info(f"Metrik özeti kullanıcı ID {update.effective_user.id}'ye gönderildi.")
+
+
 @yetkili_mi
 async def id_komutu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
   chat_id = update.message.chat_id
@@ -263,130 +612,335 @@ async def sms_isleyici_bot(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
   # Sadece User-bot'un ID'sinden gelen mesajları işle
   if gelen_mesaj.from_user.id != USER_BOT_ID:
-    logger.warning(f"SMS işleyici: {gelen_mesaj.from_user.id} ID'li kullanıcıdan gelen mesaj yoksayıldı (beklenen {USER_BOT_ID}).")
+    logger.warning("SMS işleyici: %s ID'li kullanıcıdan gelen mesaj yoksayıldı (beklenen %s).", gelen_mesaj.from_user.id, USER_BOT_ID)
     return
 
-  logger.info(f"Ana bot user-bot'tan SMS aldı: {gelen_mesaj.text[:50]}...")
+  logger.debug("Ana bot user-bot'tan SMS aldı (mesaj ID: %s).", gelen_mesaj.message_id)
+  if gelen_mesaj.date:
+    KOPRU_GECIKMESI.gozlemle(max(0.0, time.time() - gelen_mesaj.date.timestamp()))
+  await sms_isle(gelen_mesaj.text)
 
-  mesaj_metni = gelen_mesaj.text
-  tel_no = mesajdan_tel_no_bul(mesaj_metni)
 
-  if not tel_no:
-    logger.warning(f"User-bot'tan gelen mesajda telefon numarası bulunamadı: {mesaj_metni[:50]}")
+async def sms_isle(mesaj_metni: str) -> None:
+  """
+  SMS metnini ayrıştırır, numarayı izleyen gruplara gönderimi kuyruğa alır ve sayaçları günceller.
+  Telegram üzerinden (sms_isleyici_bot), köprü soketinden veya tek süreç modunda
+  bellek içi kuyruktan gelen SMS'lerin ortak giriş noktasıdır.
+  """
+  with AYRISTIRMA_SURESI.olc():
+    sms = sms_ayristir(mesaj_metni)
+
+  if sms is None:
+    SMS_ISLENEN.etiket('tel_no_yok').artir()
+    # Gövde loglanmaz: etiketsiz bir OTP maskelemeden kaçabilir
+    logger.warning("User-bot'tan gelen mesajda telefon numarası bulunamadı (%s karakter)", len(mesaj_metni))
     return
 
-  # SMS metninden istenen bilgileri çek
-  uygulama_adi = mesajdan_bilgi_al(mesaj_metni, "Uygulama Adı")
-  mesaj_icerigi = mesajdan_bilgi_al(mesaj_metni, "Mesaj")
-  kod = mesajdan_bilgi_al(mesaj_metni, "Kod")
-  saat = mesajdan_bilgi_al(mesaj_metni, "Saat")
-
-  # Yeni formatta mesaj oluştur
-  # Kod varsa tıkla kopyala olarak ekle
-  yeni_mesaj = "✅ YENİ SMS GELDİ\n\n"
-  if uygulama_adi:
-    yeni_mesaj += f"Uygulama Adı: {uygulama_adi}\n"
-  if tel_no: # tel_no'yu zaten en başta bulduk
-    yeni_mesaj += f"Tel No: {tel_no}\n"
-  if mesaj_icerigi:
-    yeni_mesaj += f"Mesaj: {mesaj_icerigi}\n"
-  if kod:
-    yeni_mesaj += f"Kod: `{kod}`\n" # Tıkla kopyala için ters tırnaklar arasına alındı
-  if saat:
-    yeni_mesaj += f"Saat: {saat}\n"
-
-
-  yonlendirildi = False
-
-  for hedef_grup_id, numaralar_seti in beklenen_numaralar.items():
-    sms_raporu.setdefault(hedef_grup_id, {}).setdefault(tel_no, 0)
-    sms_raporu[hedef_grup_id][tel_no] += 1
-
-    if tel_no in numaralar_seti:
+  baslangic = time.perf_counter()
+
+  tel_no = sms.tel_no
+
+  # Ters indeksten tek aramayla bu numarayı izleyen grupları bul.
+  # Değerler değişmez tuple'lar; /sil araya girse de bu döngü etkilenmez.
+  hedef_gruplar = numara_gruplari.get(int(tel_no), ())
+  if not hedef_gruplar:
+    SMS_ISLENEN.etiket('izlenmiyor').artir()
+    return
+
+  # User-bot geçmişi yeniden okuduysa ya da SMS botu aynı bildirimi tekrar attıysa
+  tekrar_anahtari = sms.tekrar_anahtari()
+  if tekrar_onbellegi.gordu_mu(tekrar_anahtari):
+    SMS_ISLENEN.etiket('tekrar').artir()
+    logger.info("Numara %s için aynı SMS tekrar geldi, yoksayıldı.", tel_no)
+    return
+  tekrar_onbellegi.ekle(tekrar_anahtari)
+
+  # Yeni formatta mesaj oluştur (kod varsa tıkla kopyala olarak eklenir)
+  yeni_mesaj = sms.bicimlendir()
+
+  for hedef_grup_id in hedef_gruplar:
+    grup_raporu = sms_raporu.get(hedef_grup_id)
+    if grup_raporu is None:
+      grup_raporu = sms_raporu[hedef_grup_id] = RaporSayaci()
+    grup_raporu.artir(tel_no)
+    istatistik.artir(hedef_grup_id, tel_no)
+
+    # Gönderim kuyruğa alınır; gruplara eşzamanlı ve hız sınırına uygun gönderilir.
+    # Birleştirme açıksa aynı numaranın yakın zamandaki mesajı düzenlenir.
+    gonderici.gonder(
+      hedef_grup_id,
+      birlestirme_anahtari=tel_no,
+      text=yeni_mesaj, # Yeni oluşturulan mesaj gönderiliyor
+      parse_mode=telegram.constants.ParseMode.MARKDOWN
+    )
+
+  veri_kaydet({'o': veri_deposu.SAY, 'g': list(hedef_gruplar), 'n': tel_no})
+  YONLENDIRME_SURESI.gozlemle(time.perf_counter() - baslangic)
+  SMS_ISLENEN.etiket('yonlendirildi').artir()
+  logger.info("Numara %s için SMS %d hedef gruba gönderilmek üzere kuyruğa alındı.", tel_no, len(hedef_gruplar))
+
+
+def son_rapor_gunu_oku() -> datetime.date | None:
+  """En son gönderilen gün sonu raporunun tarihini okur; kayıt yoksa None."""
+  if not os.path.exists(RAPOR_DURUM_DOSYASI):
+    return None
+  try:
+    with open(RAPOR_DURUM_DOSYASI, 'r') as f:
+      return datetime.date.fromisoformat(json.load(f)['son_rapor'])
+  except (ValueError, KeyError, OSError) as e:
+    logger.error(f"Rapor durum dosyası okunamadı ({e}), yok sayılıyor.")
+    return None
+
+
+def _son_rapor_gunu_yaz(gun: datetime.date) -> None:
+  gecici_yol = RAPOR_DURUM_DOSYASI + '.tmp'
+  with open(gecici_yol, 'w') as f:
+    json.dump({'son_rapor': gun.isoformat()}, f)
+  os.replace(gecici_yol, RAPOR_DURUM_DOSYASI)
+
+
+def son_rapor_zamani(simdi: datetime.datetime) -> datetime.date:
+  """`simdi`den önceki en son planlı rapor çalıştırmasının tarihi."""
+  bugunku = TIMEZONE.localize(datetime.datetime.combine(simdi.date(), RAPOR_SAATI))
+  return simdi.date() if simdi >= bugunku else simdi.date() - datetime.timedelta(days=1)
+
+
+def gun_sonu_satirlari(rapor: dict):
+  """Tüm grupların satırlarını (Grup ID, Tel No, SMS) grup grup, SMS sayısına göre azalan sırada üretir."""
+  for grup_id in sorted(rapor):
+    for tel_no, adet in rapor[grup_id].sirali():
+      yield grup_id, tel_no, adet
+
+
+async def gun_sonu_raporu_gonder(bot, rapor: dict, gun: datetime.date, telafi_zamani: datetime.datetime | None = None) -> int:
+  """
+  Tüm grupları kapsayan tek bir CSV raporu hazırlar ve her alıcıya belge olarak gönderir;
+  başarılı gönderim sayısını döner. CSV executor'da akış halinde yazılır; gönderimler SMS
+  kuyruğu boşalınca yapılır.
+
+  Telafi raporunda sayaçlar zaman damgası taşımadığından rapor saatinde kesilemez;
+  `telafi_zamani` verilirse açıklama raporun o ana kadarki tüm SMS'leri kapsadığını belirtir.
+  """
+  basliklar = ['Grup ID', 'Tel No', 'SMS']
+  dosya = await asyncio.get_running_loop().run_in_executor(None, csv_olustur, basliklar, gun_sonu_satirlari(rapor))
+  aciklama = f"GÜN SONU RAPORU ({gun.isoformat()})\n"
+  if telafi_zamani is not None:
+    aciklama += (
+      f"Telafi raporu: {RAPOR_SAATI.strftime('%H:%M')} raporu kaçırıldı; son rapordan "
+      f"gönderim anına ({telafi_zamani.strftime('%d.%m.%Y %H:%M')}) kadar yönlendirilen tüm SMS'leri kapsar.\n"
+    )
+  aciklama += (
+    f"Grup: {len(rapor)} | Numara: {sum(len(r) for r in rapor.values())} | "
+    f"Toplam Yönlendirilen SMS: {sum(r.toplam for r in rapor.values())}"
+  )
+  gonderilen = 0
+  with dosya:
+    for alici in RAPOR_ALICILARI:
+      # Rapor canlı SMS yönlendirmesiyle yarışmasın: kuyruk boşalınca ve hız sınırı içinde gönder
+      await gonderici.bos_zaman_bekle()
+      dosya.seek(0)
       try:
-        await context.bot.send_message(
-          chat_id=hedef_grup_id,
-          text=yeni_mesaj, # Yeni oluşturulan mesaj gönderiliyor
-          parse_mode=telegram.constants.ParseMode.MARKDOWN
-        )
-        logger.info(f"Numara {tel_no} için SMS, hedef grup ID {hedef_grup_id}'ye yönlendirildi.")
-        yonlendirildi = True
+        await bot.send_document(chat_id=alici, document=dosya, filename=f"gun_sonu_{gun.isoformat()}.csv", caption=aciklama)
+        gonderilen += 1
+        logger.info(f"Gün sonu raporu ({len(rapor)} grup) kullanıcı ID {alici}'ye gönderildi.")
       except Exception as e:
-        logger.error(f"SMS hedef grup ID {hedef_grup_id}'ye yönlendirilirken hata oluştu: {e}")
-
-  if yonlendirildi:
-    veri_kaydet()
+        logger.error(f"Gün sonu raporu kullanıcı ID {alici}'ye gönderilirken hata oluştu: {e}")
+  return gonderilen
 
 
 async def rapor_gonder_job(context: ContextTypes.DEFAULT_TYPE):
-  """APScheduler tarafından çağrılan rapor gönderme işi."""
+  """
+  JobQueue tarafından her gün (ve bot rapor saatinde kapalıysa açılışta telafi olarak)
+  çağrılan gün sonu raporu işi. Telafi çalıştırmasında raporun tarihi job.data'dadır.
+  """
   global sms_raporu
-  
-  if not sms_raporu:
+  job = getattr(context, 'job', None)
+  # Planlı çalıştırma gece yarısından sonraya kaysa bile rapor planlandığı günün tarihini taşır
+  telafi = job is not None and bool(job.data)
+  simdi = datetime.datetime.now(TIMEZONE)
+  gun = job.data if telafi else son_rapor_zamani(simdi)
+
+  # Günün sayaçlarını devral ve hemen sıfırla: rapor hazırlanırken gelen SMS'ler yeni
+  # sözlüğe sayılır. Geçmiş sayılar istatistik veritabanında kalır (/rapor <tarih>).
+  rapor = {grup_id: rapor_data for grup_id, rapor_data in sms_raporu.items() if rapor_data}
+  sms_raporu = {}
+  veri_kaydet({'o': veri_deposu.RAPOR_SIFIRLA})
+
+  if rapor:
+    logger.info(f"Gün sonu raporu hazırlanıyor ({gun.isoformat()}, {len(rapor)} grup).")
+    try:
+      gonderilen = await gun_sonu_raporu_gonder(context.bot, rapor, gun, telafi_zamani=simdi if telafi else None)
+    except Exception as e:
+      logger.error(f"Gün sonu raporu hazırlanırken hata oluştu: {e}")
+      gonderilen = 0
+    if not gonderilen:
+      # Rapor kimseye ulaşmadı: sayaçları (bu arada gelenlerle birleştirerek) geri koy, günü
+      # gönderilmiş sayma ve daha sonra tekrar dene
+      rapor_geri_koy(rapor)
+      logger.error(f"{gun.isoformat()} gün sonu raporu hiçbir alıcıya gönderilemedi, {RAPOR_TEKRAR_DENEME_SN} sn sonra tekrar denenecek.")
+      job_queue = getattr(context, 'job_queue', None)
+      if job_queue is not None:
+        job_queue.run_once(rapor_gonder_job, when=RAPOR_TEKRAR_DENEME_SN, data=gun, name='gun_sonu_raporu_telafi')
+      return
+  else:
     logger.info("Rapor gönderilecek veri yok.")
-    return
 
-  logger.info("Gün sonu raporu hazırlanıyor ve sadece belirlenen kullanıcıya gönderiliyor.")
+  try:
+    await asyncio.get_running_loop().run_in_executor(None, _son_rapor_gunu_yaz, gun)
+  except OSError as e:
+    logger.error(f"Rapor durum dosyası yazılamadı: {e}")
 
-  # Tüm raporlar tek bir kişiye yönlendirileceği için, hangi grubun raporu olduğunu belirtelim.
-  for grup_id, rapor_data in sms_raporu.items():
-    if not rapor_data:
-      continue
 
-    # Mesajın başına hangi gruba ait olduğunu ekliyoruz
-    mesaj = f"GÜN SONU RAPOR (Sorgu Yapan Sohbet ID: {grup_id})\n\n"
-    toplam_sms = 0
-    for tel_no, count in rapor_data.items():
-      mesaj += f"• {tel_no} : {count} SMS\n"
-      toplam_sms += count
-    mesaj += f"\n--- \nToplam Yönlendirilen SMS: {toplam_sms}"
+def rapor_geri_koy(rapor: dict) -> None:
+  """Gönderilemeyen gün sonu raporunun sayaçlarını güncel sayaçlara geri ekler ve günlüğe yazar."""
+  kayitlar = [{'o': veri_deposu.RAPOR_EKLE, 'g': grup_id, 'r': dict(rapor_data.sayilar)} for grup_id, rapor_data in rapor.items()]
+  for kayit in kayitlar:
+    veri_deposu.kaydi_uygula(beklenen_numaralar, sms_raporu, kayit)
+  veri_kaydet(*kayitlar)
 
-    try:
-      await context.bot.send_message(
-        chat_id=RAPOR_ALICISI_ID, # <<< Sadece senin ID'ne gönderiliyor
-        text=mesaj,
-        parse_mode=telegram.constants.ParseMode.MARKDOWN
-      )
-      logger.info(f"Rapor grup ID {grup_id}'den alınıp kullanıcı ID {RAPOR_ALICISI_ID}'ye yönlendirildi.")
-    except Exception as e:
-      logger.error(f"Rapor kullanıcı ID {RAPOR_ALICISI_ID}'ye gönderilirken hata oluştu: {e}")
 
-  sms_raporu = {}
-  veri_kaydet()
+async def kacirilan_raporu_planla(application: Application, son_rapor: datetime.date | None) -> None:
+  """
+  Son planlı rapor gönderilmemişse (bot o saatte kapalıydı) kısa süre sonra gönderilmek üzere planlar.
+  Durum dosyası hiç yoksa (ilk kurulum) telafi gönderilmez, son planlı rapor gönderilmiş sayılır.
+  """
+  beklenen = son_rapor_zamani(datetime.datetime.now(TIMEZONE))
+  if son_rapor is None:
+    try:
+      await asyncio.get_running_loop().run_in_executor(None, _son_rapor_gunu_yaz, beklenen)
+    except OSError as e:
+      logger.error(f"Rapor durum dosyası yazılamadı: {e}")
+    return
+  if son_rapor >= beklenen:
+    return
+  logger.warning(f"{beklenen.isoformat()} gün sonu raporu kaçırılmış, {RAPOR_TELAFI_GECIKMESI_SN:.0f} sn sonra gönderilecek.")
+  application.job_queue.run_once(rapor_gonder_job, when=RAPOR_TELAFI_GECIKMESI_SN, data=beklenen, name='gun_sonu_raporu_telafi')
+
+
+async def baslangic_isleri(application: Application) -> None:
+  """Uygulama başlarken arka plan kaydedicisini, gönderici kuyruğunu ve (ayarlıysa) köprü soketini çalıştırır."""
+  global kopru_sunucusu, metrik_sunucusu
+  if TEKRAR_ONBELLEK_DOSYASI:
+    await asyncio.get_running_loop().run_in_executor(None, tekrar_onbellegi.dosyadan_yukle, TEKRAR_ONBELLEK_DOSYASI)
+  kaydedici.baslat()
+  istatistik.baslat()
+  gonderici.baslat(application.bot)
+  if application.job_queue is not None:
+    son_rapor = await asyncio.get_running_loop().run_in_executor(None, son_rapor_gunu_oku)
+    await kacirilan_raporu_planla(application, son_rapor)
+  if KOPRU_SOKET_YOLU:
+    kopru_sunucusu = await soket_sunucusu_baslat(KOPRU_SOKET_YOLU, sms_isle)
+  if METRIK_PORTU:
+    metrik_sunucusu = await metrikler.http_sunucusu_baslat(METRIK_PORTU)
+
+
+async def durdurma_isleri(application: Application) -> None:
+  """Bot kapanmadan önce köprü soketini kapatır ve kuyrukta bekleyen SMS'lerin gönderilmesini bekler."""
+  if kopru_sunucusu is not None:
+    kopru_sunucusu.close()
+    await kopru_sunucusu.wait_closed()
+  if metrik_sunucusu is not None:
+    metrik_sunucusu.close()
+  await gonderici.durdur()
+
+
+async def kapanis_isleri(application: Application) -> None:
+  """Kapanışta bekleyen tüm değişiklikleri diske yazar."""
+  await kaydedici.durdur()
+  await istatistik.durdur()
+  if TEKRAR_ONBELLEK_DOSYASI:
+    try:
+      await asyncio.get_running_loop().run_in_executor(None, tekrar_onbellegi.dosyaya_yaz, TEKRAR_ONBELLEK_DOSYASI)
+    except OSError as e:
+      logger.error(f"Tekrar önbelleği kaydedilemedi: {e}")
+  logger.info("Veri kapanışta diske yazıldı.")
 
 
 async def hata_yoneticisi(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
   logger.error("Hata oluştu:", exc_info=context.error)
 
 
-def main() -> None:
-  """Run the bot."""
-  application = Application.builder().token(BOT_TOKEN).build()
-
-  # Zamanlanmış görevler için APScheduler'ı başlat
-  scheduler = AsyncIOScheduler(timezone=TIMEZONE)
-  report_time = datetime.time(hour=23, minute=55, tzinfo=TIMEZONE)
-  scheduler.add_job(rapor_gonder_job, 'cron', hour=report_time.hour, minute=report_time.minute, args=(application,))
- 
-  # Scheduler'ı Application'ın event loop'una bağla
-  application.job_queue.scheduler = scheduler
- 
+def uygulama_olustur() -> Application:
+  """Ana Bot'un PTB Application'ını işleyicileri ve zamanlanmış görevleriyle kurar."""
+  builder = (
+    Application.builder()
+    .token(BOT_TOKEN)
+    .concurrent_updates(ESZAMANLI_GUNCELLEME)
+    .post_init(baslangic_isleri)
+    .post_stop(durdurma_isleri)
+    .post_shutdown(kapanis_isleri)
+  )
+  if BOT_API_URL:
+    builder = builder.base_url(f"{BOT_API_URL}/bot").base_file_url(f"{BOT_API_URL}/file/bot")
+  application = builder.build()
+
+  # Gün sonu raporu PTB'nin kendi JobQueue'suyla zamanlanır. Event loop meşgul olduğu için
+  # geç kalırsa bir saate kadar yine çalışır; bot o saatte kapalıysa açılışta telafi edilir.
+  application.job_queue.run_daily(
+    rapor_gonder_job,
+    time=RAPOR_SAATI.replace(tzinfo=TIMEZONE),
+    name='gun_sonu_raporu',
+    job_kwargs={'misfire_grace_time': 3600, 'coalesce': True},
+  )
+
   # Komut İşleyicilerini Ekle (Sadece yetkili kullanıcı için)
-  application.add_handler(CommandHandler("ver", ver_komutu))
-  application.add_handler(CommandHandler("sil", sil_komutu))
+  # block=False: dosyadan içe aktarım sürerken diğer güncellemeler (SMS'ler) beklemez
+  application.add_handler(CommandHandler("ver", ver_komutu, block=False))
+  application.add_handler(CommandHandler("sil", sil_komutu, block=False))
+  application.add_handler(MessageHandler(
+    filters.Document.ALL & filters.CaptionRegex(r'^/(ver|sil)(@\w+)?(\s|$)'), belge_komutu, block=False
+  ))
   application.add_handler(CommandHandler("silhepsi", sil_hepsi_komutu))
   application.add_handler(CommandHandler("rapor", rapor_komutu))
   application.add_handler(CommandHandler("aktif", aktif_komutu))
+  application.add_handler(CallbackQueryHandler(aktif_sayfa_dugmesi, pattern=r'^aktif\|'))
+  application.add_handler(CommandHandler("ara", ara_komutu))
   application.add_handler(CommandHandler("id", id_komutu))
+  application.add_handler(CommandHandler("metrik", metrik_komutu))
 
   # SMS işleyiciyi ekle: Sadece User-bot'un ID'sinden (USER_BOT_ID) gelen mesajları dinle
   application.add_handler(MessageHandler(filters.User(USER_BOT_ID) & filters.TEXT & ~filters.COMMAND, sms_isleyici_bot))
 
   application.add_error_handler(hata_yoneticisi)
+  return application
+
+
+def webhook_ayarlari() -> dict:
+  """run_webhook / Updater.start_webhook için ortak ayarlar."""
+  return dict(
+    listen=WEBHOOK_DINLEME_ADRESI,
+    port=WEBHOOK_PORTU,
+    url_path=WEBHOOK_YOLU,
+    webhook_url=WEBHOOK_URL,
+    secret_token=WEBHOOK_GIZLI_ANAHTAR,
+    max_connections=WEBHOOK_MAKS_BAGLANTI,
+    allowed_updates=Update.ALL_TYPES,
+    drop_pending_updates=True,
+  )
+
 
-  logger.info("Ana Bot (CengizAtaySMSbot) başlatılıyor...")
-  # Scheduler'ı Application ile birlikte başlat
-  application.run_polling(allowed_updates=Update.ALL_TYPES, drop_pending_updates=True, close_loop=False)
+async def guncelleme_alimini_baslat(application: Application) -> None:
+  """
+  run_polling/run_webhook kullanılmayan durumlar (tek_surec.py, test düzeneği) için
+  Updater'ı CALISMA_MODU'na göre başlatır. Durdurmak için application.updater.stop().
+  """
+  if CALISMA_MODU == 'webhook':
+    await application.updater.start_webhook(**webhook_ayarlari())
+  else:
+    await application.updater.start_polling(allowed_updates=Update.ALL_TYPES, drop_pending_updates=True)
+
+
+def main() -> None:
+  """Run the bot."""
+  application = uygulama_olustur()
+
+  logger.info(f"Ana Bot (CengizAtaySMSbot) başlatılıyor ({CALISMA_MODU} modu)...")
+  # Her iki mod da SIGINT/SIGTERM'de güncelleme alımını durdurur, işlenmekte olanları
+  # bitirir ve post_stop/post_shutdown ile verileri kaydeder.
+  if CALISMA_MODU == 'webhook':
+    application.run_webhook(**webhook_ayarlari(), close_loop=False)
+  else:
+    application.run_polling(allowed_updates=Update.ALL_TYPES, drop_pending_updates=True, close_loop=False)
 
 if __name__ == '__main__':
   veri_yukle() # Bot başlamadan önce verileri yükle
@@ -0,0 +1,343 @@
+import asyncio
+import datetime
+import logging
+import time
+from collections import OrderedDict, deque
+
+from telegram.error import BadRequest, Forbidden, RetryAfter, TimedOut, NetworkError, TelegramError
+
+from hiz_siniri import TokenKovasi
+from metrikler import kayit as metrik_kaydi
+
+logger = logging.getLogger(__name__)
+
+# Telegram Bot API sınırları: tüm sohbetlere toplam ~30 mesaj/sn,
+# aynı gruba ~20 mesaj/dk.
+GENEL_HIZ = 30.0
+SOHBET_HIZ = 20.0 / 60.0
+SOHBET_KAPASITE = 20
+# Telegram mesaj metni sınırı; birleşik mesaj bunu aşacaksa yeni mesaj açılır
+METIN_SINIRI = 4096
+# Birleşik mesajda SMS'ler arasındaki ayraç (en yeni SMS en üstte)
+BIRLESIK_AYIRICI = "\n➖➖➖➖➖➖\n"
+
+SMS_ASAMA_SURESI = metrik_kaydi.histogram('sms_asama_suresi_saniye', "SMS işleme aşamalarının süresi", ('asama',))
+KUYRUK_BEKLEME = SMS_ASAMA_SURESI.etiket('kuyruk_bekleme')  # Kuyruğa girişten gönderime başlamaya
+GONDERIM = SMS_ASAMA_SURESI.etiket('gonderim')              # send_message gidiş-dönüşü
+TESLIM = SMS_ASAMA_SURESI.etiket('kuyruktan_teslime')       # Kuyruğa girişten başarılı teslime
+GONDERILEN = metrik_kaydi.sayac('telegram_gonderilen_toplam', "Hedef gruplara başarıyla gönderilen mesajlar")
+BASARISIZ = metrik_kaydi.sayac('telegram_gonderim_hatasi_toplam', "Kalıcı hata veya deneme hakkı bitmesiyle gönderilemeyen mesajlar")
+RETRY_AFTER = metrik_kaydi.sayac('retry_after_toplam', "Alınan Telegram RetryAfter hataları")
+RETRY_AFTER_BEKLEME = metrik_kaydi.sayac('retry_after_bekleme_saniye_toplam', "RetryAfter nedeniyle beklenen toplam süre")
+BIRLESTIRILEN = metrik_kaydi.sayac('birlestirilen_sms_toplam', "Yeni mesaj yerine mevcut mesaja birleştirilen SMS'ler (tasarruf edilen gönderim)")
+DUZENLENEN = metrik_kaydi.sayac('telegram_duzenlenen_toplam', "Birleştirme için yapılan edit_message_text çağrıları")
+
+
+class BirlesikMesaj:
+    """
+    Pencere içinde aynı (grup, numara) için gelen SMS'lerin tek mesajdaki durumu.
+
+    `surum` her yeni SMS'te artar, `gonderilen_surum` Telegram'daki mesajın hangi sürümü
+    gösterdiğini tutar. Bir mesaj için kuyrukta en fazla bir iş bulunur (`isleniyor`);
+    iş çalışırken yeni SMS gelirse iş bittikten sonra bir düzenleme daha kuyruğa alınır.
+    """
+    __slots__ = ('metinler', 'baslangic', 'mesaj_id', 'surum', 'gonderilen_surum', 'isleniyor')
+
+    def __init__(self, metin: str):
+        self.metinler = [metin]
+        self.baslangic = time.monotonic()
+        self.mesaj_id = None
+        self.surum = 1
+        self.gonderilen_surum = 0
+        self.isleniyor = True
+
+    def metin(self) -> str:
+        return BIRLESIK_AYIRICI.join(reversed(self.metinler))
+
+
+class GonderimIsi:
+    __slots__ = ('chat_id', 'parametreler', 'deneme', 'kuyruga_giris', 'birlesik')
+
+    def __init__(self, chat_id: int, parametreler: dict, birlesik: BirlesikMesaj | None = None):
+        self.chat_id = chat_id
+        self.parametreler = parametreler
+        self.deneme = 0
+        self.kuyruga_giris = time.monotonic()
+        self.birlesik = birlesik
+
+
+class Gonderici:
+    """
+    Yönlendirilen SMS'leri hedef gruplara eşzamanlı gönderen giden mesaj kuyruğu.
+
+    Birden fazla işçi görevi aynı kuyruktan beslenir; böylece bir numarayı izleyen
+    tüm gruplara gönderim birbirini beklemeden yapılır. Telegram'ın genel ve sohbet
+    başına sınırları token kovalarıyla uygulanır. RetryAfter bot genelindedir: alınırsa
+    genel kova istenen süre boyunca token vermez ve iş o süre sonra tekrar denenir. Ağ
+    hatalarında sınırlı sayıda yeniden denenir; OTP kaybolmaz. Kuyruk derinliği ve
+    gecikmeler metrikler modülüyle yayınlanır.
+
+    Bir iş ertelenince (sohbet sınırı, RetryAfter, ağ hatası) o sohbet bekletilir: aynı
+    gruba sonradan gelen işler ertelenen işin arkasında sıraya girer ve onu geçmez,
+    böylece bir gruba giden OTP'lerin sırası bozulmaz.
+
+    birlestirme_penceresi_sn > 0 ise aynı birleştirme anahtarıyla (grup, numara) pencere
+    içinde gelen mesajlar yeni mesaj yerine ilk mesaja eklenir: mesaj henüz
+    gönderilmediyse gönderilecek metin güncellenir, gönderildiyse edit_message_text ile
+    düzenlenir. Bir mesaj en fazla maks_duzenleme kez birleştirilir.
+    """
+
+    def __init__(self, isci_sayisi: int = 8, maks_deneme: int = 5,
+                 birlestirme_penceresi_sn: float = 0.0, maks_duzenleme: int = 5):
+        self.isci_sayisi = isci_sayisi
+        self.maks_deneme = maks_deneme
+        self.birlestirme_penceresi_sn = birlestirme_penceresi_sn
+        self.maks_duzenleme = maks_duzenleme
+        # (chat_id, anahtar) -> BirlesikMesaj, başlangıç sırasıyla (pencere dolanlar baştan atılır)
+        self._birlesikler: OrderedDict = OrderedDict()
+        self.genel_kova = TokenKovasi(GENEL_HIZ, GENEL_HIZ)
+        # Genel kovadan token kuyruktan çıkış sırasıyla (FIFO) alınır; duraklamadan sonra
+        # bekleyen işçiler rastgele sırayla uyanıp aynı gruba giden mesajların sırasını bozmasın
+        self._genel_sira = asyncio.Lock()
+        self.sohbet_kovalari: dict[int, TokenKovasi] = {}
+        self.kuyruk: asyncio.Queue[GonderimIsi] = asyncio.Queue()
+        self.bot = None
+        self._isciler: list[asyncio.Task] = []
+        self._bekleyen_tekrarlar = 0  # call_later ile kuyruğa dönmeyi bekleyen işler
+        # Bekletilen sohbetler: chat_id -> işler; ilki ertelenen (sıradaki) iş, diğerleri onu bekler
+        self._bekletilen: dict[int, deque] = {}
+        self._bekletilen_sayisi = 0  # Sıradaki iş dışında bekletilen işler
+        metrik_kaydi.gosterge('gonderici_kuyruk_derinligi', "Gönderilmeyi bekleyen mesaj sayısı").fonksiyon_ayarla(
+            lambda: self.kuyruk_derinligi
+        )
+
+    @property
+    def kuyruk_derinligi(self) -> int:
+        return self.kuyruk.qsize() + self._bekleyen_tekrarlar + self._bekletilen_sayisi
+
+    def baslat(self, bot) -> None:
+        self.bot = bot
+        self._isciler = [asyncio.create_task(self._isci()) for _ in range(self.isci_sayisi)]
+
+    def gonder(self, chat_id: int, birlestirme_anahtari=None, **parametreler) -> None:
+        """
+        send_message çağrısını kuyruğa ekler ve hemen döner. Birleştirme açıksa ve aynı
+        anahtarla pencere içinde bir mesaj varsa, metin o mesaja eklenir.
+        """
+        if birlestirme_anahtari is None or self.birlestirme_penceresi_sn <= 0:
+            self.kuyruk.put_nowait(GonderimIsi(chat_id, parametreler))
+            return
+
+        self._pencere_dolanlari_at(time.monotonic())
+        anahtar = (chat_id, birlestirme_anahtari)
+        metin = parametreler['text']
+        birlesik = self._birlesikler.get(anahtar)
+        if (birlesik is not None and len(birlesik.metinler) <= self.maks_duzenleme
+                and len(birlesik.metin()) + len(BIRLESIK_AYIRICI) + len(metin) <= METIN_SINIRI):
+            birlesik.metinler.append(metin)
+            birlesik.surum += 1
+            BIRLESTIRILEN.artir()
+            if not birlesik.isleniyor:
+                birlesik.isleniyor = True
+                self.kuyruk.put_nowait(GonderimIsi(chat_id, parametreler, birlesik))
+            return
+
+        birlesik = BirlesikMesaj(metin)
+        self._birlesikler.pop(anahtar, None)
+        self._birlesikler[anahtar] = birlesik
+        self.kuyruk.put_nowait(GonderimIsi(chat_id, parametreler, birlesik))
+
+    def _pencere_dolanlari_at(self, simdi: float) -> None:
+        birlesikler = self._birlesikler
+        while birlesikler:
+            if next(iter(birlesikler.values())).baslangic + self.birlestirme_penceresi_sn > simdi:
+                break
+            birlesikler.popitem(last=False)
+
+    async def bos_zaman_bekle(self, maks_bekleme: float = 30.0) -> None:
+        """
+        Öncelikli olmayan gönderimler (gün sonu raporu) için: SMS kuyruğu boşalana kadar
+        (en fazla maks_bekleme saniye) bekler, sonra genel hız sınırından bir token alır.
+        """
+        bitis = time.monotonic() + maks_bekleme
+        while self.kuyruk_derinligi and time.monotonic() < bitis:
+            await asyncio.sleep(0.2)
+        await self.genel_kova.al()
+
+    def _sonra_kuyruga_al(self, is_: GonderimIsi, sure: float) -> None:
+        # Sohbeti bekletmeye al: bu iş dönene kadar aynı gruba başka iş gönderilmez
+        if is_.chat_id not in self._bekletilen:
+            self._bekletilen[is_.chat_id] = deque([is_])
+        self._bekleyen_tekrarlar += 1
+
+        def geri_koy():
+            self._bekleyen_tekrarlar -= 1
+            self.kuyruk.put_nowait(is_)
+
+        asyncio.get_running_loop().call_later(sure, geri_koy)
+
+    def _sohbet_kovasi(self, chat_id: int) -> TokenKovasi:
+        kova = self.sohbet_kovalari.get(chat_id)
+        if kova is None:
+            kova = self.sohbet_kovalari[chat_id] = TokenKovasi(SOHBET_HIZ, SOHBET_KAPASITE)
+        return kova
+
+    def _bekletildi_mi(self, is_: GonderimIsi) -> bool:
+        """Sohbet bekletiliyorsa ve iş sıradaki değilse işi sohbetin sırasına ekler."""
+        bekleyenler = self._bekletilen.get(is_.chat_id)
+        if bekleyenler is None or bekleyenler[0] is is_:
+            return False
+        bekleyenler.append(is_)
+        self._bekletilen_sayisi += 1
+        return True
+
+    def _sohbeti_ilerlet(self, is_: GonderimIsi) -> None:
+        """Bekletilen sohbetin sıradaki işi bitti: arkasındakini kuyruğa koyar, kalmadıysa bekletmeyi kaldırır."""
+        bekleyenler = self._bekletilen.get(is_.chat_id)
+        if bekleyenler is None or bekleyenler[0] is not is_:
+            return
+        bekleyenler.popleft()
+        if bekleyenler:
+            self._bekletilen_sayisi -= 1
+            self.kuyruk.put_nowait(bekleyenler[0])
+        else:
+            del self._bekletilen[is_.chat_id]
+
+    async def _isci(self) -> None:
+        while True:
+            is_ = await self.kuyruk.get()
+            try:
+                if self._bekletildi_mi(is_):
+                    continue
+                bitti = True
+                try:
+                    bitti = await self._isle(is_)
+                finally:
+                    if bitti:
+                        self._sohbeti_ilerlet(is_)
+            except Exception as e:
+                logger.error(f"Gönderici işçisinde beklenmeyen hata: {e}")
+            finally:
+                self.kuyruk.task_done()
+
+    async def _isle(self, is_: GonderimIsi) -> bool:
+        """İşi gönderir; iş bittiyse (teslim ya da kalıcı hata) True, sonra tekrar gelecekse False döner."""
+        # Sohbet sınırı doluysa işçiyi bekletme, işi sonraya ertele. Token kontrolle aynı anda
+        # alınır; genel kovayı beklerken başka işçiler aynı sohbetin kovasını aşırı harcamasın.
+        sure = self._sohbet_kovasi(is_.chat_id).hemen_al()
+        if sure > 0:
+            self._sonra_kuyruga_al(is_, sure)
+            return False
+
+        async with self._genel_sira:
+            await self.genel_kova.al()
+        KUYRUK_BEKLEME.gozlemle(time.monotonic() - is_.kuyruga_giris)
+
+        birlesik = is_.birlesik
+        duzenleme = False
+        if birlesik is not None:
+            # Metin gönderim anında kurulur; kuyrukta beklerken gelen SMS'ler de dahil olur
+            surum = birlesik.surum
+            is_.parametreler['text'] = birlesik.metin()
+            duzenleme = birlesik.mesaj_id is not None
+
+        try:
+            with GONDERIM.olc():
+                if duzenleme:
+                    await self.bot.edit_message_text(chat_id=is_.chat_id, message_id=birlesik.mesaj_id, **is_.parametreler)
+                else:
+                    mesaj = await self.bot.send_message(chat_id=is_.chat_id, **is_.parametreler)
+        except RetryAfter as e:
+            bekleme = e.retry_after
+            if isinstance(bekleme, datetime.timedelta):
+                bekleme = bekleme.total_seconds()
+            RETRY_AFTER.artir()
+            RETRY_AFTER_BEKLEME.artir(bekleme)
+            logger.warning("Grup ID %s için RetryAfter: tüm gönderimler %s sn duraklatıldı.", is_.chat_id, bekleme)
+            # Sınır bot geneline uygulanır; diğer işçiler de gönderip yeni RetryAfter almasın
+            self.genel_kova.duraklat(bekleme)
+            self._sonra_kuyruga_al(is_, bekleme)
+            return False
+        except BadRequest as e:
+            if duzenleme and 'not modified' in str(e).lower():
+                return self._birlesik_tamamlandi(is_, surum)
+            if duzenleme:
+                # Mesaj silinmiş ya da artık düzenlenemiyor: birleşik metni yeni mesaj olarak gönder
+                logger.warning("Grup ID %s mesajı %s düzenlenemedi (%s), yeni mesaj gönderilecek.", is_.chat_id, birlesik.mesaj_id, e)
+                birlesik.mesaj_id = None
+                self.kuyruk.put_nowait(is_)
+                return False
+            # Kalıcı hata (BadRequest NetworkError alt sınıfı olduğu için önce yakalanır)
+            self._basarisiz(is_)
+            logger.error("SMS hedef grup ID %s'ye yönlendirilirken hata oluştu: %s", is_.chat_id, e)
+            return True
+        except Forbidden as e:
+            self._basarisiz(is_)
+            logger.error("SMS hedef grup ID %s'ye yönlendirilirken hata oluştu: %s", is_.chat_id, e)
+            return True
+        except (TimedOut, NetworkError) as e:
+            is_.deneme += 1
+            if is_.deneme < self.maks_deneme:
+                logger.warning("Grup ID %s'ye gönderim başarısız (%s), tekrar denenecek (%d/%d).", is_.chat_id, e, is_.deneme, self.maks_deneme)
+                self._sonra_kuyruga_al(is_, min(2 ** is_.deneme, 30))
+                return False
+            self._basarisiz(is_)
+            logger.error("SMS hedef grup ID %s'ye yönlendirilemedi, deneme hakkı bitti: %s", is_.chat_id, e)
+            return True
+        except TelegramError as e:
+            self._basarisiz(is_)
+            logger.error("SMS hedef grup ID %s'ye yönlendirilirken hata oluştu: %s", is_.chat_id, e)
+            return True
+
+        TESLIM.gozlemle(time.monotonic() - is_.kuyruga_giris)
+        if duzenleme:
+            DUZENLENEN.artir()
+            logger.info("Grup ID %s mesajı %s yeni SMS ile düzenlendi.", is_.chat_id, birlesik.mesaj_id)
+        else:
+            GONDERILEN.artir()
+            logger.info("SMS hedef grup ID %s'ye yönlendirildi.", is_.chat_id)
+        if birlesik is not None:
+            if not duzenleme:
+                birlesik.mesaj_id = mesaj.message_id
+            return self._birlesik_tamamlandi(is_, surum)
+        return True
+
+    def _birlesik_tamamlandi(self, is_: GonderimIsi, surum: int) -> bool:
+        """
+        Gönderim/düzenleme bitti; bu sırada yeni SMS eklendiyse bir düzenleme daha kuyruğa
+        alır ve False döner (iş sürüyor), yoksa True.
+        """
+        birlesik = is_.birlesik
+        birlesik.gonderilen_surum = surum
+        if birlesik.surum > surum:
+            is_.deneme = 0
+            is_.kuyruga_giris = time.monotonic()
+            self.kuyruk.put_nowait(is_)
+            return False
+        birlesik.isleniyor = False
+        return True
+
+    def _basarisiz(self, is_: GonderimIsi) -> None:
+        BASARISIZ.artir()
+        if is_.birlesik is not None:
+            # Sonraki SMS birleşik mesajı yeniden göndermeyi dener
+            is_.birlesik.isleniyor = False
+
+    async def _bosalmasini_bekle(self) -> None:
+        # Ertelenmiş işler kuyruğa geri dönene kadar join() yeterli değil
+        while True:
+            await self.kuyruk.join()
+            if not self._bekleyen_tekrarlar and not self._bekletilen_sayisi:
+                return
+            await asyncio.sleep(0.1)
+
+    async def durdur(self, zaman_asimi: float = 10.0) -> None:
+        """Kuyruktaki işlerin bitmesini en fazla zaman_asimi kadar bekler, sonra işçileri kapatır."""
+        try:
+            await asyncio.wait_for(self._bosalmasini_bekle(), timeout=zaman_asimi)
+        except asyncio.TimeoutError:
+            logger.warning(f"Gönderici kapanırken {self.kuyruk_derinligi} mesaj gönderilemeden kaldı.")
+        for isci in self._isciler:
+            isci.cancel()
+        await asyncio.gather(*self._isciler, return_exceptions=True)
+        self._isciler = []
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+
+class TokenKovasi:
+    """
+    Basit asenkron token kovası (token bucket) hız sınırlayıcısı.
+
+    Kova `kapasite` kadar token alır ve saniyede `hiz` token dolar. al() token yoksa
+    gerektiği kadar bekler; böylece kısa patlamalara izin verilirken ortalama hız
+    `hiz` ile sınırlanır.
+    """
+
+    def __init__(self, hiz: float, kapasite: float):
+        self.hiz = hiz
+        self.kapasite = kapasite
+        self.tokenler = kapasite
+        self.son_dolum = time.monotonic()
+
+    def _doldur(self) -> None:
+        simdi = time.monotonic()
+        self.tokenler = min(self.kapasite, self.tokenler + (simdi - self.son_dolum) * self.hiz)
+        self.son_dolum = simdi
+
+    def bekleme_suresi(self) -> float:
+        """Bir token için beklenmesi gereken süreyi (saniye) döner; 0 ise hemen alınabilir."""
+        self._doldur()
+        if self.tokenler >= 1:
+            return 0.0
+        return (1 - self.tokenler) / self.hiz
+
+    def duraklat(self, sure: float) -> None:
+        """Sonraki token en erken `sure` saniye sonra verilir (sunucu "sonra tekrar dene" dediğinde)."""
+        self._doldur()
+        self.tokenler = min(self.tokenler, 1 - sure * self.hiz)
+
+    def hemen_al(self) -> float:
+        """Token varsa beklemeden alır ve 0 döner; yoksa almaz, gereken bekleme süresini döner."""
+        sure = self.bekleme_suresi()
+        if sure == 0.0:
+            self.tokenler -= 1
+        return sure
+
+    async def al(self) -> float:
+        """Bir token alır, gerekirse bekler. Toplam bekleme süresini döner."""
+        beklenen = 0.0
+        while True:
+            sure = self.bekleme_suresi()
+            if sure == 0.0:
+                self.tokenler -= 1
+                return beklenen
+            await asyncio.sleep(sure)
+            beklenen += sure
@@ -0,0 +1,238 @@
+"""
+Grup ve numara başına geçmiş SMS istatistikleri (saatlik ve günlük kovalar, SQLite).
+
+SMS sayaçları önce bellekteki bir tamponda toplanır; arka plan görevi bunları
+belirli aralıklarla tek bir işlemde (transaction) saatlik ve günlük tablolara
+ekler. Sorgular önceden toplanmış günlük tablolardan, (grup, gün) birincil anahtar
+indeksi üzerinden aralık taramasıyla cevaplanır; böylece aylarca veri birikse de
+/rapor 7g gibi sorgular milisaniyeler sürer.
+
+Saklama süresi dolan saatlik kayıtlar silinir (günlük kayıtlarda özet kalır), günlük
+kayıtlar da kendi saklama süresi dolunca silinir.
+"""
+import asyncio
+import datetime
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrikler import kayit as metrik_kaydi
+
+logger = logging.getLogger(__name__)
+
+SEMA = """
+CREATE TABLE IF NOT EXISTS saatlik (
+    grup INTEGER NOT NULL,
+    saat INTEGER NOT NULL,      -- Unix zamanı / 3600
+    numara TEXT NOT NULL,
+    adet INTEGER NOT NULL,
+    PRIMARY KEY (grup, saat, numara)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS gunluk (
+    grup INTEGER NOT NULL,
+    gun INTEGER NOT NULL,       -- YYYYMMDD (yerel saat dilimi)
+    numara TEXT NOT NULL,
+    adet INTEGER NOT NULL,
+    PRIMARY KEY (grup, gun, numara)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS gunluk_toplam (
+    grup INTEGER NOT NULL,
+    gun INTEGER NOT NULL,
+    adet INTEGER NOT NULL,
+    PRIMARY KEY (grup, gun)
+) WITHOUT ROWID;
+"""
+
+# "/rapor Ng" için en fazla gün; timedelta taşmasın (günlük kayıtlar zaten ~400 gün saklanır)
+MAKS_GUN_SAYISI = 3660
+
+ISTATISTIK_YAZMA_SURESI = metrik_kaydi.histogram('istatistik_yazma_suresi_saniye', "Geçmiş istatistik tamponunun SQLite'a yazılma süresi")
+
+
+def gun_anahtari(tarih: datetime.date) -> int:
+    return tarih.year * 10000 + tarih.month * 100 + tarih.day
+
+
+def tarih_araligi_ayikla(argumanlar: list[str], bugun: datetime.date) -> tuple[datetime.date, datetime.date] | None:
+    """
+    /rapor argümanlarından gün aralığı çıkarır; tanınmazsa None döner.
+
+    - "7g": bugün dahil son 7 gün
+    - "2026-10-01": tek gün
+    - "2026-10-01 2026-10-15": iki tarih arası (her iki gün dahil)
+    """
+    if len(argumanlar) == 1 and argumanlar[0].lower().endswith('g') and argumanlar[0][:-1].isdigit():
+        gun_sayisi = int(argumanlar[0][:-1])
+        if not 1 <= gun_sayisi <= MAKS_GUN_SAYISI:
+            return None
+        return bugun - datetime.timedelta(days=gun_sayisi - 1), bugun
+    if len(argumanlar) in (1, 2):
+        try:
+            tarihler = [datetime.date.fromisoformat(a) for a in argumanlar]
+        except ValueError:
+            return None
+        baslangic, bitis = tarihler[0], tarihler[-1]
+        if baslangic > bitis:
+            baslangic, bitis = bitis, baslangic
+        return baslangic, bitis
+    return None
+
+
+class IstatistikDeposu:
+    """Saatlik/günlük SMS sayaçlarını SQLite'ta tutan, sorgulayan ve budayan depo."""
+
+    def __init__(self, yol: str, saat_dilimi, saatlik_saklama_gun: int = 14, gunluk_saklama_gun: int = 400,
+                 aralik_sn: float = 5.0):
+        self.yol = yol
+        self.saat_dilimi = saat_dilimi
+        self.saatlik_saklama_gun = saatlik_saklama_gun
+        self.gunluk_saklama_gun = gunluk_saklama_gun
+        self.aralik_sn = aralik_sn
+        # (grup, saat, gün, numara) -> adet
+        self._tampon: dict[tuple, int] = {}
+        # Tüm SQLite erişimi tek iş parçacığında; bağlantı o iş parçacığında açılır
+        self._yurutucu = ThreadPoolExecutor(max_workers=1, thread_name_prefix='istatistik')
+        self._baglanti = None
+        self._gorev = None
+        self._son_budama_gunu = None
+        # Saat dilimi dönüşümü pahalı; aynı saatteki SMS'ler aynı güne düşer (tam saatlik ofset)
+        self._son_saat = None
+        self._son_gun = None
+
+    # --- Olay döngüsü tarafı ---
+
+    def artir(self, grup_id: int, tel_no: str, zaman: float | None = None) -> None:
+        """Bir SMS'i tampona ekler (O(1), disk I/O yok)."""
+        zaman = time.time() if zaman is None else zaman
+        saat = int(zaman // 3600)
+        if saat != self._son_saat:
+            self._son_gun = gun_anahtari(datetime.datetime.fromtimestamp(saat * 3600, self.saat_dilimi).date())
+            self._son_saat = saat
+        anahtar = (grup_id, saat, self._son_gun, tel_no)
+        self._tampon[anahtar] = self._tampon.get(anahtar, 0) + 1
+
+    async def _calistir(self, fonksiyon, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._yurutucu, fonksiyon, *args)
+
+    def baslat(self) -> None:
+        self._gorev = asyncio.create_task(self._dongu())
+
+    async def _dongu(self) -> None:
+        while True:
+            await asyncio.sleep(self.aralik_sn)
+            try:
+                await self.bosalt()
+            except Exception as e:
+                logger.error(f"Geçmiş istatistikler yazılırken hata oluştu: {e}")
+
+    async def bosalt(self) -> None:
+        """Tampondaki sayaçları veritabanına yazar; gün değiştiyse eski kayıtları budar."""
+        tampon, self._tampon = self._tampon, {}
+        bugun = datetime.datetime.now(self.saat_dilimi).date()
+        if tampon:
+            try:
+                with ISTATISTIK_YAZMA_SURESI.olc():
+                    await self._calistir(self._yaz, tampon)
+            except Exception:
+                # İşlem geri alındı (kilitli veritabanı, dolu disk...): sayaçlar kaybolmasın,
+                # bu arada gelenlerle birleştirilip sonraki turda tekrar yazılsın. İptalde
+                # (CancelledError) yazma executor'da sürdüğü için geri konmaz.
+                for anahtar, adet in tampon.items():
+                    self._tampon[anahtar] = self._tampon.get(anahtar, 0) + adet
+                raise
+        if self._son_budama_gunu != bugun:
+            await self._calistir(self._buda, bugun)
+            self._son_budama_gunu = bugun
+
+    async def durdur(self) -> None:
+        if self._gorev is not None:
+            self._gorev.cancel()
+            try:
+                await self._gorev
+            except asyncio.CancelledError:
+                pass
+            self._gorev = None
+        await self.bosalt()
+        await self._calistir(self._kapat)
+        self._yurutucu.shutdown(wait=True)
+
+    async def sorgula(self, grup_id: int, baslangic: datetime.date, bitis: datetime.date, ilk_k: int = 20) -> dict:
+        """
+        [baslangic, bitis] günleri için grubun toplam SMS sayısını, farklı numara sayısını
+        ve en çok SMS alan ilk_k numarayı döner. Henüz yazılmamış tampon önce yazılır.
+        """
+        await self.bosalt()
+        return await self._calistir(self._sorgula, grup_id, gun_anahtari(baslangic), gun_anahtari(bitis), ilk_k)
+
+    # --- Veritabanı iş parçacığı tarafı ---
+
+    def _db(self) -> sqlite3.Connection:
+        if self._baglanti is None:
+            self._baglanti = sqlite3.connect(self.yol)
+            self._baglanti.execute("PRAGMA journal_mode=WAL")
+            self._baglanti.execute("PRAGMA synchronous=NORMAL")
+            self._baglanti.executescript(SEMA)
+        return self._baglanti
+
+    def _yaz(self, tampon: dict) -> None:
+        saatlik = {}
+        gunluk = {}
+        gunluk_toplam = {}
+        for (grup, saat, gun, numara), adet in tampon.items():
+            saatlik[(grup, saat, numara)] = saatlik.get((grup, saat, numara), 0) + adet
+            gunluk[(grup, gun, numara)] = gunluk.get((grup, gun, numara), 0) + adet
+            gunluk_toplam[(grup, gun)] = gunluk_toplam.get((grup, gun), 0) + adet
+
+        db = self._db()
+        with db:
+            db.executemany(
+                "INSERT INTO saatlik (grup, saat, numara, adet) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (grup, saat, numara) DO UPDATE SET adet = adet + excluded.adet",
+                [(*k, v) for k, v in saatlik.items()]
+            )
+            db.executemany(
+                "INSERT INTO gunluk (grup, gun, numara, adet) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (grup, gun, numara) DO UPDATE SET adet = adet + excluded.adet",
+                [(*k, v) for k, v in gunluk.items()]
+            )
+            db.executemany(
+                "INSERT INTO gunluk_toplam (grup, gun, adet) VALUES (?, ?, ?) "
+                "ON CONFLICT (grup, gun) DO UPDATE SET adet = adet + excluded.adet",
+                [(*k, v) for k, v in gunluk_toplam.items()]
+            )
+
+    def _buda(self, bugun: datetime.date) -> None:
+        saatlik_sinir = int(time.time() // 3600) - self.saatlik_saklama_gun * 24
+        gunluk_sinir = gun_anahtari(bugun - datetime.timedelta(days=self.gunluk_saklama_gun))
+        db = self._db()
+        with db:
+            silinen_saatlik = db.execute("DELETE FROM saatlik WHERE saat < ?", (saatlik_sinir,)).rowcount
+            silinen_gunluk = db.execute("DELETE FROM gunluk WHERE gun < ?", (gunluk_sinir,)).rowcount
+            db.execute("DELETE FROM gunluk_toplam WHERE gun < ?", (gunluk_sinir,))
+        if silinen_saatlik or silinen_gunluk:
+            logger.info(f"Geçmiş istatistik budandı: {silinen_saatlik} saatlik, {silinen_gunluk} günlük kayıt silindi.")
+
+    def _sorgula(self, grup_id: int, baslangic: int, bitis: int, ilk_k: int) -> dict:
+        db = self._db()
+        (toplam,) = db.execute(
+            "SELECT COALESCE(SUM(adet), 0) FROM gunluk_toplam WHERE grup = ? AND gun BETWEEN ? AND ?",
+            (grup_id, baslangic, bitis)
+        ).fetchone()
+        satirlar = db.execute(
+            "SELECT numara, SUM(adet) AS toplam FROM gunluk WHERE grup = ? AND gun BETWEEN ? AND ? "
+            "GROUP BY numara ORDER BY toplam DESC",
+            (grup_id, baslangic, bitis)
+        )
+        en_cok = []
+        numara_sayisi = 0
+        for numara, adet in satirlar:
+            if numara_sayisi < ilk_k:
+                en_cok.append((numara, adet))
+            numara_sayisi += 1
+        return {'toplam': toplam, 'numara_sayisi': numara_sayisi, 'en_cok': en_cok}
+
+    def _kapat(self) -> None:
+        if self._baglanti is not None:
+            self._baglanti.close()
+            self._baglanti = None
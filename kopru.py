@@ -0,0 +1,108 @@
+"""
+User-bot ile Ana Bot arasındaki SMS köprüsü (transport) seçenekleri.
+
+- TelegramKopru: Varsayılan iki süreçli mod. SMS metni Ana Bot'a Telegram mesajı
+  olarak gönderilir, Ana Bot onu sms_isleyici_bot ile tekrar alır.
+- KuyrukKopru: Tek süreç modu (tek_surec.py). Pyrogram istemcisi ve PTB Application
+  aynı event loop'ta çalışır, SMS'ler bellek içi kuyrukla doğrudan yönlendirmeye gider.
+- SoketKopru / soket_sunucusu_baslat: Ayrı süreçlerin aynı makinede çalıştığı
+  kurulumlar için Unix soketi üzerinden satır başına bir JSON kaydı.
+"""
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramKopru:
+    """SMS metnini Ana Bot'a Telegram üzerinden gönderir."""
+
+    def __init__(self, client, ana_bot_kullanici_adi: str):
+        self.client = client
+        self.hedef = f"@{ana_bot_kullanici_adi}"
+
+    async def ilet(self, metin: str) -> None:
+        await self.client.send_message(chat_id=self.hedef, text=metin)
+
+
+class KuyrukKopru:
+    """Aynı süreçteki yönlendirme koduna bellek içi asyncio kuyruğuyla iletir."""
+
+    def __init__(self, maks_boyut: int = 0):
+        self.kuyruk: asyncio.Queue[str] = asyncio.Queue(maxsize=maks_boyut)
+
+    async def ilet(self, metin: str) -> None:
+        await self.kuyruk.put(metin)
+
+    async def tuket(self, isleyici) -> None:
+        """Kuyruktaki her SMS metnini sırayla `await isleyici(metin)` ile işler."""
+        while True:
+            metin = await self.kuyruk.get()
+            try:
+                await isleyici(metin)
+            except Exception as e:
+                logger.error(f"Köprü kuyruğundaki SMS işlenirken hata oluştu: {e}")
+            finally:
+                self.kuyruk.task_done()
+
+
+class SoketKopru:
+    """SMS metnini yerel Unix soketini dinleyen Ana Bot'a JSON satırı olarak yazar."""
+
+    def __init__(self, soket_yolu: str):
+        self.soket_yolu = soket_yolu
+        self._yazici = None
+        self._kilit = asyncio.Lock()
+
+    async def ilet(self, metin: str) -> None:
+        satir = (json.dumps({'metin': metin}, ensure_ascii=False) + '\n').encode('utf-8')
+        async with self._kilit:
+            # Bağlantı koptuysa bir kez yeniden bağlanıp dene; yine olmazsa hata yukarı çıkar
+            for deneme in range(2):
+                try:
+                    if self._yazici is None or self._yazici.is_closing():
+                        _, self._yazici = await asyncio.open_unix_connection(self.soket_yolu)
+                    self._yazici.write(satir)
+                    await self._yazici.drain()
+                    return
+                except (ConnectionError, FileNotFoundError):
+                    self._yazici = None
+                    if deneme == 1:
+                        raise
+
+
+async def soket_sunucusu_baslat(soket_yolu: str, isleyici) -> asyncio.AbstractServer:
+    """Unix soketini dinler ve gelen her JSON satırındaki SMS metnini `await isleyici(metin)` ile işler."""
+
+    async def baglanti(okuyucu: asyncio.StreamReader, yazici: asyncio.StreamWriter) -> None:
+        try:
+            while satir := await okuyucu.readline():
+                try:
+                    metin = json.loads(satir)['metin']
+                except (ValueError, KeyError):
+                    logger.warning("Köprü soketinden bozuk kayıt alındı, yoksayıldı.")
+                    continue
+                try:
+                    await isleyici(metin)
+                except Exception as e:
+                    logger.error(f"Köprü soketinden gelen SMS işlenirken hata oluştu: {e}")
+        finally:
+            yazici.close()
+
+    # Soket SMS metni (OTP) taşır: sadece bu kullanıcı erişebilsin
+    dizin = os.path.dirname(soket_yolu)
+    if dizin and not os.path.isdir(dizin):
+        os.makedirs(dizin, mode=0o700)
+    if os.path.exists(soket_yolu):
+        os.unlink(soket_yolu)  # Önceki çalıştırmadan kalan soket dosyası
+    # bind ile chmod arasında soket başkalarına açık kalmasın diye umask da kısıtlanır
+    eski_umask = os.umask(0o177)
+    try:
+        sunucu = await asyncio.start_unix_server(baglanti, path=soket_yolu)
+    finally:
+        os.umask(eski_umask)
+    os.chmod(soket_yolu, 0o600)
+    logger.info(f"Köprü soketi dinleniyor: {soket_yolu}")
+    return sunucu
@@ -0,0 +1,201 @@
+"""
+Olay döngüsünü bloklamayan, yapılandırılmış (JSON) log hattı.
+
+Log çağrısı yapan thread sadece kaydı sınırlı bir kuyruğa koyar; biçimlendirme, OTP
+maskeleme ve stderr'e yazma QueueListener thread'inde yapılır. Böylece SMS patlaması
+sırasında log I/O'su event loop'u durdurmaz. Kuyruk doluysa kayıt beklenmeden atılır
+ve `log_dusurulen_toplam` sayacı artar.
+
+%-biçimli çağrılarda (`logger.info("... %s", x)`) argümanlar değişmez türdeyse mesaj
+da listener thread'inde birleştirilir; seviyesi kapalı kategorilerde hiç birleştirilmez.
+
+Tekrarlayan satırlar örneklenir: aynı kategori ve mesaj şablonundan (record.msg) bir
+pencerede en fazla `ornekleme_adedi` kayıt geçer, fazlası sayılır ve pencere sonrasındaki
+ilk kayda `bastirilan` alanı olarak eklenir. WARNING ve üstü örneklenmez.
+"""
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import time
+
+from metrikler import kayit as metrik_kaydi
+
+LOG_DUSURULEN = metrik_kaydi.sayac('log_dusurulen_toplam', "Kuyruk dolu olduğu için atılan log kayıtları")
+LOG_BASTIRILAN = metrik_kaydi.sayac('log_bastirilan_toplam', "Örnekleme ile bastırılan tekrarlayan log satırları")
+
+METIN_BICIMI = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Mesajı listener thread'ine ertelenebilecek (sonradan değişmeyecek) argüman türleri
+_DEGISMEZ_TURLER = (str, int, float, bool, type(None))
+
+# SMS içeriğinde OTP taşıyan alanlar: "Kod: 123456" / "Kod: `123456`" ve "Mesaj: ..." satırı
+_OTP_DESENLERI = (
+    (re.compile(r'(Kod:\s*)`?[^\s`]+`?', re.IGNORECASE), r'\1***'),
+    (re.compile(r'(Mesaj:\s*)[^\n]*', re.IGNORECASE), r'\1***'),
+)
+
+# LogRecord'un kendi alanları; geri kalanlar (extra=...) JSON'a ayrı alan olarak yazılır
+_STANDART_ALANLAR = frozenset(logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {'message', 'asctime', 'bastirilan'}
+
+_dinleyici: logging.handlers.QueueListener | None = None
+
+
+def otp_maskele(metin: str) -> str:
+    """Metindeki doğrulama kodlarını ve SMS gövdesini *** ile değiştirir."""
+    for desen, yerine in _OTP_DESENLERI:
+        metin = desen.sub(yerine, metin)
+    return metin
+
+
+def seviye_ayikla(ad: str) -> int:
+    """"INFO", "warning" gibi seviye adını sayıya çevirir."""
+    seviye = logging.getLevelName(ad.strip().upper())
+    if not isinstance(seviye, int):
+        raise ValueError(f"Geçersiz log seviyesi: {ad!r}")
+    return seviye
+
+
+def seviyeleri_ayikla(metin: str) -> dict[str, int]:
+    """"user_bot=WARNING,httpx=ERROR" biçimini {kategori: seviye} sözlüğüne çevirir."""
+    seviyeler = {}
+    for parca in metin.split(','):
+        if not parca.strip():
+            continue
+        ad, _, seviye_adi = parca.partition('=')
+        if not ad.strip():
+            raise ValueError(f"Geçersiz log seviyesi tanımı: {parca!r}")
+        seviyeler[ad.strip()] = seviye_ayikla(seviye_adi)
+    return seviyeler
+
+
+class JsonBicimleyici(logging.Formatter):
+    """Her kaydı tek satırlık JSON nesnesi olarak, OTP'leri maskeleyerek biçimlendirir."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        veri = {
+            'zaman': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'seviye': record.levelname,
+            'kategori': record.name,
+            'mesaj': otp_maskele(record.getMessage()),
+        }
+        for ad, deger in record.__dict__.items():
+            if ad not in _STANDART_ALANLAR:
+                veri[ad] = deger
+        if getattr(record, 'bastirilan', 0):
+            veri['bastirilan'] = record.bastirilan
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            veri['hata'] = otp_maskele(record.exc_text)
+        return json.dumps(veri, ensure_ascii=False, default=str)
+
+
+class MetinBicimleyici(logging.Formatter):
+    """Eski düz metin biçimi; OTP maskeleme ve bastırılan satır sayısıyla."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        metin = otp_maskele(super().format(record))
+        if getattr(record, 'bastirilan', 0):
+            metin += f" (+{record.bastirilan} benzer satır bastırıldı)"
+        return metin
+
+
+class OrneklemeFiltresi(logging.Filter):
+    """Aynı şablondan gelen tekrarlayan satırları pencere başına `adet` ile sınırlar."""
+
+    # Şablon yerine f-string kullanan çağrılar her seferinde yeni anahtar üretir; sınırsız büyümesin
+    MAKS_ANAHTAR = 1000
+
+    def __init__(self, pencere_sn: float, adet: int):
+        super().__init__()
+        self.pencere_sn = pencere_sn
+        self.adet = adet
+        self._sayaclar: dict[tuple, list] = {}  # (kategori, şablon) -> [pencere başı, geçen, bastırılan]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.adet:
+            return True
+        anahtar = (record.name, record.msg)
+        simdi = time.monotonic()
+        sayac = self._sayaclar.get(anahtar)
+        if sayac is None:
+            if len(self._sayaclar) >= self.MAKS_ANAHTAR:
+                self._sayaclar.clear()
+            sayac = self._sayaclar[anahtar] = [simdi, 0, 0]
+        elif simdi - sayac[0] >= self.pencere_sn:
+            if sayac[2]:
+                record.bastirilan = sayac[2]
+            sayac[:] = [simdi, 0, 0]
+        if sayac[1] < self.adet:
+            sayac[1] += 1
+            return True
+        sayac[2] += 1
+        LOG_BASTIRILAN.artir()
+        return False
+
+
+class KuyrukIsleyici(logging.handlers.QueueHandler):
+    """Kaydı biçimlendirmeden kuyruğa koyan, kuyruk doluysa bekleyip bloklamak yerine atan işleyici."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Traceback nesneleri thread'ler arasında taşınmaz; metne şimdi çevrilir (seyrek durum)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(a, _DEGISMEZ_TURLER) for a in args)):
+            # Değişebilir nesneler (dict, liste, Update...) kuyrukta beklerken değişebilir
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_DUSURULEN.artir()
+
+
+def kur(seviye: int = logging.INFO, kategori_seviyeleri: dict[str, int] | None = None, bicim: str = 'json',
+        ornekleme_penceresi_sn: float = 10.0, ornekleme_adedi: int = 20, kuyruk_boyutu: int = 10000) -> None:
+    """
+    Kök logger'ı kuyruk hattına bağlar ve yazıcı thread'i başlatır.
+
+    Tek süreç modunda bot.py ve user_bot.py ikisi de çağırır; ilk çağrı hattı kurar,
+    sonrakiler sadece kategori seviyelerini ekler.
+    """
+    global _dinleyici
+    for ad, kategori_seviyesi in (kategori_seviyeleri or {}).items():
+        logging.getLogger(ad).setLevel(kategori_seviyesi)
+    if _dinleyici is not None:
+        return
+
+    yazici = logging.StreamHandler(sys.stderr)
+    yazici.setFormatter(JsonBicimleyici() if bicim == 'json' else MetinBicimleyici(METIN_BICIMI))
+    kuyruk = queue.Queue(kuyruk_boyutu)
+    isleyici = KuyrukIsleyici(kuyruk)
+    isleyici.addFilter(OrneklemeFiltresi(ornekleme_penceresi_sn, ornekleme_adedi))
+
+    kok = logging.getLogger()
+    for eski in list(kok.handlers):
+        kok.removeHandler(eski)
+    kok.addHandler(isleyici)
+    kok.setLevel(seviye)
+
+    _dinleyici = logging.handlers.QueueListener(kuyruk, yazici)
+    _dinleyici.start()
+    # Kapanışta kuyrukta kalan kayıtlar yazılsın
+    atexit.register(durdur)
+
+
+def durdur() -> None:
+    """Kuyruktaki kayıtları yazıp yazıcı thread'i durdurur."""
+    global _dinleyici
+    if _dinleyici is not None:
+        _dinleyici.stop()
+        _dinleyici = None
@@ -0,0 +1,263 @@
+"""
+Bağımlılıksız, süreç içi metrikler (sayaç, gösterge, histogram) ve Prometheus
+metin formatında yayın yapan küçük bir yerel HTTP uç noktası.
+
+Tüm modüller metriklerini varsayılan `kayit` üzerine tanımlar; tek süreç modunda
+bot.py ve user_bot.py'nin metrikleri aynı uç noktada görünür.
+"""
+import asyncio
+import logging
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Saniye cinsinden varsayılan gecikme kovaları (0,1 ms .. 60 sn)
+VARSAYILAN_KOVALAR = (0.0001, 0.00025, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _etiket_metni(anahtarlar: tuple, degerler: tuple, ek: str = '') -> str:
+    parcalar = [f'{a}="{d}"' for a, d in zip(anahtarlar, degerler)]
+    if ek:
+        parcalar.append(ek)
+    return '{' + ','.join(parcalar) + '}' if parcalar else ''
+
+
+class _Metrik:
+    tur = ''
+
+    def __init__(self, ad: str, aciklama: str, etiketler: tuple = ()):
+        self.ad = ad
+        self.aciklama = aciklama
+        self.etiketler = tuple(etiketler)
+        self._cocuklar = {}
+
+    def etiket(self, *degerler):
+        """Etiket değerleri için alt metriği döner (yoksa oluşturur)."""
+        degerler = tuple(str(d) for d in degerler)
+        cocuk = self._cocuklar.get(degerler)
+        if cocuk is None:
+            cocuk = self._cocuklar[degerler] = self._yeni_cocuk()
+        return cocuk
+
+    def _ornekler(self):
+        """(etiket_değerleri, çocuk) çiftleri; etiketsiz metrikte tek çocuk."""
+        if not self.etiketler:
+            return [((), self.etiket())]
+        return sorted(self._cocuklar.items())
+
+    def prometheus(self) -> list[str]:
+        satirlar = [f"# HELP {self.ad} {self.aciklama}", f"# TYPE {self.ad} {self.tur}"]
+        for degerler, cocuk in self._ornekler():
+            satirlar.extend(self._cocuk_satirlari(degerler, cocuk))
+        return satirlar
+
+
+class _SayacDegeri:
+    __slots__ = ('deger',)
+
+    def __init__(self):
+        self.deger = 0.0
+
+    def artir(self, miktar: float = 1.0) -> None:
+        self.deger += miktar
+
+
+class Sayac(_Metrik):
+    """Sadece artan sayaç (ör. işlenen SMS sayısı)."""
+    tur = 'counter'
+    _yeni_cocuk = _SayacDegeri
+
+    def artir(self, miktar: float = 1.0) -> None:
+        self.etiket().artir(miktar)
+
+    def _cocuk_satirlari(self, degerler, cocuk):
+        return [f"{self.ad}{_etiket_metni(self.etiketler, degerler)} {cocuk.deger}"]
+
+
+class _GostergeDegeri:
+    __slots__ = ('deger', 'fonksiyon')
+
+    def __init__(self):
+        self.deger = 0.0
+        self.fonksiyon = None
+
+    def ayarla(self, deger: float) -> None:
+        self.deger = deger
+
+    def fonksiyon_ayarla(self, fonksiyon) -> None:
+        """Değer her okunduğunda fonksiyon() çağrılarak hesaplanır."""
+        self.fonksiyon = fonksiyon
+
+    def oku(self) -> float:
+        if self.fonksiyon is not None:
+            try:
+                return float(self.fonksiyon())
+            except Exception:
+                return math.nan
+        return self.deger
+
+
+class Gosterge(_Metrik):
+    """Anlık değer (ör. kuyruk derinliği, numara sayısı)."""
+    tur = 'gauge'
+    _yeni_cocuk = _GostergeDegeri
+
+    def ayarla(self, deger: float) -> None:
+        self.etiket().ayarla(deger)
+
+    def fonksiyon_ayarla(self, fonksiyon) -> None:
+        self.etiket().fonksiyon_ayarla(fonksiyon)
+
+    def _cocuk_satirlari(self, degerler, cocuk):
+        return [f"{self.ad}{_etiket_metni(self.etiketler, degerler)} {cocuk.oku()}"]
+
+
+class _HistogramDegeri:
+    __slots__ = ('kovalar', 'sayilar', 'toplam', 'adet')
+
+    def __init__(self, kovalar: tuple):
+        self.kovalar = kovalar
+        self.sayilar = [0] * (len(kovalar) + 1)  # Son eleman +Inf
+        self.toplam = 0.0
+        self.adet = 0
+
+    def gozlemle(self, deger: float) -> None:
+        self.sayilar[bisect_left(self.kovalar, deger)] += 1
+        self.toplam += deger
+        self.adet += 1
+
+    @contextmanager
+    def olc(self):
+        """`with h.olc():` bloğunun süresini saniye olarak gözlemler."""
+        baslangic = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.gozlemle(time.perf_counter() - baslangic)
+
+    def yuzdelik(self, oran: float) -> float:
+        """Kovalardan yaklaşık yüzdelik (üst sınır) tahmini; gözlem yoksa 0."""
+        if not self.adet:
+            return 0.0
+        hedef = oran * self.adet
+        birikimli = 0
+        for sinir, sayi in zip(self.kovalar, self.sayilar):
+            birikimli += sayi
+            if birikimli >= hedef:
+                return sinir
+        return math.inf
+
+
+class Histogram(_Metrik):
+    """Kovalı dağılım (ör. aşama gecikmeleri)."""
+    tur = 'histogram'
+
+    def __init__(self, ad: str, aciklama: str, etiketler: tuple = (), kovalar: tuple = VARSAYILAN_KOVALAR):
+        super().__init__(ad, aciklama, etiketler)
+        self.kovalar = tuple(kovalar)
+
+    def _yeni_cocuk(self):
+        return _HistogramDegeri(self.kovalar)
+
+    def gozlemle(self, deger: float) -> None:
+        self.etiket().gozlemle(deger)
+
+    def olc(self):
+        return self.etiket().olc()
+
+    def _cocuk_satirlari(self, degerler, cocuk):
+        satirlar = []
+        birikimli = 0
+        for sinir, sayi in zip(self.kovalar, cocuk.sayilar):
+            birikimli += sayi
+            le = f'le="{sinir}"'
+            satirlar.append(f"{self.ad}_bucket{_etiket_metni(self.etiketler, degerler, le)} {birikimli}")
+        le = 'le="+Inf"'
+        satirlar.append(f"{self.ad}_bucket{_etiket_metni(self.etiketler, degerler, le)} {cocuk.adet}")
+        satirlar.append(f"{self.ad}_sum{_etiket_metni(self.etiketler, degerler)} {cocuk.toplam}")
+        satirlar.append(f"{self.ad}_count{_etiket_metni(self.etiketler, degerler)} {cocuk.adet}")
+        return satirlar
+
+
+class Kayit:
+    """Metrik kaydı; aynı adla ikinci tanım ilk tanımı döner."""
+
+    def __init__(self):
+        self.metrikler: dict[str, _Metrik] = {}
+
+    def _tanimla(self, sinif, ad, *args, **kwargs):
+        metrik = self.metrikler.get(ad)
+        if metrik is None:
+            metrik = self.metrikler[ad] = sinif(ad, *args, **kwargs)
+        return metrik
+
+    def sayac(self, ad: str, aciklama: str, etiketler: tuple = ()) -> Sayac:
+        return self._tanimla(Sayac, ad, aciklama, etiketler)
+
+    def gosterge(self, ad: str, aciklama: str, etiketler: tuple = ()) -> Gosterge:
+        return self._tanimla(Gosterge, ad, aciklama, etiketler)
+
+    def histogram(self, ad: str, aciklama: str, etiketler: tuple = (), kovalar: tuple = VARSAYILAN_KOVALAR) -> Histogram:
+        return self._tanimla(Histogram, ad, aciklama, etiketler, kovalar)
+
+    def prometheus_metni(self) -> str:
+        satirlar = []
+        for metrik in self.metrikler.values():
+            satirlar.extend(metrik.prometheus())
+        return '\n'.join(satirlar) + '\n'
+
+    def ozet(self) -> str:
+        """/metrik komutu için insan okunur kısa özet (histogramlarda adet, p50, p95)."""
+        satirlar = []
+        for metrik in self.metrikler.values():
+            for degerler, cocuk in metrik._ornekler():
+                ad = metrik.ad + (f"[{','.join(degerler)}]" if degerler else '')
+                if isinstance(metrik, Histogram):
+                    if not cocuk.adet:
+                        continue
+                    satirlar.append(
+                        f"{ad}: n={cocuk.adet} p50≤{cocuk.yuzdelik(0.5)}s p95≤{cocuk.yuzdelik(0.95)}s "
+                        f"ort={cocuk.toplam / cocuk.adet:.4f}s"
+                    )
+                else:
+                    deger = cocuk.oku() if isinstance(metrik, Gosterge) else cocuk.deger
+                    satirlar.append(f"{ad}: {deger:.0f}" if float(deger).is_integer() else f"{ad}: {deger:.3f}")
+        return '\n'.join(satirlar)
+
+
+kayit = Kayit()
+
+
+async def http_sunucusu_baslat(port: int, host: str = '127.0.0.1', metrik_kaydi: Kayit = kayit) -> asyncio.AbstractServer:
+    """GET /metrics isteklerine Prometheus metin formatıyla yanıt veren yerel HTTP sunucusu."""
+
+    async def baglanti(okuyucu: asyncio.StreamReader, yazici: asyncio.StreamWriter) -> None:
+        try:
+            istek_satiri = await okuyucu.readline()
+            while (await okuyucu.readline()).strip():
+                pass  # Başlıkları atla
+            parcalar = istek_satiri.decode('latin-1').split()
+            if len(parcalar) >= 2 and parcalar[0] == 'GET' and parcalar[1].split('?')[0] in ('/metrics', '/'):
+                govde = metrik_kaydi.prometheus_metni().encode('utf-8')
+                durum = '200 OK'
+                tur = 'text/plain; version=0.0.4; charset=utf-8'
+            else:
+                govde = b'bulunamadi\n'
+                durum = '404 Not Found'
+                tur = 'text/plain'
+            yazici.write(
+                f"HTTP/1.1 {durum}\r\nContent-Type: {tur}\r\nContent-Length: {len(govde)}\r\n"
+                f"Connection: close\r\n\r\n".encode('latin-1') + govde
+            )
+            await yazici.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            yazici.close()
+
+    sunucu = await asyncio.start_server(baglanti, host=host, port=port)
+    logger.info(f"Metrik uç noktası dinleniyor: http://{host}:{port}/metrics")
+    return sunucu
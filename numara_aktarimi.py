@@ -0,0 +1,73 @@
+"""
+/ver ve /sil'e eklenen .txt/.csv belgelerinden numaraları akış halinde okur.
+
+Dosya satır satır okunur ve numaralar parça parça üretilir; dosyanın tamamı hiçbir
+zaman tek bir listeye ya da metne dönüştürülmez. Her satır virgül, noktalı virgül,
+sekme veya dikey çizgiyle hücrelere ayrılır. Her hücre normalleştirilir: boşluk,
+tire, parantez ve nokta silinir; +90 / 0090 / 90 ve baştaki 0 atılır. Sonuç 10
+haneli değilse hücre geçersiz sayılır. Hiç rakam içermeyen hücreler (CSV başlıkları,
+isimler) sessizce atlanır.
+"""
+import io
+import re
+
+# Bot API getFile ile en fazla 20 MB'lık dosya indirilebilir
+MAKS_DOSYA_BOYUTU = 20 * 1024 * 1024
+KABUL_EDILEN_UZANTILAR = ('.txt', '.csv')
+# Event loop'a sıra vermeden önce işlenecek numara sayısı
+PARCA_BOYUTU = 5000
+
+HUCRE_AYIRICI = re.compile(r'[,;\t|]')
+RAKAM = re.compile(r'\d')
+_SILINECEKLER = re.compile(r'[\s\-()."\']')
+
+
+def numara_normallestir(ham: str) -> str | None:
+    """'+90 532 123-45-67', '0532 123 45 67' gibi yazımları '5321234567' biçimine çevirir; olmazsa None."""
+    numara = _SILINECEKLER.sub('', ham)
+    if numara.startswith('+'):
+        numara = numara[1:]
+    if not (numara.isascii() and numara.isdigit()):
+        return None
+    uzunluk = len(numara)
+    if uzunluk == 12 and numara.startswith('90'):
+        numara = numara[2:]
+    elif uzunluk == 14 and numara.startswith('0090'):
+        numara = numara[4:]
+    elif uzunluk == 11 and numara.startswith('0'):
+        numara = numara[1:]
+    return numara if len(numara) == 10 else None
+
+
+def numaralari_oku(dosya, parca_boyutu: int = PARCA_BOYUTU):
+    """
+    İkili dosya nesnesinden (geçerli_numaralar, geçersiz_sayısı) parçaları üretir.
+    Geçerli numaralar listesi dosyadaki tekrarları içerebilir.
+    """
+    metin = io.TextIOWrapper(dosya, encoding='utf-8-sig', errors='replace', newline='')
+    gecerli = []
+    gecersiz = 0
+    try:
+        for satir in metin:
+            for hucre in HUCRE_AYIRICI.split(satir):
+                hucre = hucre.strip()
+                # Sık durum: zaten 10 haneli düz numara
+                if len(hucre) == 10 and hucre.isdigit() and hucre.isascii():
+                    gecerli.append(hucre)
+                    continue
+                if not RAKAM.search(hucre):
+                    continue  # Başlık, isim vb.
+                numara = numara_normallestir(hucre)
+                if numara is not None:
+                    gecerli.append(numara)
+                else:
+                    gecersiz += 1
+            if len(gecerli) >= parca_boyutu:
+                yield gecerli, gecersiz
+                gecerli = []
+                gecersiz = 0
+        if gecerli or gecersiz:
+            yield gecerli, gecersiz
+    finally:
+        # Sarmalayıcı kapanırken altındaki dosyayı kapatmasın
+        metin.detach()
@@ -0,0 +1,126 @@
+"""
+İzlenen numaralar için sıkışık küme: 10 haneli numaralar sıralı bir int64 dizisinde
+(array('q')) tutulur.
+
+Python'da set içindeki 10 karakterlik her str yaklaşık 59 bayt nesne + ~30 bayt
+hash tablosu yeri tutar. Burada numara başına 8 bayt harcanır ve dizi zaten sıralı
+olduğu için /aktif sayfalaması ve /ara önek araması ek bir indeks gerektirmez.
+Üyelik testi bisect ile O(log n), toplu ekleme/silme ise dizinin tek geçişte yeniden
+kurulmasıyla O(n + k log n).
+
+Numaralar dışarıya her zaman 10 haneli str olarak verilir (başta sıfır korunur).
+"""
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Bundan az değişiklikte dizinin yerinde insert/del'i (C'de memmove), fazlasında
+# tek geçişte yeniden oluşturma daha hızlı
+YERINDE_DEGISIKLIK_SINIRI = 64
+NUMARA_HANESI = 10
+# /aktif'te bir sayfada gösterilen numara sayısı
+AKTIF_SAYFA_BOYUTU = 100
+# /ara'da gösterilen en fazla sonuç
+ARA_SONUC_SINIRI = 50
+
+
+def numara_metni(numara: int) -> str:
+    return f"{numara:010d}"
+
+
+class NumaraKumesi:
+    """Sıralı int64 dizisi üzerinde numara kümesi (ekle, çıkar, üyelik, sıralı erişim)."""
+    __slots__ = ('_dizi',)
+
+    def __init__(self, numaralar=()):
+        self._dizi = array('q', sorted({int(n) for n in numaralar}))
+
+    @classmethod
+    def ikiliden(cls, veri: bytes) -> 'NumaraKumesi':
+        """ikili() çıktısından (küçük-endian int64) kümeyi geri kurar."""
+        kume = cls()
+        kume._dizi.frombytes(veri)
+        if sys.byteorder == 'big':
+            kume._dizi.byteswap()
+        return kume
+
+    def ikili(self) -> bytes:
+        """Kümenin sıkışık ikili hali: sıralı küçük-endian int64 değerleri."""
+        if sys.byteorder == 'big':
+            kopya = array('q', self._dizi)
+            kopya.byteswap()
+            return kopya.tobytes()
+        return self._dizi.tobytes()
+
+    def __len__(self) -> int:
+        return len(self._dizi)
+
+    def __bool__(self) -> bool:
+        return bool(self._dizi)
+
+    def __iter__(self):
+        return map(numara_metni, self._dizi)
+
+    def __contains__(self, numara) -> bool:
+        deger = int(numara)
+        i = bisect_left(self._dizi, deger)
+        return i < len(self._dizi) and self._dizi[i] == deger
+
+    def tamsayilar(self):
+        """Numaraların sıralı int değerleri (ters indeks için, kopyalamadan)."""
+        return self._dizi
+
+    def ekle(self, numaralar) -> list[int]:
+        """Kümede olmayan numaraları ekler ve eklenenleri (int, sıralı) döner."""
+        yeniler = sorted({int(n) for n in numaralar})
+        yeniler = [n for n in yeniler if n not in self]
+        if len(yeniler) <= YERINDE_DEGISIKLIK_SINIRI:
+            for n in yeniler:
+                self._dizi.insert(bisect_left(self._dizi, n), n)
+        elif yeniler:
+            # İki sıralı diziyi timsort tek geçişte birleştirir
+            self._dizi = array('q', sorted([*self._dizi, *yeniler]))
+        return yeniler
+
+    def cikar(self, numaralar) -> list[int]:
+        """Kümede olan numaraları çıkarır ve çıkarılanları (int, sıralı) döner."""
+        silinecekler = sorted({int(n) for n in numaralar})
+        silinecekler = [n for n in silinecekler if n in self]
+        if len(silinecekler) <= YERINDE_DEGISIKLIK_SINIRI:
+            for n in silinecekler:
+                del self._dizi[bisect_left(self._dizi, n)]
+        elif silinecekler:
+            # Silinenlerin arasındaki dilimleri kopyalayarak yeni dizi kur
+            eski = self._dizi
+            yeni = array('q')
+            onceki = 0
+            for n in silinecekler:
+                i = bisect_left(eski, n, onceki)
+                yeni.extend(eski[onceki:i])
+                onceki = i + 1
+            yeni.extend(eski[onceki:])
+            self._dizi = yeni
+        return silinecekler
+
+    def sayfa(self, sonra: str | None = None, once: str | None = None, boyut: int = AKTIF_SAYFA_BOYUTU) -> tuple[list[str], int]:
+        """
+        `sonra`dan büyük ilk `boyut` numarayı ya da `once`den küçük son `boyut` numarayı
+        döner. Sonuç: (sayfadaki numaralar, sayfanın kümedeki başlangıç sırası).
+        """
+        dizi = self._dizi
+        if once is not None:
+            bitis = bisect_left(dizi, int(once))
+            baslangic = max(0, bitis - boyut)
+            if baslangic == 0:
+                bitis = min(len(dizi), boyut)
+        else:
+            baslangic = bisect_right(dizi, int(sonra)) if sonra is not None else 0
+            bitis = min(len(dizi), baslangic + boyut)
+        return [numara_metni(n) for n in dizi[baslangic:bitis]], baslangic
+
+    def onek_ara(self, onek: str, sinir: int = ARA_SONUC_SINIRI) -> tuple[list[str], int]:
+        """`onek` ile başlayan numaralardan ilk `sinir` tanesini ve toplam eşleşme sayısını döner."""
+        carpan = 10 ** (NUMARA_HANESI - len(onek))
+        baslangic = bisect_left(self._dizi, int(onek) * carpan)
+        bitis = bisect_left(self._dizi, (int(onek) + 1) * carpan, baslangic)
+        return [numara_metni(n) for n in self._dizi[baslangic:min(bitis, baslangic + sinir)]], bitis - baslangic
@@ -0,0 +1,108 @@
+import csv
+import heapq
+import io
+import tempfile
+
+# /rapor'da gösterilen en çok SMS alan numara sayısı
+RAPOR_ILK_K = 20
+# Telegram mesaj sınırı 4096 karakter; biraz pay bırakıyoruz
+MESAJ_SINIRI = 4000
+# Bundan fazla numarası olan raporlar mesaj yerine CSV belgesi olarak gönderilir
+CSV_ESIGI = 300
+
+
+class RaporSayaci:
+    """
+    Bir grubun numara başına SMS sayaçları.
+
+    Toplam ve en çok SMS alan ilk K numara her artışta güncellenir; böylece /rapor
+    tüm sözlüğü sıralamadan O(K) sürede cevaplanır. Sayaçlar sadece arttığı (ya da
+    gün sonunda toptan sıfırlandığı) için ilk-K listesi her zaman kesindir: listede
+    olmayan her numaranın sayısı listedeki en küçük sayıdan büyük olamaz.
+    """
+    __slots__ = ('sayilar', 'toplam', 'k', '_enler')
+
+    def __init__(self, sayilar: dict | None = None, k: int = RAPOR_ILK_K):
+        self.sayilar = dict(sayilar) if sayilar else {}
+        self.toplam = sum(self.sayilar.values())
+        self.k = k
+        # (sayı, tel_no) çiftleri, sayıya göre azalan sırada
+        self._enler = [[s, n] for n, s in heapq.nlargest(k, self.sayilar.items(), key=lambda x: x[1])]
+
+    def __len__(self) -> int:
+        return len(self.sayilar)
+
+    def __bool__(self) -> bool:
+        return bool(self.sayilar)
+
+    def artir(self, tel_no: str, miktar: int = 1) -> None:
+        sayi = self.sayilar.get(tel_no, 0) + miktar
+        self.sayilar[tel_no] = sayi
+        self.toplam += miktar
+
+        enler = self._enler
+        for i, (_, n) in enumerate(enler):
+            if n == tel_no:
+                enler[i][0] = sayi
+                break
+        else:
+            if len(enler) < self.k:
+                enler.append([sayi, tel_no])
+                i = len(enler) - 1
+            elif sayi > enler[-1][0]:
+                enler[-1] = [sayi, tel_no]
+                i = len(enler) - 1
+            else:
+                return
+        # Güncellenen elemanı doğru yerine kaydır (K küçük, eklemeli sıralama yeterli)
+        while i > 0 and enler[i - 1][0] < enler[i][0]:
+            enler[i - 1], enler[i] = enler[i], enler[i - 1]
+            i -= 1
+
+    def en_cok(self) -> list[tuple[str, int]]:
+        """En çok SMS alan en fazla K numarayı (tel_no, sayı) olarak azalan sırada döner."""
+        return [(n, s) for s, n in self._enler]
+
+    def sirali(self):
+        """Tüm numaraları sayıya göre azalan sırada üretir (tam rapor için)."""
+        return sorted(self.sayilar.items(), key=lambda item: item[1], reverse=True)
+
+
+def parcalara_bol(baslik: str, satirlar, son: str = '', sinir: int = MESAJ_SINIRI):
+    """
+    Başlık + satırlar + son kısmını her biri `sinir` karakteri aşmayan mesaj
+    parçaları halinde üretir. Satırlar bir iterator olabilir; tam metin hiçbir
+    zaman bellekte birleştirilmez.
+    """
+    parca = [baslik]
+    uzunluk = len(baslik)
+    for satir in satirlar:
+        if parca and uzunluk + len(satir) + 1 > sinir:
+            yield '\n'.join(parca)
+            parca = []
+            uzunluk = 0
+        parca.append(satir)
+        uzunluk += len(satir) + 1
+    if son:
+        if uzunluk + len(son) + 1 > sinir:
+            yield '\n'.join(parca)
+            parca = []
+        parca.append(son)
+    if parca:
+        yield '\n'.join(parca)
+
+
+def csv_olustur(basliklar: list[str], satirlar):
+    """
+    Satırları diske taşabilen geçici bir dosyaya CSV olarak akıtır ve başa sarılmış
+    ikili dosya nesnesini döner (küçük raporlar bellekte kalır).
+    """
+    dosya = tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode='w+b')
+    metin = io.TextIOWrapper(dosya, encoding='utf-8-sig', newline='')
+    yazici = csv.writer(metin)
+    yazici.writerow(basliklar)
+    yazici.writerows(satirlar)
+    metin.flush()
+    metin.detach()
+    dosya.seek(0)
+    return dosya
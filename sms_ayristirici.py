@@ -0,0 +1,77 @@
+import hashlib
+import re
+
+# 'Tel No' büyük/küçük harfe duyarlı, literal önekli bir arama; numara yoksa metnin
+# geri kalanı hiç taranmaz.
+TEL_NO_DESENI = re.compile(r'Tel No:\s*(\d{10})')
+
+# Diğer alanları tek geçişte bulan desen. Her alan ilk geçtiği yerden alınır; değer
+# satır sonuna kadar sürer ve bir sonraki satıra geçmez (boş alan alt satırı yutmaz).
+# Değer lookahead içinde yakalanır, yani tüketilmez: "Mesaj: Onay Kod: 4455" satırındaki
+# Kod da bulunur. re.IGNORECASE her konumda pahalı olduğundan harf sınıfları elle
+# yazıldı; baştaki lookahead aday olmayan konumları hızla eler.
+ALAN_DESENI = re.compile(
+    r'(?=[UuMmKkSs])'
+    r'([Uu][Yy][Gg][Uu][Ll][Aa][Mm][Aa] [Aa][Dd][Iıİi]|[Mm][Ee][Ss][Aa][Jj]|[Kk][Oo][Dd]|[Ss][Aa][Aa][Tt])'
+    r':(?=[ \t]*([^\n]*))'
+)
+
+# Alan adının ilk harfi alanları ayırt etmeye yeter
+_ALAN_SLOTLARI = {'u': 'uygulama_adi', 'm': 'mesaj', 'k': 'kod', 's': 'saat'}
+
+
+class SmsKaydi:
+    """Bir SMS bildiriminden ayrıştırılan alanlar."""
+    __slots__ = ('tel_no', 'uygulama_adi', 'mesaj', 'kod', 'saat')
+
+    def __init__(self):
+        self.tel_no = None
+        self.uygulama_adi = None
+        self.mesaj = None
+        self.kod = None
+        self.saat = None
+
+    def bicimlendir(self) -> str:
+        """Hedef gruplara gönderilecek Markdown mesajını oluşturur (kod tıkla-kopyala biçiminde)."""
+        satirlar = ["✅ YENİ SMS GELDİ\n"]
+        if self.uygulama_adi:
+            satirlar.append(f"Uygulama Adı: {self.uygulama_adi}")
+        satirlar.append(f"Tel No: {self.tel_no}")
+        if self.mesaj:
+            satirlar.append(f"Mesaj: {self.mesaj}")
+        if self.kod:
+            satirlar.append(f"Kod: `{self.kod}`")
+        if self.saat:
+            satirlar.append(f"Saat: {self.saat}")
+        satirlar.append("")
+        return '\n'.join(satirlar)
+
+    def tekrar_anahtari(self) -> str:
+        """
+        Tekrar önbelleği için kısa, süreçler arası sabit özet: (Tel No, Kod, Saat).
+        Kod ayrıştırılamadıysa ayırt edici olarak uygulama adı ve mesaj metni kullanılır;
+        aksi halde aynı numaraya aynı dakikada gelen farklı SMS'ler tekrar sayılırdı.
+        """
+        if self.kod:
+            icerik = f"{self.tel_no}|{self.kod}|{self.saat}"
+        else:
+            icerik = f"{self.tel_no}||{self.uygulama_adi}|{self.mesaj}|{self.saat}"
+        return hashlib.blake2b(icerik.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def sms_ayristir(mesaj_metni: str) -> SmsKaydi | None:
+    """
+    Mesaj metnindeki Tel No, Uygulama Adı, Mesaj, Kod ve Saat alanlarını okur: önce
+    Tel No aranır, varsa diğer alanlar metin üzerinden tek geçişte toplanır.
+    Geçerli bir 10 haneli 'Tel No' yoksa None döner.
+    """
+    tel_eslesme = TEL_NO_DESENI.search(mesaj_metni)
+    if tel_eslesme is None:
+        return None
+    kayit = SmsKaydi()
+    kayit.tel_no = tel_eslesme.group(1)
+    for eslesme in ALAN_DESENI.finditer(mesaj_metni):
+        slot = _ALAN_SLOTLARI[eslesme.group(1)[0].lower()]
+        if getattr(kayit, slot) is None:
+            setattr(kayit, slot, eslesme.group(2).strip())
+    return kayit
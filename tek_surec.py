@@ -0,0 +1,54 @@
+"""
+Tek süreç (köprü) modu: User-bot (Pyrogram) ve Ana Bot (PTB) aynı event loop'ta çalışır.
+
+User-bot'un yakaladığı SMS'ler Telegram üzerinden Ana Bot'a gönderilmek yerine bellek
+içi kuyrukla doğrudan bot.sms_isle'ye verilir; böylece SMS başına bir Telegram gidiş
+dönüşü ve user hesabının FloodWait bütçesi harcanmaz.
+
+Çalıştırma: python tek_surec.py  (bot.py ve user_bot.py'nin tüm ortam değişkenleri gerekir)
+"""
+import asyncio
+import logging
+
+import bot
+import user_bot
+from kopru import KuyrukKopru
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+  bot.veri_yukle()
+  application = bot.uygulama_olustur()
+
+  kuyruk_kopru = KuyrukKopru()
+  user_bot.kopru = kuyruk_kopru
+
+  # run_polling kullanılmadığı için post_init/post_stop/post_shutdown burada elle çağrılır
+  await application.initialize()
+  await bot.baslangic_isleri(application)
+  await bot.guncelleme_alimini_baslat(application)
+  await application.start()
+  tuketici = asyncio.create_task(kuyruk_kopru.tuket(bot.sms_isle))
+  logger.info("Tek süreç modu: Ana Bot ve User-bot aynı event loop'ta başlatıldı.")
+
+  try:
+    # User-bot sinyal (Ctrl+C / SIGTERM) gelene kadar çalışır
+    await user_bot.main_user_bot()
+  finally:
+    # User-bot durdu; kuyrukta kalan SMS'leri işle, sonra Ana Bot'u kapat
+    await kuyruk_kopru.kuyruk.join()
+    tuketici.cancel()
+    await application.updater.stop()
+    await application.stop()
+    await bot.durdurma_isleri(application)
+    await application.shutdown()
+    await bot.kapanis_isleri(application)
+
+
+if __name__ == '__main__':
+  try:
+    # Pyrogram istemcisinin loop'unda çalışmalı; asyncio.run ile anlık dinleyici hiç çalışmaz
+    user_bot.calistir(main())
+  except Exception as e:
+    logger.error(f"Tek süreç modu çalışırken kritik bir hata oluştu: {e}")
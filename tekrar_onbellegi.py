@@ -0,0 +1,93 @@
+"""
+Aynı SMS'in iki kez iletilmesini/sayılmasını önleyen sınırlı, süreli (TTL + LRU) önbellek.
+
+User-bot (kaynak grup ID, mesaj ID) çiftiyle, Ana Bot ise SMS içeriğinin özetiyle (Tel No, Kod, Saat)
+kontrol eder. Kayıtlar OrderedDict'te son görülme sırasıyla tutulur; tüm kayıtların
+süresi aynı olduğundan sıra aynı zamanda bitiş zamanı sırasıdır ve süresi dolanlar
+baştan atılır. Kontrol ve ekleme O(1) (amortize).
+
+İsteğe bağlı olarak içerik JSON dosyasına yazılıp yeniden başlatmada geri yüklenebilir.
+"""
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from metrikler import kayit as metrik_kaydi
+
+logger = logging.getLogger(__name__)
+
+TEKRAR_ISABET = metrik_kaydi.sayac('tekrar_onbellegi_isabet_toplam', "Tekrar olarak yakalanan SMS'ler", ('onbellek',))
+TEKRAR_ISKA = metrik_kaydi.sayac('tekrar_onbellegi_iska_toplam', "Önbellekte bulunmayan (yeni) SMS'ler", ('onbellek',))
+
+
+class TekrarOnbellegi:
+    """En fazla `boyut` anahtarı `sure_sn` saniye hatırlayan tekrar önbelleği."""
+
+    def __init__(self, ad: str, boyut: int = 10000, sure_sn: float = 600.0):
+        self.ad = ad
+        self.boyut = boyut
+        self.sure_sn = sure_sn
+        self._kayitlar: OrderedDict = OrderedDict()  # anahtar -> bitiş zamanı (Unix)
+        self._isabet = TEKRAR_ISABET.etiket(ad)
+        self._iska = TEKRAR_ISKA.etiket(ad)
+        metrik_kaydi.gosterge('tekrar_onbellegi_boyutu', "Tekrar önbelleğindeki kayıt sayısı", ('onbellek',)).etiket(ad).fonksiyon_ayarla(
+            lambda: len(self._kayitlar)
+        )
+
+    def __len__(self) -> int:
+        return len(self._kayitlar)
+
+    def _suresi_dolanlari_at(self, simdi: float) -> None:
+        kayitlar = self._kayitlar
+        while kayitlar:
+            if next(iter(kayitlar.values())) > simdi:
+                break
+            kayitlar.popitem(last=False)
+
+    def __contains__(self, anahtar) -> bool:
+        """Metrik saymadan, süresi dolmamış bir kayıt var mı bakar."""
+        bitis = self._kayitlar.get(anahtar)
+        return bitis is not None and bitis > time.time()
+
+    def gordu_mu(self, anahtar) -> bool:
+        """Anahtar yakın zamanda görüldüyse True döner; isabet/ıska sayaçlarını günceller."""
+        if anahtar in self:
+            self._isabet.artir()
+            return True
+        self._iska.artir()
+        return False
+
+    def ekle(self, anahtar) -> None:
+        """Anahtarı şimdiden itibaren `sure_sn` saniye hatırlar; sınır aşılırsa en eskiyi atar."""
+        simdi = time.time()
+        self._kayitlar[anahtar] = simdi + self.sure_sn
+        self._kayitlar.move_to_end(anahtar)
+        self._suresi_dolanlari_at(simdi)
+        while len(self._kayitlar) > self.boyut:
+            self._kayitlar.popitem(last=False)
+
+    def dosyaya_yaz(self, yol: str) -> None:
+        """İçeriği atomik olarak JSON dosyasına yazar (bloklayan I/O; executor'da çağrılmalı)."""
+        gecici_yol = yol + '.tmp'
+        with open(gecici_yol, 'w') as f:
+            json.dump(list(self._kayitlar.items()), f, separators=(',', ':'))
+        os.replace(gecici_yol, yol)
+
+    def dosyadan_yukle(self, yol: str) -> None:
+        """dosyaya_yaz ile yazılmış içeriği yükler; süresi dolmuş kayıtlar alınmaz."""
+        if not os.path.exists(yol):
+            return
+        try:
+            with open(yol, 'r') as f:
+                kayitlar = json.load(f)
+        except (ValueError, OSError) as e:
+            logger.error(f"Tekrar önbelleği dosyası okunamadı ({e}), yok sayılıyor.")
+            return
+        simdi = time.time()
+        for anahtar, bitis in kayitlar[-self.boyut:]:
+            if bitis > simdi:
+                # JSON demetleri listeye çevirir; hash'lenebilmeleri için geri çevrilir
+                self._kayitlar[tuple(anahtar) if isinstance(anahtar, list) else anahtar] = bitis
+        logger.info(f"Tekrar önbelleği ({self.ad}) dosyadan yüklendi: {len(self._kayitlar)} kayıt.")
@@ -0,0 +1,46 @@
+import asyncio
+import datetime
+import time
+
+from telegram.error import RetryAfter
+
+import gonderici as gonderici_modulu
+from gonderici import Gonderici
+
+
+class SahteBot:
+    """İlk çağrıda RetryAfter veren, teslimleri (zaman, chat_id, metin) olarak kaydeden bot."""
+
+    def __init__(self, retry_after_sn: float):
+        self.retry_after_sn = retry_after_sn
+        self.teslimler = []
+        self._mesaj_id = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.retry_after_sn:
+            sure, self.retry_after_sn = self.retry_after_sn, 0
+            self.retry_zamani = time.monotonic()
+            raise RetryAfter(retry_after=datetime.timedelta(seconds=sure))
+        self.teslimler.append((time.monotonic(), chat_id, text))
+        self._mesaj_id += 1
+        return type('Mesaj', (), {'message_id': self._mesaj_id})()
+
+
+def test_retry_after_tum_gonderimi_duraklatir_ve_sohbet_sirasini_korur(monkeypatch):
+    monkeypatch.setattr(gonderici_modulu, 'SOHBET_KAPASITE', 100)
+
+    async def ana():
+        gonderici = Gonderici(isci_sayisi=8)
+        bot = SahteBot(retry_after_sn=0.3)
+        gonderici.baslat(bot)
+        for i in range(5):
+            gonderici.gonder(-1, text=f"a{i}")
+            gonderici.gonder(-2, text=f"b{i}")
+        await gonderici.durdur(zaman_asimi=5.0)
+        return bot
+
+    bot = asyncio.run(ana())
+    assert [metin for _, chat_id, metin in bot.teslimler if chat_id == -1] == [f"a{i}" for i in range(5)]
+    assert [metin for _, chat_id, metin in bot.teslimler if chat_id == -2] == [f"b{i}" for i in range(5)]
+    # RetryAfter'dan sonra başlayan hiçbir gönderim duraklama bitmeden yapılmadı
+    assert all(zaman >= bot.retry_zamani + 0.29 for zaman, _, _ in bot.teslimler)
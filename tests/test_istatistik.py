@@ -0,0 +1,40 @@
+import asyncio
+import datetime
+import sqlite3
+
+import pytz
+
+from istatistik import IstatistikDeposu, tarih_araligi_ayikla
+
+SAAT_DILIMI = pytz.timezone('Europe/Istanbul')
+
+
+def test_cok_buyuk_gun_sayisi_gecersiz_sayilir():
+    bugun = datetime.date(2026, 10, 17)
+    assert tarih_araligi_ayikla(['99999999999g'], bugun) is None
+    assert tarih_araligi_ayikla(['7g'], bugun) == (datetime.date(2026, 10, 11), bugun)
+
+
+def test_yazma_hatasinda_sayaclar_kaybolmaz(tmp_path):
+    async def ana():
+        depo = IstatistikDeposu(str(tmp_path / 'istatistik.db'), SAAT_DILIMI)
+        depo.artir(-1, '5551234567')
+        depo.artir(-1, '5551234567')
+        gercek_yaz = depo._yaz
+
+        def kilitli(tampon):
+            raise sqlite3.OperationalError('database is locked')
+        depo._yaz = kilitli
+        try:
+            await depo.bosalt()
+        except sqlite3.OperationalError:
+            pass
+        depo.artir(-1, '5551234567')
+        depo._yaz = gercek_yaz
+
+        bugun = datetime.datetime.now(SAAT_DILIMI).date()
+        sonuc = await depo.sorgula(-1, bugun, bugun)
+        await depo.durdur()
+        return sonuc
+
+    assert asyncio.run(ana())['toplam'] == 3
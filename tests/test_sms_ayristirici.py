@@ -0,0 +1,18 @@
+from sms_ayristirici import sms_ayristir
+
+
+def anahtar(metin: str) -> str:
+    return sms_ayristir(metin).tekrar_anahtari()
+
+
+def test_kodsuz_farkli_smsler_ayni_dakikada_ayri_anahtar_alir():
+    birinci = anahtar("Tel No: 5551234567\nMesaj: Giriş onayı A\nSaat: 14:32")
+    ikinci = anahtar("Tel No: 5551234567\nMesaj: Giriş onayı B\nSaat: 14:32")
+    assert birinci != ikinci
+    assert birinci == anahtar("Tel No: 5551234567\nMesaj: Giriş onayı A\nSaat: 14:32")
+
+
+def test_kodlu_sms_anahtari_tel_kod_saat():
+    # Aynı kod ve saat, farklı mesaj gövdesi (ör. metin düzeltmesi) yine tekrar sayılır
+    assert anahtar("Tel No: 5551234567\nMesaj: a\nKod: 4821\nSaat: 14:32") == \
+        anahtar("Tel No: 5551234567\nMesaj: b\nKod: 4821\nSaat: 14:32")
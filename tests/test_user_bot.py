@@ -0,0 +1,65 @@
+"""
+User-bot'un anlık dinleyicisi: güncelleme Pyrogram dispatcher'ından geçirilir, böylece
+işleyicinin istemcinin loop'unda gerçekten çalıştığı da doğrulanır.
+"""
+import asyncio
+import datetime
+import os
+
+# user_bot.py içe aktarılırken zorunlu ortam değişkenleri aranır (.env'dekiler ezilir)
+os.environ.update(API_ID='1', API_HASH='test', PYROGRAM_SESSION_STRING='test', KOPRU_MODU='telegram',
+                  KAYNAK_GRUP_IDS='-1001234567890', SMS_BOT_IDS='777')
+# Pyrogram Client'ı içe aktarma anındaki loop'a bağlar
+asyncio.set_event_loop(asyncio.new_event_loop())
+
+import user_bot  # noqa: E402
+from pyrogram import raw  # noqa: E402
+
+KANAL_ID = 1234567890
+SMS_BOT_ID = 777
+METIN = "Uygulama Adı: Test\nTel No: 5551234567\nKod: 482913"
+
+
+def sms_guncellemesi(mesaj_id: int, metin: str) -> tuple:
+    """SMS botunun kaynak gruba yazdığı mesaj için dispatcher kuyruğuna konan (update, users, chats) paketi."""
+    mesaj = raw.types.Message(
+        id=mesaj_id, peer_id=raw.types.PeerChannel(channel_id=KANAL_ID), from_id=raw.types.PeerUser(user_id=SMS_BOT_ID),
+        date=int(datetime.datetime.now().timestamp()), message=metin, entities=[],
+    )
+    kullanicilar = {SMS_BOT_ID: raw.types.User(id=SMS_BOT_ID, access_hash=1, bot=True, first_name='SMS', restriction_reason=[])}
+    sohbetler = {KANAL_ID: raw.types.Channel(id=KANAL_ID, access_hash=1, title='Kaynak', photo=raw.types.ChatPhotoEmpty(),
+                                             date=0, megagroup=True, restriction_reason=[])}
+    return raw.types.UpdateNewChannelMessage(message=mesaj, pts=1, pts_count=1), kullanicilar, sohbetler
+
+
+class SahteKopru:
+    def __init__(self):
+        self.iletilen = []
+
+    async def ilet(self, metin: str) -> None:
+        self.iletilen.append(metin)
+
+
+def test_anlik_dinleyici_dispatcher_uzerinden_iletir(tmp_path, monkeypatch):
+    kopru = SahteKopru()
+    monkeypatch.setattr(user_bot, 'kopru', kopru)
+    monkeypatch.setattr(user_bot, 'IMLEC_DOSYASI', str(tmp_path / 'cursor.json'))
+    dispatcher = user_bot.user_app.dispatcher
+
+    async def ana():
+        await dispatcher.start()
+        gruplar = dispatcher.groups
+        try:
+            dispatcher.updates_queue.put_nowait(sms_guncellemesi(5, METIN))
+            for _ in range(200):
+                if kopru.iletilen:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await dispatcher.stop()
+            dispatcher.groups = gruplar  # stop() işleyici kayıtlarını da siler
+
+    # main_user_bot'la aynı yoldan: istemcinin loop'unda
+    user_bot.calistir(ana())
+    assert kopru.iletilen == [METIN]
+    assert user_bot.islenen_mesajlar.gordu_mu((-1000000000000 - KANAL_ID, 5))
@@ -0,0 +1,190 @@
+"""
+Kalıcı deponun çökme semantiği: kayıtlar yazılır, her çökme noktası dosyalar üzerinde
+taklit edilir, depo yeniden yüklenir ve sonuç kayıtların bellekte uygulanmış haliyle
+karşılaştırılır.
+"""
+import asyncio
+import json
+import time
+
+import veri_deposu
+from veri_deposu import ArkaPlanKaydedici, VeriDeposu
+
+
+def numara(i: int) -> str:
+    return f"5{i:09d}"
+
+
+def ornek_kayitlar(tur: int) -> list[dict]:
+    """Her işlem türünü içeren bir günlük kaydı dizisi; `tur` farklı numaralar üretir."""
+    numaralar = [int(numara(tur * 100 + i)) for i in range(10)]
+    return [
+        {'o': veri_deposu.EKLE, 'g': -1001, 'n': numaralar},
+        {'o': veri_deposu.EKLE, 'g': -1002, 'n': numaralar[:5]},
+        {'o': veri_deposu.SAY, 'g': [-1001, -1002], 'n': numara(tur * 100)},
+        {'o': veri_deposu.SAY, 'g': [-1001], 'n': numara(tur * 100 + 1)},
+        {'o': veri_deposu.SIL, 'g': -1001, 'n': numaralar[5:7]},
+        {'o': veri_deposu.EKLE, 'g': -1003, 'n': numaralar[7:]},
+        {'o': veri_deposu.SIL_HEPSI, 'g': -1003},
+        {'o': veri_deposu.RAPOR_EKLE, 'g': -1004, 'r': {numara(tur * 100 + 2): 3}},
+    ]
+
+
+def durum(beklenen_numaralar: dict, sms_raporu: dict) -> tuple[dict, dict]:
+    """Karşılaştırma için depodan bağımsız görünüm: {grup: [numaralar]}, {grup: {tel_no: adet}}."""
+    return (
+        {grup_id: list(numaralar) for grup_id, numaralar in beklenen_numaralar.items()},
+        {grup_id: dict(rapor.sayilar) for grup_id, rapor in sms_raporu.items()},
+    )
+
+
+class Senaryo:
+    """Depoya yazılan kayıtları bellekte de uygulayan ve yeniden yüklemeyi karşılaştıran düzenek."""
+
+    def __init__(self, dizin):
+        self.anlik_yol = str(dizin / 'bot_data.json')
+        self.gunluk_yol = str(dizin / 'bot_data.journal')
+        self.depo = VeriDeposu(self.anlik_yol, self.gunluk_yol)
+        self.bellek = self.depo.yukle()
+
+    def kaydet(self, kayitlar: list[dict]) -> None:
+        for kayit in kayitlar:
+            veri_deposu.kaydi_uygula(*self.bellek, kayit)
+            self.depo.ekle(kayit)
+
+    def yaz(self, kayitlar: list[dict]) -> None:
+        self.kaydet(kayitlar)
+        self.depo.gunluge_yaz(self.depo.tamponu_al())
+
+    def sikistir(self) -> None:
+        self.depo.anlik_goruntu_yaz(self.depo.anlik_kopya(*self.bellek))
+
+    def yeniden_ac(self) -> None:
+        """Depoyu kapatıp diskten yükler; bellekteki durumla ve sıra numarasıyla aynı olmalı."""
+        sira = self.depo.sira
+        self.depo.kapat()
+        self.depo = VeriDeposu(self.anlik_yol, self.gunluk_yol)
+        assert durum(*self.depo.yukle()) == durum(*self.bellek)
+        assert self.depo.sira == sira
+
+
+def test_gunluk_yeniden_oynatilir(tmp_path):
+    senaryo = Senaryo(tmp_path)
+    senaryo.yaz(ornek_kayitlar(0))
+    senaryo.yaz(ornek_kayitlar(1))
+    senaryo.yeniden_ac()
+
+
+def test_eski_bot_data_json_yuklenir(tmp_path):
+    # Eski sürümün yazdığı dosya: numara listeleri (str), sıra numarası ve günlük yok
+    with open(tmp_path / 'bot_data.json', 'w') as f:
+        json.dump({
+            'beklenen_numaralar': {'-1001': [numara(i) for i in range(900, 905)]},
+            'sms_raporu': {'-1001': {numara(900): 3}},
+        }, f, indent=4)
+    senaryo = Senaryo(tmp_path)
+    assert durum(*senaryo.bellek) == ({-1001: [numara(i) for i in range(900, 905)]}, {-1001: {numara(900): 3}})
+    assert senaryo.depo.sira == 0
+    senaryo.yaz(ornek_kayitlar(0))
+    senaryo.yeniden_ac()
+
+
+def test_replace_ile_gunluk_kesme_arasinda_cokme(tmp_path):
+    senaryo = Senaryo(tmp_path)
+    senaryo.yaz(ornek_kayitlar(0))
+    with open(senaryo.gunluk_yol, 'rb') as f:
+        eski_gunluk = f.read()
+    senaryo.sikistir()
+    # Anlık görüntü yerine kondu ama günlük kesilmeden çöktü: kayıtlar iki kez uygulanmamalı
+    with open(senaryo.gunluk_yol, 'wb') as f:
+        f.write(eski_gunluk)
+    senaryo.yeniden_ac()
+    senaryo.yaz(ornek_kayitlar(1))
+    senaryo.yeniden_ac()
+
+
+def test_yarim_kuyruk_kesilir(tmp_path):
+    senaryo = Senaryo(tmp_path)
+    senaryo.yaz(ornek_kayitlar(0))
+    # Yazma sırasında çökme: son satır yarım kaldı, o kayıt hiç olmamış sayılmalı
+    yarim = json.dumps({'o': veri_deposu.SAY, 'g': [-1001], 'n': numara(1), 's': senaryo.depo.sira + 1})
+    with open(senaryo.gunluk_yol, 'a') as f:
+        f.write(yarim[:len(yarim) // 2])
+    senaryo.yeniden_ac()
+    with open(senaryo.gunluk_yol, 'rb') as f:
+        assert f.read().endswith(b'\n')
+    senaryo.yaz(ornek_kayitlar(1))
+    senaryo.yeniden_ac()
+
+
+def test_yarim_tmp_anlik_goruntu_yoksayilir(tmp_path):
+    senaryo = Senaryo(tmp_path)
+    senaryo.yaz(ornek_kayitlar(0))
+    senaryo.sikistir()
+    senaryo.yaz(ornek_kayitlar(1))
+    # Sıkıştırma sırasında çökme: .tmp yarım kaldı, eski anlık görüntü + günlük geçerli
+    with open(senaryo.anlik_yol + '.tmp', 'w') as f:
+        f.write('{"sira": ')
+    senaryo.yeniden_ac()
+
+
+def test_sikistirma_gunlugu_sifirlar(tmp_path):
+    senaryo = Senaryo(tmp_path)
+    senaryo.yaz(ornek_kayitlar(0) + [{'o': veri_deposu.RAPOR_SIFIRLA}])
+    senaryo.sikistir()
+    with open(senaryo.gunluk_yol, 'rb') as f:
+        assert f.read() == b''
+    senaryo.yaz(ornek_kayitlar(1))
+    senaryo.yeniden_ac()
+
+
+def test_gunluk_yazma_hatasinda_kayitlar_tamponda_kalir(tmp_path, monkeypatch):
+    senaryo = Senaryo(tmp_path)
+    kaydedici = ArkaPlanKaydedici(senaryo.depo, lambda: senaryo.bellek)
+    gercek_yaz = senaryo.depo.gunluge_yaz
+
+    def disk_dolu(kayitlar):
+        raise OSError(28, 'No space left on device')
+
+    async def ana():
+        senaryo.kaydet(ornek_kayitlar(0))
+        monkeypatch.setattr(senaryo.depo, 'gunluge_yaz', disk_dolu)
+        try:
+            await kaydedici.bosalt()
+        except OSError:
+            pass
+        monkeypatch.setattr(senaryo.depo, 'gunluge_yaz', gercek_yaz)
+        senaryo.kaydet(ornek_kayitlar(1))
+        await kaydedici.bosalt()
+
+    asyncio.run(ana())
+    senaryo.yeniden_ac()
+
+
+def test_sikistirma_sirasinda_kapatma(tmp_path, monkeypatch):
+    senaryo = Senaryo(tmp_path)
+    senaryo.depo.sikistirma_esigi = 1
+    gercek_dumps = json.dumps
+
+    def yavas_dump(veri, f, **kwargs):
+        # Anlık görüntüyü parça parça yaz: eşzamanlı ikinci bir yazma varsa dosyaya karışır
+        metin = gercek_dumps(veri, **kwargs)
+        for i in range(0, len(metin), 20):
+            f.write(metin[i:i + 20])
+            f.flush()
+            time.sleep(0.01)
+    monkeypatch.setattr(veri_deposu.json, 'dump', yavas_dump)
+
+    async def ana():
+        kaydedici = ArkaPlanKaydedici(senaryo.depo, lambda: senaryo.bellek, aralik_sn=0.01)
+        kaydedici.baslat()
+        senaryo.kaydet(ornek_kayitlar(0))
+        kaydedici.kirli_isaretle()
+        await asyncio.sleep(0.1)  # Döngü yavaş sıkıştırmanın ortasında
+        senaryo.kaydet(ornek_kayitlar(1))
+        kaydedici.kirli_isaretle()
+        await kaydedici.durdur()
+
+    asyncio.run(ana())
+    monkeypatch.undo()
+    senaryo.yeniden_ac()
@@ -1,12 +1,18 @@
 import os
+import json
 import asyncio
 import logging
 from dotenv import load_dotenv
-from pyrogram import Client, filters
+from pyrogram import Client, filters, idle
 from pyrogram.errors import FloodWait
-import re
 import time
 
+from hiz_siniri import TokenKovasi
+from kopru import TelegramKopru, SoketKopru
+from tekrar_onbellegi import TekrarOnbellegi
+import metrikler
+import loglama
+
 # .env dosyasını yükle
 load_dotenv()
 
@@ -14,25 +20,68 @@ load_dotenv()
 try:
     API_ID = int(os.getenv('API_ID'))
     API_HASH = os.getenv('API_HASH')
-    KAYNAK_GRUP_ID = int(os.getenv('KAYNAK_GRUP_ID')) 
-    SMS_BOT_ID = int(os.getenv('SMS_BOT_ID'))
+    # Birden fazla kaynak grup / SMS botu virgülle ayrılarak verilebilir (eski tekil değişkenler de geçerli)
+    KAYNAK_GRUP_IDS_STR = os.getenv('KAYNAK_GRUP_IDS') or os.getenv('KAYNAK_GRUP_ID') or ''
+    KAYNAK_GRUP_IDS = [int(id.strip()) for id in KAYNAK_GRUP_IDS_STR.split(',') if id.strip()]
+    SMS_BOT_IDS_STR = os.getenv('SMS_BOT_IDS') or os.getenv('SMS_BOT_ID') or ''
+    SMS_BOT_IDS = [int(id.strip()) for id in SMS_BOT_IDS_STR.split(',') if id.strip()]
     ANA_BOT_USERNAME = os.getenv('ANA_BOT_USERNAME', 'CengizAtaySMSbot')
     PYROGRAM_SESSION_STRING = os.getenv('PYROGRAM_SESSION_STRING')
+    # Anlık dinleyicinin kaçırdığı mesajlar için yedek geçmiş taramasının aralığı
+    KURTARMA_ARALIGI_SN = float(os.getenv('KURTARMA_ARALIGI_SN', '60'))
+    # İletim imlecinin (son işlenen mesaj ID'si) saklandığı dosya
+    IMLEC_DOSYASI = os.getenv('IMLEC_DOSYASI', 'user_bot_cursor.json')
+    # Yeniden başlatmada birikmiş mesajlar için en fazla kaç mesaj geriye gidilir
+    MAKS_GERI_TARAMA = int(os.getenv('MAKS_GERI_TARAMA', '2000'))
+    # SMS'lerin Ana Bot'a nasıl iletileceği: 'telegram' (varsayılan) veya 'soket'
+    KOPRU_MODU = os.getenv('KOPRU_MODU', 'telegram')
+    # Varsayılan yol çalışma dizinindeki özel (0700) bir klasördür; paylaşılan /tmp kullanılmaz
+    KOPRU_SOKET_YOLU = os.getenv('KOPRU_SOKET_YOLU', 'kopru/sms_kopru.sock')
+    # Ayarlanırsa user-bot metrikleri 127.0.0.1:<port>/metrics adresinden yayınlanır
+    USER_BOT_METRIK_PORTU = int(os.getenv('USER_BOT_METRIK_PORTU', '0'))
+    # İletilen mesaj ID'lerinin hatırlandığı önbellek (anlık dinleyici, kurtarma ve yeniden başlatma tekrarlarına karşı)
+    USER_BOT_TEKRAR_BOYUTU = int(os.getenv('USER_BOT_TEKRAR_BOYUTU', '5000'))
+    USER_BOT_TEKRAR_SURESI_SN = float(os.getenv('USER_BOT_TEKRAR_SURESI_SN', '3600'))
+    # Ayarlanırsa önbellek bu dosyaya yazılır ve yeniden başlatmada geri yüklenir
+    USER_BOT_TEKRAR_DOSYASI = os.getenv('USER_BOT_TEKRAR_DOSYASI')
+    # Tüm kaynakların paylaştığı hesap geneli API çağrısı sınırı (saniyede çağrı, patlama kapasitesi)
+    USER_BOT_API_HIZI = float(os.getenv('USER_BOT_API_HIZI', '5'))
+    USER_BOT_API_KAPASITESI = float(os.getenv('USER_BOT_API_KAPASITESI', '10'))
+    # Log ayarları bot.py ile aynı değişkenlerdir (LOG_SEVIYESI, LOG_SEVIYELERI, LOG_BICIMI, LOG_ORNEKLEME_*)
+    LOG_SEVIYESI = loglama.seviye_ayikla(os.getenv('LOG_SEVIYESI', 'INFO'))
+    LOG_SEVIYELERI = loglama.seviyeleri_ayikla(os.getenv('LOG_SEVIYELERI', ''))
+    LOG_BICIMI = os.getenv('LOG_BICIMI', 'json')
+    LOG_ORNEKLEME_PENCERESI_SN = float(os.getenv('LOG_ORNEKLEME_PENCERESI_SN', '10'))
+    LOG_ORNEKLEME_ADEDI = int(os.getenv('LOG_ORNEKLEME_ADEDI', '20'))
+    if LOG_BICIMI not in ('json', 'metin'):
+        raise ValueError(f"Geçersiz LOG_BICIMI: {LOG_BICIMI} (json veya metin olmalı).")
+    if KOPRU_MODU not in ('telegram', 'soket'):
+        raise ValueError(f"Geçersiz KOPRU_MODU: {KOPRU_MODU} (telegram veya soket olmalı).")
 
-    if not all([API_ID, API_HASH, KAYNAK_GRUP_ID, SMS_BOT_ID, ANA_BOT_USERNAME, PYROGRAM_SESSION_STRING]):
-        raise ValueError("Tüm gerekli ortam değişkenleri tanımlanmalıdır (API_ID, API_HASH, KAYNAK_GRUP_ID, SMS_BOT_ID, ANA_BOT_USERNAME, PYROGRAM_SESSION_STRING).")
+    if not all([API_ID, API_HASH, KAYNAK_GRUP_IDS, SMS_BOT_IDS, ANA_BOT_USERNAME, PYROGRAM_SESSION_STRING]):
+        raise ValueError("Tüm gerekli ortam değişkenleri tanımlanmalıdır (API_ID, API_HASH, KAYNAK_GRUP_IDS, SMS_BOT_IDS, ANA_BOT_USERNAME, PYROGRAM_SESSION_STRING).")
 
 except (TypeError, ValueError) as e:
     print(f"HATA: Ortam değişkenleri doğru yüklenemedi. Detay: {e}")
     exit(1)
 
-# Basit bir günlük tutma (logging) ayarı
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
+# Loglar kuyruk üzerinden ayrı thread'de yazılır; event loop log I/O'su için beklemez
+loglama.kur(
+    seviye=LOG_SEVIYESI,
+    kategori_seviyeleri=LOG_SEVIYELERI,
+    bicim=LOG_BICIMI,
+    ornekleme_penceresi_sn=LOG_ORNEKLEME_PENCERESI_SN,
+    ornekleme_adedi=LOG_ORNEKLEME_ADEDI
 )
 logger = logging.getLogger(__name__)
 
+# Geçmiş okunurken sayfa başına mesaj (Telegram en fazla 100 döner)
+SAYFA_BOYUTU = 100
+# Birikmiş mesajlar bu büyüklükteki gruplar halinde iletilir, her gruptan sonra imleç kaydedilir
+TOPLU_ISLEM_BOYUTU = 50
+# Geçmiş sayfaları arasında bekleme (uzun kesintide FloodWait yağmurunu önler)
+SAYFA_BEKLEMESI_SN = 1.0
+
 # Pyrogram user-bot client'ını başlat
 user_app = Client(
     name="user_bot_session",
@@ -41,100 +90,323 @@ user_app = Client(
     session_string=PYROGRAM_SESSION_STRING
 )
 
-# --- Yardımcı Fonksiyon ---
-def mesajdan_tel_no_bul(mesaj_metni: str) -> str | None:
-    """Mesaj metninden 'Tel No: XXXXXXXXXX' kısmını bulur."""
-    eslesme = re.search(r'Tel No:\s*(\d{10})', mesaj_metni) 
-    if eslesme:
-        return eslesme.group(1)
-    return None
+# SMS'lerin Ana Bot'a iletileceği köprü. Tek süreç modunda (tek_surec.py) KuyrukKopru ile değiştirilir.
+if KOPRU_MODU == 'soket':
+    kopru = SoketKopru(KOPRU_SOKET_YOLU)
+else:
+    kopru = TelegramKopru(user_app, ANA_BOT_USERNAME)
 
-# --- User-Bot Ana Polling Fonksiyonu ---
-async def start_message_polling():
+# --- Metrikler ---
+SMS_ASAMA_SURESI = metrikler.kayit.histogram('sms_asama_suresi_saniye', "SMS işleme aşamalarının süresi", ('asama',))
+KAYNAK_GECIKMESI = SMS_ASAMA_SURESI.etiket('kaynak')  # SMS'in kaynak gruba düşmesinden user-bot'un yakalamasına
+ILETIM_SURESI = SMS_ASAMA_SURESI.etiket('iletim')     # Köprü üzerinden Ana Bot'a iletim
+SMS_YAKALANAN = metrikler.kayit.sayac('sms_yakalanan_toplam', "User-bot'un yakalayıp ilettiği SMS'ler", ('yol',))
+ILETIM_HATASI = metrikler.kayit.sayac('iletim_hatasi_toplam', "Köprü hatası yüzünden iletilemeyip sonra tekrar denenecek SMS'ler")
+FLOODWAIT = metrikler.kayit.sayac('floodwait_toplam', "User-bot'un aldığı FloodWait hataları")
+FLOODWAIT_BEKLEME = metrikler.kayit.sayac('floodwait_bekleme_saniye_toplam', "FloodWait nedeniyle beklenen toplam süre")
+
+# Hesap genelindeki FloodWait bitişi (time.monotonic). Telegram FloodWait'i hesaba verir;
+# bir kaynak aldığında diğer kaynaklar da süre dolana kadar API çağrısı yapmaz.
+floodwait_bitisi = 0.0
+
+def floodwait_bekle_kaydet(e: FloodWait) -> float:
+    global floodwait_bitisi
+    FLOODWAIT.artir()
+    FLOODWAIT_BEKLEME.artir(e.value)
+    floodwait_bitisi = max(floodwait_bitisi, time.monotonic() + e.value)
+    return e.value
+
+# --- Hesap Geneli Hız Sınırı ---
+# Tüm kaynak görevleri aynı hesabın API bütçesini paylaşır. İzinler kilit sırasıyla
+# (FIFO) dağıtıldığı için yoğun bir kaynak diğerlerini aç bırakamaz: her çağrıdan
+# sonra sıranın sonuna geçer.
+api_kovasi = TokenKovasi(USER_BOT_API_HIZI, USER_BOT_API_KAPASITESI)
+api_sirasi = asyncio.Lock()
+
+async def api_izni_al() -> None:
+    """Bir Telegram API çağrısı için izin alır: süren FloodWait'in ve token kovasının bitmesini bekler."""
+    async with api_sirasi:
+        kalan = floodwait_bitisi - time.monotonic()
+        if kalan > 0:
+            await asyncio.sleep(kalan)
+        await api_kovasi.al()
+
+# --- İletim Durumu ---
+class Kaynak:
     """
-    Belirli aralıklarla Kaynak Grup'taki yeni mesajları kontrol eder
-    ve @smsbizdenbot'tan gelenleri Ana Bot'a iletir.
+    Tek bir kaynak grubun iletim durumu. Her kaynağın kendi imleci ve iletim kilidi
+    vardır; mesaj ID'leri sohbete özgü olduğundan kaynaklar birbirinden bağımsız ilerler.
+
+    İmleç (taranan_id), bu ID'ye kadarki tüm SMS'lerin iletildiği noktadır ve sadece
+    geçmiş taramalarıyla ilerler. Anlık dinleyicinin ilettiği daha yeni mesajlar imleci
+    ilerletmez, imlec_sonrasi'nda tutulur; böylece anlık dinleyicinin kaçırdığı (daha
+    eski ID'li) bir mesaj, yenisi iletildi diye taramanın dışında kalmaz.
     """
-    last_checked_message_id = 0
-    polling_interval = 5 # Her 5 saniyede bir kontrol et
 
-    # Başlangıçta en son mesaj ID'sini al (geçmişi işleme)
+    def __init__(self, chat_id: int):
+        self.chat_id = chat_id
+        self.taranan_id = 0
+        # İmleçten yeni olup iletilmiş mesaj ID'leri (imleçle birlikte kaydedilir, yeniden başlatmada tekrar iletilmez)
+        self.imlec_sonrasi: set[int] = set()
+        # İlk çalıştırmada başlangıç ID'si alınana kadar boşluk kurtarma taramaz (tüm geçmişi iletmesin)
+        self.baslangic_alindi = False
+        # Köprü hatası yüzünden iletilemeyen mesaj ID'leri. İmleç ve boşluk kurtarmanın durma
+        # noktası bunların altında kalır; böylece sonraki taramalar (ve yeniden başlatma) onları tekrar dener.
+        self.iletilemeyenler: set[int] = set()
+        self.iletim_kilidi = asyncio.Lock()
+
+    def kurtarma_siniri(self) -> int:
+        """Boşluk kurtarmanın geriye doğru tarayacağı son ID (bu ID ve öncesi taranmaz); kaydedilen imleç de budur."""
+        if self.iletilemeyenler:
+            return min(self.taranan_id, min(self.iletilemeyenler) - 1)
+        return self.taranan_id
+
+    def imleci_ilerlet(self, mesaj_id: int) -> None:
+        """Geçmiş taraması mesaj_id'ye kadar her SMS'i ele aldıysa imleci oraya taşır."""
+        self.taranan_id = max(self.taranan_id, mesaj_id)
+        sinir = self.kurtarma_siniri()
+        self.imlec_sonrasi = {i for i in self.imlec_sonrasi if i > sinir}
+
+kaynaklar = {chat_id: Kaynak(chat_id) for chat_id in KAYNAK_GRUP_IDS}
+sms_bot_idleri = frozenset(SMS_BOT_IDS)
+# Anlık dinleyici ile boşluk kurtarma aynı mesajı iki kez iletmesin diye (sohbet ID, mesaj ID) tutulur
+islenen_mesajlar = TekrarOnbellegi('user_bot', boyut=USER_BOT_TEKRAR_BOYUTU, sure_sn=USER_BOT_TEKRAR_SURESI_SN)
+imlec_kilidi = asyncio.Lock()
+
+def imlec_yukle() -> tuple[dict[int, int], dict[int, list[int]]]:
+    """
+    Kayıtlı iletim imleçlerini {kaynak grup ID: imleç} ve imleçten yeni iletilmiş mesaj
+    ID'lerini {kaynak grup ID: [mesaj ID]} olarak okur; dosya yoksa ikisi de boş döner.
+    """
+    if not os.path.exists(IMLEC_DOSYASI):
+        return {}, {}
     try:
-        async for message in user_app.get_chat_history(chat_id=KAYNAK_GRUP_ID, limit=1):
-            last_checked_message_id = message.id
-            logger.info(f"POLLING INIT: Kaynak Grup'un başlangıç en son mesaj ID'si alındı: {last_checked_message_id}")
-    except Exception as e:
-        logger.error(f"POLLING INIT: Başlangıç mesaj ID'si alınırken hata: {e}. 0 olarak ayarlandı.")
-        last_checked_message_id = 0
+        with open(IMLEC_DOSYASI, 'r') as f:
+            veri = json.load(f)
+        imlecler = {int(chat_id): int(deger) for chat_id, deger in veri['kaynaklar'].items()}
+        islenenler = {int(chat_id): [int(i) for i in idler] for chat_id, idler in veri.get('islenenler', {}).items()}
+        return imlecler, islenenler
+    except (ValueError, KeyError, AttributeError, TypeError, OSError) as e:
+        logger.error(f"İmleç dosyası okunamadı ({e}), yok sayılıyor.")
+        return {}, {}
+
+def _imlec_yaz(degerler: dict[int, int], islenenler: dict[int, list[int]]) -> None:
+    gecici_yol = IMLEC_DOSYASI + '.tmp'
+    with open(gecici_yol, 'w') as f:
+        json.dump({
+            'kaynaklar': {str(chat_id): deger for chat_id, deger in degerler.items()},
+            'islenenler': {str(chat_id): idler for chat_id, idler in islenenler.items() if idler},
+        }, f)
+    os.replace(gecici_yol, IMLEC_DOSYASI)
+
+async def imlec_kaydet() -> None:
+    """Tüm kaynakların iletim imleçlerini atomik olarak diske yazar (I/O executor'da çalışır)."""
+    async with imlec_kilidi:
+        degerler = {chat_id: kaynak.kurtarma_siniri() for chat_id, kaynak in kaynaklar.items()}
+        islenenler = {chat_id: sorted(i for i in kaynak.imlec_sonrasi if i > degerler[chat_id]) for chat_id, kaynak in kaynaklar.items()}
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _imlec_yaz, degerler, islenenler)
+        except OSError as e:
+            logger.error(f"İmleç kaydedilemedi: {e}")
+
+async def tekrar_onbellegini_kaydet() -> None:
+    """Ayarlıysa işlenen mesaj ID'leri önbelleğini diske yazar (I/O executor'da çalışır)."""
+    if not USER_BOT_TEKRAR_DOSYASI:
+        return
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, islenen_mesajlar.dosyaya_yaz, USER_BOT_TEKRAR_DOSYASI)
+    except OSError as e:
+        logger.error(f"Tekrar önbelleği kaydedilemedi: {e}")
+
+def islendi_olarak_isaretle(kaynak: Kaynak, mesaj_id: int) -> None:
+    islenen_mesajlar.ekle((kaynak.chat_id, mesaj_id))
+    kaynak.iletilemeyenler.discard(mesaj_id)
+    if mesaj_id > kaynak.kurtarma_siniri():
+        kaynak.imlec_sonrasi.add(mesaj_id)
+
+async def sms_ilet(kaynak: Kaynak, message, yol: str = 'anlik') -> bool:
+    """
+    SMS botundan gelen tek bir mesajı Ana Bot'a iletir (aynı mesaj iki kez iletilmez).
+    FloodWait'te süre dolunca aynı mesajı tekrar dener. Köprü hatasında mesaj işlenmiş
+    sayılmaz ve False döner; boşluk kurtarma onu sonraki turda tekrar dener.
+    """
+    async with kaynak.iletim_kilidi:
+        if islenen_mesajlar.gordu_mu((kaynak.chat_id, message.id)):
+            return True
+
+        if message.date:
+            KAYNAK_GECIKMESI.gozlemle(max(0.0, time.time() - message.date.timestamp()))
+        logger.info("User-bot SMS'i yakaladı - Kaynak Grup ID: %s, Mesaj ID: %s", message.chat.id, message.id)
+        while True:
+            try:
+                if isinstance(kopru, TelegramKopru):
+                    await api_izni_al()
+                with ILETIM_SURESI.olc():
+                    await kopru.ilet(message.text)
+                break
+            except FloodWait as e:
+                logger.warning("User-bot FloodWait hatası, %s saniye bekleniyor...", e.value)
+                await asyncio.sleep(floodwait_bekle_kaydet(e))
+            except Exception as e:
+                ILETIM_HATASI.artir()
+                kaynak.iletilemeyenler.add(message.id)
+                logger.error("User-bot SMS'i (ID: %s) Ana Bot'a iletirken hata oluştu, tekrar denenecek: %s", message.id, e)
+                return False
+        SMS_YAKALANAN.etiket(yol).artir()
+        logger.debug("User-bot, SMS'i (ID: %s) Ana Bot'a başarıyla iletti.", message.id)
+        islendi_olarak_isaretle(kaynak, message.id)
+        return True
+
+# --- Anlık Dinleyici (push) ---
+@user_app.on_message(filters.chat(KAYNAK_GRUP_IDS) & filters.user(SMS_BOT_IDS) & filters.text)
+async def yeni_sms_dinleyici(client: Client, message) -> None:
+    """Kaynak gruplara SMS botlarından düşen her yeni mesajı anında iletir."""
+    await sms_ilet(kaynaklar[message.chat.id], message)
+    await imlec_kaydet()
 
-    logger.info(f"User-bot mesaj polling'i başlatılıyor. Kaynak Grup ID: {KAYNAK_GRUP_ID}, SMS Bot ID: {SMS_BOT_ID}. Takip ID: {last_checked_message_id}")
+# --- Boşluk Kurtarma (yedek polling) ---
+async def gecmis_sayfasi_al(kaynak: Kaynak, offset_id: int) -> list:
+    """offset_id'den eski en fazla SAYFA_BOYUTU mesajı tek API çağrısıyla okur; FloodWait'te bekleyip tekrar dener."""
+    while True:
+        await api_izni_al()
+        try:
+            return [m async for m in user_app.get_chat_history(chat_id=kaynak.chat_id, limit=SAYFA_BOYUTU, offset_id=offset_id)]
+        except FloodWait as e:
+            logger.warning("Geçmiş okunurken FloodWait (Kaynak Grup ID: %s), %s saniye bekleniyor...", kaynak.chat_id, e.value)
+            await asyncio.sleep(floodwait_bekle_kaydet(e))
 
+async def kacan_mesajlari_bul(kaynak: Kaynak, durma_id: int, maks_mesaj: int | None = None) -> tuple[list, int]:
+    """
+    Kaynak grubun geçmişini en yeniden geriye doğru offset_id ile sayfa sayfa okur ve
+    durma_id'ye (ya da maks_mesaj kadar mesaja) ulaşınca durur. Henüz işlenmemiş SMS
+    mesajlarını eskiden yeniye ve taramanın gördüğü en yeni mesaj ID'sini döner.
+    """
+    bulunanlar = []
+    en_yeni_id = durma_id
+    offset_id = 0
+    taranan = 0
     while True:
+        sayfa = await gecmis_sayfasi_al(kaynak, offset_id)
+        if not sayfa:
+            break
+        if not offset_id:
+            en_yeni_id = max(en_yeni_id, sayfa[0].id)
+        for message in sayfa:
+            taranan += 1
+            if message.id <= durma_id:
+                bulunanlar.reverse()
+                return bulunanlar, en_yeni_id
+            if maks_mesaj is not None and taranan > maks_mesaj:
+                logger.warning(f"Geri tarama sınırına ({maks_mesaj} mesaj) ulaşıldı, Kaynak Grup ID {kaynak.chat_id} için ID {message.id} ve öncesi atlandı.")
+                bulunanlar.reverse()
+                return bulunanlar, en_yeni_id
+            if ((kaynak.chat_id, message.id) not in islenen_mesajlar and message.text
+                    and message.from_user and message.from_user.id in sms_bot_idleri):
+                bulunanlar.append(message)
+        offset_id = sayfa[-1].id
+        await asyncio.sleep(SAYFA_BEKLEMESI_SN)
+    bulunanlar.reverse()
+    return bulunanlar, en_yeni_id
+
+async def birikmis_mesajlari_isle(kaynak: Kaynak, kayitli_imlec: int) -> None:
+    """
+    Kapalıyken gelen mesajları kayıtlı imleçten itibaren (en fazla MAKS_GERI_TARAMA
+    mesaj geriye giderek) bulur ve TOPLU_ISLEM_BOYUTU'luk gruplar halinde iletir.
+    Her gruptan sonra imleç o grubun son mesajına ilerletilip kaydedilir; tarama
+    bitmeden çökülürse kalan birikmiş mesajlar bir sonraki açılışta yine taranır.
+    """
+    birikmisler, en_yeni_id = await kacan_mesajlari_bul(kaynak, kayitli_imlec, maks_mesaj=MAKS_GERI_TARAMA)
+    logger.info(f"Açılış taraması (Kaynak Grup ID: {kaynak.chat_id}): imleç {kayitli_imlec} sonrasında {len(birikmisler)} birikmiş SMS bulundu.")
+    for i in range(0, len(birikmisler), TOPLU_ISLEM_BOYUTU):
+        grup = birikmisler[i:i + TOPLU_ISLEM_BOYUTU]
+        for message in grup:
+            if not await sms_ilet(kaynak, message, yol='birikmis'):
+                # Köprü çalışmıyor; imleç iletilemeyen mesajı geçmez, kalanları boşluk kurtarma dener
+                await imlec_kaydet()
+                return
+        kaynak.imleci_ilerlet(grup[-1].id)
+        await imlec_kaydet()
+    kaynak.imleci_ilerlet(en_yeni_id)
+    await imlec_kaydet()
+
+async def baslangic_imlecini_al(kaynak: Kaynak) -> None:
+    """İlk çalıştırma: geçmişi işlemeden grubun en son mesaj ID'sini başlangıç imleci yapar."""
+    try:
+        await api_izni_al()
+        async for message in user_app.get_chat_history(chat_id=kaynak.chat_id, limit=1):
+            kaynak.imleci_ilerlet(message.id)
+            logger.info(f"POLLING INIT: Kaynak Grup {kaynak.chat_id} başlangıç en son mesaj ID'si alındı: {kaynak.taranan_id}")
+        kaynak.baslangic_alindi = True
+        await imlec_kaydet()
+    except Exception as e:
+        logger.error(f"POLLING INIT: Kaynak Grup {kaynak.chat_id} başlangıç mesaj ID'si alınırken hata: {e}.")
+
+async def kaynak_takibi(kaynak: Kaynak, kayitli_imlec: int | None, kayitli_islenenler: list[int] = ()) -> None:
+    """
+    Tek bir kaynak grup için: açılışta kayıtlı imleçten itibaren birikmiş mesajları
+    iletir, ardından anlık dinleyicinin kaçırdığı mesajlar için yedek boşluk kurtarma
+    döngüsünü çalıştırır. Döngü belirli aralıklarla grubun geçmişini imlece kadar
+    geriye tarar ve SMS botlarından gelip iletilmemiş mesajları Ana Bot'a iletir.
+    """
+    if kayitli_imlec is not None:
+        kaynak.imleci_ilerlet(kayitli_imlec)
+        # Önceki çalıştırmada imleçten sonra iletilmiş mesajlar birikmiş taramasında atlanır
+        for mesaj_id in kayitli_islenenler:
+            islendi_olarak_isaretle(kaynak, mesaj_id)
+        kaynak.baslangic_alindi = True
         try:
-            logger.info(f"--- POLLING DEBUG: Yeni mesajlar için kontrol ediliyor. (ID > {last_checked_message_id} olanlar)")
-            
-            messages_to_process = []
-            
-            # --- HATA DÜZELTMESİ: offset_id=... KALDIRILDI ---
-            # Her zaman en son 20 mesajı çek ve manuel filtrele
-            async for message in user_app.get_chat_history(chat_id=KAYNAK_GRUP_ID, limit=20):
-                
-                # Sadece bizim son gördüğümüz ID'den YENİ olanları listeye ekle
-                if message.id > last_checked_message_id:
-                    messages_to_process.append(message)
-                else:
-                    # Bu mesajı zaten görmüştük, daha eskilerine bakmaya gerek yok
-                    break 
-
-            # Mesajları en eskiden en yeniye doğru işlemek için listeyi tersine çevir
-            messages_to_process.reverse()
-
-            if not messages_to_process:
-                logger.info("--- POLLING DEBUG: (ID > {last_checked_message_id}) olan yeni mesaj bulunamadı.")
-
-            for message in messages_to_process:
-                logger.info(f"--- POLLING AGGRESSIVE DEBUG: Yeni mesaj bulundu (ID: {message.id}).")
-                logger.info(f"Chat ID: {message.chat.id}")
-                logger.info(f"Gönderen ID: {message.from_user.id if message.from_user else 'Yok'}")
-
-                # 1. SMS Botu'ndan mı geldi?
-                if message.from_user and message.from_user.id == SMS_BOT_ID:
-                    # 2. Metin mesajı mı?
-                    if message.text:
-                        logger.info(f"User-bot SMS'i yakaladı - Kaynak Grup ID: {message.chat.id}, Kimden: {message.from_user.username}, Metin: {message.text[:50]}...")
-                        
-                        mesaj_metni = message.text
-                        try:
-                            await user_app.send_message(
-                                chat_id=f"@{ANA_BOT_USERNAME}", # Ana Bot'un kullanıcı adı
-                                text=mesaj_metni
-                            )
-                            logger.info(f"User-bot, SMS'i Ana Bot ({ANA_BOT_USERNAME})'a başarıyla iletti.")
-                        except FloodWait as e:
-                            logger.warning(f"User-bot FloodWait hatası, {e.value} saniye bekleniyor...")
-                            await asyncio.sleep(e.value)
-                        except Exception as e:
-                            logger.error(f"User-bot SMS'i Ana Bot'a iletirken hata oluştu: {e}")
-                    else:
-                        logger.warning(f"POLLING AGGRESSIVE DEBUG: SMS botundan gelen mesaj metin formatında değil (ID: {message.id}). Yoksayılıyor.")
-                else:
-                    logger.warning(f"POLLING AGGRESSIVE DEBUG: Mesaj SMS botundan gelmedi (Gönderen ID: {message.from_user.id if message.from_user else 'Yok'}). Yoksayılıyor.")
-                
-                # Her işlenen mesajdan sonra last_checked_message_id'yi güncelle
-                if message.id > last_checked_message_id:
-                    last_checked_message_id = message.id
+            await birikmis_mesajlari_isle(kaynak, kayitli_imlec)
+        except Exception as e:
+            logger.error(f"Birikmiş mesajlar işlenirken hata oluştu (Kaynak Grup ID: {kaynak.chat_id}): {e}")
+    else:
+        await baslangic_imlecini_al(kaynak)
+
+    logger.info(f"Boşluk kurtarma başlatılıyor. Kaynak Grup ID: {kaynak.chat_id}, SMS Bot ID'leri: {SMS_BOT_IDS}. Takip ID: {kaynak.taranan_id}")
 
+    while True:
+        await asyncio.sleep(KURTARMA_ARALIGI_SN)
+        if not kaynak.baslangic_alindi:
+            await baslangic_imlecini_al(kaynak)
+            continue
+        try:
+            # İmleç ve öncesi zaten iletildi (ya da açılıştan önceydi); sadece daha yenileri taranır.
+            # İletilemeyen mesaj varsa onun altına kadar inilir.
+            kacanlar, en_yeni_id = await kacan_mesajlari_bul(kaynak, kaynak.kurtarma_siniri())
+            if kacanlar:
+                logger.warning("Boşluk kurtarma (Kaynak Grup ID: %s): anlık dinleyicinin kaçırdığı %d mesaj bulundu.", kaynak.chat_id, len(kacanlar))
+                for message in kacanlar:
+                    if not await sms_ilet(kaynak, message, yol='kurtarma'):
+                        break
+            # Tarama en yeni mesaja kadar her SMS'i gördü; iletilemeyen varsa kurtarma_siniri imleci onun altında tutar
+            kaynak.imleci_ilerlet(en_yeni_id)
+            await imlec_kaydet()
         except FloodWait as e:
-            logger.warning(f"User-bot (Polling) FloodWait hatası, {e.value} saniye bekleniyor...")
-            await asyncio.sleep(e.value)
+            logger.warning("User-bot (Polling) FloodWait hatası, %s saniye bekleniyor...", e.value)
+            await asyncio.sleep(floodwait_bekle_kaydet(e))
         except Exception as e:
-            logger.error(f"Mesajları kontrol ederken veya işlerken beklenmedik bir hata oluştu: {e}")
-        
-        await asyncio.sleep(polling_interval)
+            logger.error(f"Mesajları kontrol ederken veya işlerken beklenmedik bir hata oluştu (Kaynak Grup ID: {kaynak.chat_id}): {e}")
+
+async def start_message_polling():
+    """Her kaynak grup için ayrı bir takip görevi başlatır; tekrar önbelleğini düzenli aralıklarla kaydeder."""
+    kayitli_imlecler, kayitli_islenenler = imlec_yukle()
+    gorevler = [asyncio.create_task(kaynak_takibi(kaynak, kayitli_imlecler.get(chat_id), kayitli_islenenler.get(chat_id, ())))
+                for chat_id, kaynak in kaynaklar.items()]
+    try:
+        while True:
+            await asyncio.sleep(KURTARMA_ARALIGI_SN)
+            await tekrar_onbellegini_kaydet()
+    finally:
+        for gorev in gorevler:
+            gorev.cancel()
 
 # --- Ana Çalıştırma Fonksiyonu ---
 async def main_user_bot() -> None:
     logger.info("User-bot (Pyrogram) başlatılıyor...")
+    metrik_sunucusu = None
+    if USER_BOT_METRIK_PORTU:
+        metrik_sunucusu = await metrikler.http_sunucusu_baslat(USER_BOT_METRIK_PORTU)
+    if USER_BOT_TEKRAR_DOSYASI:
+        islenen_mesajlar.dosyadan_yukle(USER_BOT_TEKRAR_DOSYASI)
     await user_app.start()
     logger.info("User-bot (Pyrogram) başarıyla bağlandı.")
     
@@ -148,16 +420,34 @@ async def main_user_bot() -> None:
         if dialog_count == 0:
             logger.warning("User-bot'un hiçbir sohbet listesi (dialog) bulunamadı.")
         
-        logger.info("Sohbet listesi yüklendi. Polling başlatılıyor.")
+        logger.info("Sohbet listesi yüklendi. Dinleyici ve boşluk kurtarma başlatılıyor.")
     except Exception as e:
         logger.error(f"Sohbet listesi (dialogs) yüklenirken hata oluştu: {e}")
     
-    # User-bot çalıştıktan sonra polling fonksiyonunu başlat
-    await start_message_polling()
+    # Yeni mesajlar anlık dinleyiciyle gelir; polling sadece boşluk kurtarma için çalışır
+    kurtarma_gorevi = asyncio.create_task(start_message_polling())
+    try:
+        await idle()
+    finally:
+        kurtarma_gorevi.cancel()
+        await tekrar_onbellegini_kaydet()
+        if metrik_sunucusu is not None:
+            metrik_sunucusu.close()
+        await user_app.stop()
+
+
+def calistir(ana) -> None:
+    """
+    Ana coroutine'i Pyrogram istemcisinin kendi loop'unda çalıştırır. Client modül
+    içe aktarılırken oluşturulduğu için dispatcher (işleyici görevleri ve on_message
+    kaydı) o anki loop'a bağlıdır; asyncio.run yeni bir loop açar ve anlık dinleyici
+    hiç çalışmaz, SMS'ler sadece boşluk kurtarmayla gelir.
+    """
+    user_app.loop.run_until_complete(ana)
 
 
 if __name__ == '__main__':
     try:
-        asyncio.run(main_user_bot()) # Asenkron ana fonksiyonu çalıştır
+        calistir(main_user_bot()) # Asenkron ana fonksiyonu çalıştır
     except Exception as e:
         logger.error(f"User-bot çalışırken kritik bir hata oluştu: {e}")
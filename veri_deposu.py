@@ -0,0 +1,322 @@
+import os
+import json
+import base64
+import asyncio
+import logging
+import threading
+
+from metrikler import kayit as metrik_kaydi
+from numara_kumesi import NumaraKumesi
+from raporlama import RaporSayaci
+
+logger = logging.getLogger(__name__)
+
+# Günlük (journal) kayıt türleri
+EKLE = 'ekle'                   # {'o': 'ekle', 'g': grup_id, 'n': [numaralar (int; eski kayıtlarda str)]}
+SIL = 'sil'                     # {'o': 'sil', 'g': grup_id, 'n': [numaralar (int; eski kayıtlarda str)]}
+SIL_HEPSI = 'silhepsi'          # {'o': 'silhepsi', 'g': grup_id}
+SAY = 'say'                     # {'o': 'say', 'g': [grup_idler], 'n': tel_no}
+RAPOR_SIFIRLA = 'rapor_sifirla' # {'o': 'rapor_sifirla'}
+RAPOR_EKLE = 'rapor_ekle'       # {'o': 'rapor_ekle', 'g': grup_id, 'r': {tel_no: adet}} (gönderilemeyen rapor geri konur)
+
+VERI_YAZMA_SURESI = metrik_kaydi.histogram('veri_yazma_suresi_saniye', "Diske yazma süresi (günlük veya anlık görüntü)", ('tur',))
+
+
+def kaydi_uygula(beklenen_numaralar: dict, sms_raporu: dict, kayit: dict) -> None:
+    """Tek bir günlük kaydını bellekteki veri yapılarına uygular."""
+    islem = kayit['o']
+    if islem == EKLE:
+        numaralar = beklenen_numaralar.get(kayit['g'])
+        if numaralar is None:
+            numaralar = beklenen_numaralar[kayit['g']] = NumaraKumesi()
+        numaralar.ekle(kayit['n'])
+    elif islem == SIL:
+        numaralar = beklenen_numaralar.get(kayit['g'])
+        if numaralar is not None:
+            numaralar.cikar(kayit['n'])
+    elif islem == SIL_HEPSI:
+        beklenen_numaralar.pop(kayit['g'], None)
+    elif islem == SAY:
+        tel_no = kayit['n']
+        for grup_id in kayit['g']:
+            grup_raporu = sms_raporu.get(grup_id)
+            if grup_raporu is None:
+                grup_raporu = sms_raporu[grup_id] = RaporSayaci()
+            grup_raporu.artir(tel_no)
+    elif islem == RAPOR_SIFIRLA:
+        sms_raporu.clear()
+    elif islem == RAPOR_EKLE:
+        grup_raporu = sms_raporu.get(kayit['g'])
+        if grup_raporu is None:
+            grup_raporu = sms_raporu[kayit['g']] = RaporSayaci()
+        for tel_no, adet in kayit['r'].items():
+            grup_raporu.artir(tel_no, adet)
+    else:
+        logger.warning(f"Bilinmeyen günlük kaydı yoksayıldı: {kayit}")
+
+
+class VeriDeposu:
+    """
+    Anlık görüntü (snapshot) + salt-ekleme günlüğü (journal) tabanlı kalıcı depo.
+
+    Her değişiklik günlüğe tek satırlık küçük bir JSON kaydı olarak eklenir, böylece
+    yazma maliyeti verinin boyutuyla değil değişikliğin boyutuyla orantılıdır. Günlük
+    belirli bir büyüklüğe ulaşınca tüm veri geçici dosyaya yazılıp os.replace ile
+    atomik olarak anlık görüntünün yerine konur ve günlük sıfırlanır.
+
+    Her kayıt artan bir sıra numarası ('s') taşır; anlık görüntü de en son içerdiği
+    sıra numarasını saklar. Böylece sıkıştırma ile günlüğün kesilmesi arasında çökme
+    olsa bile açılışta aynı kayıt iki kez uygulanmaz.
+
+    Anlık görüntüde her grubun numaraları NumaraKumesi.ikili() çıktısının base64 hali
+    olarak saklanır; eski sürümlerin yazdığı numara listeleri de okunabilir.
+
+    Bu sınıf diske kendisi zamanlama yapmaz: ekle() kayıtları tampona alır, yazma
+    işini ArkaPlanKaydedici executor üzerinden gunluge_yaz/anlik_goruntu_yaz ile yapar.
+    """
+
+    def __init__(self, anlik_goruntu_yolu: str, gunluk_yolu: str, sikistirma_esigi: int = 10000):
+        self.anlik_goruntu_yolu = anlik_goruntu_yolu
+        self.gunluk_yolu = gunluk_yolu
+        self.sikistirma_esigi = sikistirma_esigi
+        self.sira = 0
+        self.bekleyen_kayit_sayisi = 0  # Son sıkıştırmadan beri günlüğe eklenen kayıt sayısı
+        self._tampon = []
+        self._gunluk = None
+        # Günlük ve anlık görüntü yazımları executor thread'lerinde sırayla yapılır; aynı
+        # .tmp yoluna iki sıkıştırma aynı anda yazıp dosyayı bozmasın
+        self._yazma_kilidi = threading.Lock()
+
+    def yukle(self) -> tuple[dict, dict]:
+        """Anlık görüntüyü okur, üzerine günlüğü yeniden oynatır ve (beklenen_numaralar, sms_raporu) döner."""
+        beklenen_numaralar = {}
+        sms_raporu = {}
+        self.sira = 0
+
+        if os.path.exists(self.anlik_goruntu_yolu):
+            with open(self.anlik_goruntu_yolu, 'r') as f:
+                data = json.load(f)
+            beklenen_numaralar = {
+                int(k): NumaraKumesi.ikiliden(base64.b64decode(v)) if isinstance(v, str) else NumaraKumesi(v)
+                for k, v in data.get('beklenen_numaralar', {}).items()
+            }
+            sms_raporu = {int(k): RaporSayaci(v) for k, v in data.get('sms_raporu', {}).items()}
+            self.sira = data.get('sira', 0)
+
+        oynatilan = 0
+        if os.path.exists(self.gunluk_yolu):
+            gecerli_uzunluk = 0
+            with open(self.gunluk_yolu, 'rb') as f:
+                for satir_no, satir in enumerate(f, 1):
+                    try:
+                        if not satir.endswith(b'\n'):
+                            raise ValueError('satır sonu yok')
+                        kayit = json.loads(satir)
+                    except ValueError:
+                        # Yarım yazılmış son satır (çökme anında) -> sonrasını yoksay
+                        logger.warning(f"Günlüğün {satir_no}. satırı bozuk, kalan kayıtlar yoksayıldı.")
+                        break
+                    gecerli_uzunluk += len(satir)
+                    if kayit.get('s', 0) <= self.sira:
+                        continue
+                    kaydi_uygula(beklenen_numaralar, sms_raporu, kayit)
+                    self.sira = kayit['s']
+                    oynatilan += 1
+            # Bozuk kuyruğu kes ki yeni kayıtlar onun arkasına eklenmesin
+            if gecerli_uzunluk < os.path.getsize(self.gunluk_yolu):
+                os.truncate(self.gunluk_yolu, gecerli_uzunluk)
+
+        self.bekleyen_kayit_sayisi = oynatilan
+        if oynatilan:
+            logger.info(f"Günlükten {oynatilan} kayıt yeniden oynatıldı.")
+        return beklenen_numaralar, sms_raporu
+
+    def ekle(self, kayit: dict) -> None:
+        """Bir değişiklik kaydını sıra numarasıyla tampona ekler (disk I/O yapmaz)."""
+        self.sira += 1
+        kayit['s'] = self.sira
+        self._tampon.append(kayit)
+        self.bekleyen_kayit_sayisi += 1
+
+    def tamponu_al(self) -> list[dict]:
+        """Henüz yazılmamış kayıtları döner ve tamponu boşaltır."""
+        kayitlar, self._tampon = self._tampon, []
+        return kayitlar
+
+    def tampona_geri_koy(self, kayitlar: list[dict]) -> None:
+        """Yazılamayan kayıtları, sonradan eklenenlerin önüne (sıra numarası sırasıyla) geri koyar."""
+        self._tampon[:0] = kayitlar
+
+    def sikistirma_gerekli(self) -> bool:
+        return self.bekleyen_kayit_sayisi >= self.sikistirma_esigi
+
+    def gunluge_yaz(self, kayitlar: list[dict]) -> None:
+        """
+        Kayıtları serileştirip tek seferde günlüğün sonuna ekler (bloklayan I/O).
+        Yazma yarıda kalırsa (ör. disk dolu) günlük eski boyutuna kesilip hata yukarı
+        çıkar; böylece yarım satır sonradan eklenen kayıtların yeniden oynatılmasını engellemez.
+        """
+        if not kayitlar:
+            return
+        veri = ''.join(json.dumps(k, separators=(',', ':')) + '\n' for k in kayitlar).encode('utf-8')
+        with self._yazma_kilidi:
+            if self._gunluk is None:
+                # Tamponsuz: write() doğrudan sistem çağrısıdır, hata anında yarım tampon kalmaz
+                self._gunluk = open(self.gunluk_yolu, 'ab', buffering=0)
+            baslangic = os.fstat(self._gunluk.fileno()).st_size
+            try:
+                yazilan = 0
+                while yazilan < len(veri):
+                    yazilan += self._gunluk.write(veri[yazilan:])
+            except OSError:
+                self.kapat()
+                try:
+                    os.truncate(self.gunluk_yolu, baslangic)
+                except OSError as e:
+                    logger.error(f"Yarım yazılan günlük kesilemedi: {e}")
+                raise
+
+    def anlik_goruntu_yaz(self, data: dict) -> None:
+        """
+        Verinin bir kopyasını atomik olarak anlık görüntüye yazar ve günlüğü sıfırlar
+        (bloklayan I/O). data['sira'], kopyanın içerdiği son kaydın sıra numarası olmalıdır.
+        """
+        data = dict(data, beklenen_numaralar={
+            k: base64.b64encode(v).decode('ascii') for k, v in data['beklenen_numaralar'].items()
+        })
+        gecici_yol = self.anlik_goruntu_yolu + '.tmp'
+        with self._yazma_kilidi:
+            with open(gecici_yol, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(gecici_yol, self.anlik_goruntu_yolu)
+
+            # Anlık görüntü artık tüm kayıtları içeriyor, günlüğü kes (sonraki yazma yeniden açar)
+            self.kapat()
+            open(self.gunluk_yolu, 'wb').close()
+        logger.info(f"Veri anlık görüntüye sıkıştırıldı (sıra: {data['sira']}).")
+
+    def anlik_kopya(self, beklenen_numaralar: dict, sms_raporu: dict) -> dict:
+        """
+        Sıkıştırma için bellekteki verinin tutarlı bir kopyasını çıkarır. Bekleyen kayıt
+        sayacı yazma başarılı olunca sikistirildi() ile düşülür.
+        """
+        return {
+            'sira': self.sira,
+            # Sadece ham bayt kopyası (memcpy); base64'e çevirme executor'da yapılır
+            'beklenen_numaralar': {k: v.ikili() for k, v in beklenen_numaralar.items()},
+            'sms_raporu': {k: dict(v.sayilar) for k, v in sms_raporu.items()}
+        }
+
+    def sikistirildi(self, kayit_sayisi: int) -> None:
+        """Anlık görüntüye giren kayıtları bekleyen sayısından düşer (kopya alınırken okunan değer)."""
+        self.bekleyen_kayit_sayisi = max(0, self.bekleyen_kayit_sayisi - kayit_sayisi)
+
+    def kapat(self) -> None:
+        if self._gunluk is not None:
+            self._gunluk.close()
+            self._gunluk = None
+
+
+class ArkaPlanKaydedici:
+    """
+    Depodaki bekleyen kayıtları event loop'u bloklamadan arka planda diske yazar.
+
+    Değişiklikler kirli bayrağıyla işaretlenir; yazma en geç `aralik_sn` saniyede bir
+    ya da `degisiklik_esigi` değişiklik biriktiğinde yapılır. Serileştirme ve dosya
+    I/O'su executor'da çalışır. Böylece olası veri kaybı penceresi `aralik_sn` ile
+    sınırlıdır.
+    """
+
+    def __init__(self, depo: VeriDeposu, veri_saglayici, aralik_sn: float = 2.0, degisiklik_esigi: int = 500):
+        self.depo = depo
+        self.veri_saglayici = veri_saglayici  # () -> (beklenen_numaralar, sms_raporu)
+        self.aralik_sn = aralik_sn
+        self.degisiklik_esigi = degisiklik_esigi
+        self._kirli = 0
+        self._olay = asyncio.Event()
+        self._kilit = asyncio.Lock()
+        self._gorev = None
+        self._duruyor = False
+        metrik_kaydi.gosterge('bekleyen_gunluk_kaydi', "Son sıkıştırmadan beri günlükteki kayıt sayısı").fonksiyon_ayarla(
+            lambda: self.depo.bekleyen_kayit_sayisi
+        )
+        metrik_kaydi.gosterge('anlik_goruntu_boyutu_bayt', "Anlık görüntü dosyasının boyutu").fonksiyon_ayarla(
+            lambda: os.path.getsize(self.depo.anlik_goruntu_yolu)
+        )
+
+    def kirli_isaretle(self, adet: int = 1) -> None:
+        self._kirli += adet
+        if self._kirli >= self.degisiklik_esigi:
+            self._olay.set()
+
+    def baslat(self) -> None:
+        self._duruyor = False
+        self._gorev = asyncio.create_task(self._dongu())
+
+    async def _dongu(self) -> None:
+        while not self._duruyor:
+            try:
+                await asyncio.wait_for(self._olay.wait(), timeout=self.aralik_sn)
+            except asyncio.TimeoutError:
+                pass
+            self._olay.clear()
+            if self._duruyor or not self._kirli:
+                continue
+            try:
+                await self.bosalt()
+            except Exception as e:
+                logger.error(f"Arka plan kaydı sırasında hata oluştu: {e}")
+
+    async def bosalt(self, sikistir: bool = False) -> None:
+        """
+        Bekleyen kayıtları yazar; gerekiyorsa (veya istenirse) anlık görüntüye sıkıştırır.
+        Yazma başarısız olursa kayıtlar tampona geri konur ve hata yukarı çıkar; bir
+        sonraki denemede aynı sıra numaralarıyla tekrar yazılır.
+        """
+        async with self._kilit:
+            kirli, self._kirli = self._kirli, 0
+            kayitlar = self.depo.tamponu_al()
+            loop = asyncio.get_running_loop()
+            try:
+                if sikistir or self.depo.sikistirma_gerekli():
+                    # Kopya loop üzerinde alınır ki tampondaki kayıtlarla tutarlı olsun;
+                    # alınan kayıtlar kopyaya dahil olduğundan ayrıca günlüğe yazılmaz.
+                    with VERI_YAZMA_SURESI.etiket('anlik_goruntu').olc():
+                        kayit_sayisi = self.depo.bekleyen_kayit_sayisi
+                        data = self.depo.anlik_kopya(*self.veri_saglayici())
+                        await self._yazma_bitene_kadar(loop.run_in_executor(None, self.depo.anlik_goruntu_yaz, data))
+                    self.depo.sikistirildi(kayit_sayisi)
+                else:
+                    with VERI_YAZMA_SURESI.etiket('gunluk').olc():
+                        await self._yazma_bitene_kadar(loop.run_in_executor(None, self.depo.gunluge_yaz, kayitlar))
+            except BaseException:
+                # Anlık görüntü yerine konduktan sonra hata olduysa bu kayıtlar günlüğe tekrar
+                # yazılır ama sıra numaraları anlık görüntüde olduğundan açılışta atlanır.
+                self.depo.tampona_geri_koy(kayitlar)
+                self._kirli += kirli
+                raise
+
+    @staticmethod
+    async def _yazma_bitene_kadar(gelecek: asyncio.Future) -> None:
+        """
+        Executor'daki yazmayı bekler. Görev iptal edilse bile thread'deki yazma sürer;
+        kilit o bitmeden bırakılırsa sıradaki yazma onunla yarışır. Bu yüzden iptalde de
+        yazmanın bitmesi beklenir, sonra iptal yukarı iletilir.
+        """
+        try:
+            await asyncio.shield(gelecek)
+        except asyncio.CancelledError:
+            await asyncio.wait([gelecek])
+            raise
+
+    async def durdur(self) -> None:
+        """Döngüyü durdurur (süren yazmanın bitmesini bekleyerek), kalan her şeyi anlık görüntüye yazıp depoyu kapatır."""
+        if self._gorev is not None:
+            self._duruyor = True
+            self._olay.set()
+            await self._gorev
+            self._gorev = None
+        await self.bosalt(sikistir=True)
+        self.depo.kapat()